@@ -0,0 +1,158 @@
+"""Micro-benchmark: cost of persisting a scan task with a large result.
+
+Compares the previous ``DynamoTaskRepository.update_task`` (all eight
+attributes on every call, each map serialized with ``dynamodb_json`` to a
+string and parsed back) against the dirty-tracking update, for the two writes
+``AnalyseCodeUseCase.execute`` makes: IN_PROGRESS, then COMPLETED with the
+result.
+
+Reported per write: CPU time to build the request, UpdateItem request size,
+and the write units DynamoDB would bill. UpdateItem is billed on the larger
+of the item sizes before and after the update, not on the request size, so
+write units only drop when an update is skipped entirely; the savings on the
+writes themselves are CPU time and request bytes.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/dynamo_task_update.py --result-kb 300
+"""
+
+import argparse
+import json
+import math
+import statistics
+import time
+from datetime import datetime
+
+from dynamodb_json import json_util as dynamo_json
+
+from code_analysis.domain.entities.task_entity import Task, TaskSource, TaskStatus
+from code_analysis.infra.adapters.dynamo_task_repository import DynamoTaskRepository
+
+
+class _RecordingClient:
+    def __init__(self):
+        self.requests: list[dict] = []
+
+    def update_item(self, **kwargs):
+        self.requests.append(kwargs)
+
+
+def _legacy_update(client: _RecordingClient, task: Task) -> None:
+    """Request built by update_task before dirty tracking."""
+    scan_result = dynamo_json.dumps(task.result)
+    scan_args = dynamo_json.dumps(task.args)
+    client.update_item(
+        TableName="tasks",
+        Key={"scan_id": {"S": task.id}},
+        UpdateExpression=(
+            "set #scan_result = :scan_result, #args = :args, #hint_id = :hint_id, "
+            "#scaned_files = :scaned_files, #created_at = :created_at, "
+            "#updated_at = :updated_at, #status = :status, #source = :source"
+        ),
+        ExpressionAttributeNames={
+            f"#{name}": name
+            for name in (
+                "scan_result",
+                "args",
+                "hint_id",
+                "scaned_files",
+                "created_at",
+                "updated_at",
+                "status",
+                "source",
+            )
+        },
+        ExpressionAttributeValues={
+            ":scan_result": {"M": json.loads(scan_result)},
+            ":args": {"M": json.loads(scan_args)},
+            ":hint_id": {"S": task.hint_id},
+            ":scaned_files": {"N": str(task.scaned_files)},
+            ":created_at": {"S": task.created_at.isoformat()},
+            ":updated_at": {"S": task.updated_at.isoformat()},
+            ":status": {"S": task.status.value},
+            ":source": {"S": task.source.value},
+        },
+    )
+
+
+def _result(size_kb: int) -> dict:
+    issues = []
+    while len(json.dumps(issues)) < size_kb * 1024:
+        n = len(issues)
+        issues.append(
+            {
+                "title": f"Finding {n}",
+                "severity": "HIGH",
+                "path": f"src/module_{n % 40}/file_{n}.py",
+                "line": n,
+                "score": 0.5 + n % 7 / 10,
+                "description": "Untrusted input reaches a dangerous sink. " * 6,
+                "code": "eval(request.args['q'])\n" * 4,
+            }
+        )
+    return {"status": "WARNING", "scaned_files": 120, "issues": issues}
+
+
+def _task() -> Task:
+    return Task(
+        id="bench-task",
+        result={},
+        args={"github_repo_name": "org/repo", "github_commit_sha": "a" * 40},
+        hint_id="hint",
+        scaned_files=0,
+        created_at=datetime(2026, 1, 1),
+        updated_at=datetime(2026, 1, 1),
+        status=TaskStatus.PENDING,
+        source=TaskSource.GITHUB,
+    )
+
+
+def _writes(update, result: dict) -> list[tuple[float, dict]]:
+    """Run the two writes of one task; return (cpu seconds, request) per write."""
+    client = _RecordingClient()
+    task = _task()
+    samples = []
+    for step in ("in_progress", "completed"):
+        if step == "in_progress":
+            task.mark_in_progress()
+        else:
+            task.mark_completed(result, result["scaned_files"])
+        start = time.process_time()
+        update(client, task)
+        samples.append((time.process_time() - start, client.requests[-1]))
+    return samples
+
+
+def _write_units(item_bytes: int) -> int:
+    return max(1, math.ceil(item_bytes / 1024))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--result-kb", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    result = _result(args.result_kb)
+    # Approximate item size after each write: other attributes plus the result
+    item_bytes = {"in_progress": 512, "completed": 512 + len(json.dumps(result))}
+
+    def _new_update(client: _RecordingClient, task: Task) -> None:
+        DynamoTaskRepository(client, "tasks").update_task(task)
+
+    print(f"result: {len(json.dumps(result)) / 1024:.0f} KB, {args.runs} runs")
+    for label, update in (("before", _legacy_update), ("after", _new_update)):
+        runs = [_writes(update, result) for _ in range(args.runs)]
+        for index, step in enumerate(("in_progress", "completed")):
+            cpu_ms = statistics.median(run[index][0] for run in runs) * 1000
+            request_kb = len(json.dumps(runs[0][index][1])) / 1024
+            print(
+                f"{label:<7} {step:<12} cpu={cpu_ms:8.2f} ms  "
+                f"request={request_kb:8.1f} KB  "
+                f"billed_wcu={_write_units(item_bytes[step])}"
+            )
+
+
+if __name__ == "__main__":
+    main()
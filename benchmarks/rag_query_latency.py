@@ -0,0 +1,115 @@
+"""Micro-benchmark: per-query latency of RAG KNN lookups.
+
+Compares the previous behaviour (connect, load sqlite-vec, query, close on
+every search) against ``S3SqliteRagContextAdapter._query_db``, which keeps one
+read-only connection per index.
+
+Usage (requires a Python whose sqlite3 supports loadable extensions):
+
+    PYTHONPATH=src python benchmarks/rag_query_latency.py --chunks 5000 --queries 40
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+import sqlite_vec
+
+from code_analysis.infra.adapters.s3_sqlite_rag_context_adapter import (
+    _KNN_SQL,
+    S3SqliteRagContextAdapter,
+)
+
+
+def _build_index(path: str, chunks: int, dims: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.enable_load_extension(False)
+    conn.execute(
+        f"CREATE VIRTUAL TABLE chunks USING vec0("
+        f"embedding float[{dims}], +file_path text, +chunk_text text)"
+    )
+    rng = random.Random(0)
+    conn.executemany(
+        "INSERT INTO chunks(embedding, file_path, chunk_text) VALUES (?, ?, ?)",
+        (
+            (
+                sqlite_vec.serialize_float32([rng.random() for _ in range(dims)]),
+                f"src/file_{i % 500}.py",
+                f"chunk {i} " * 40,
+            )
+            for i in range(chunks)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _query_per_connection(db_path: str, embedding: list[float], k: int) -> list:
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.enable_load_extension(False)
+        return conn.execute(
+            _KNN_SQL, (sqlite_vec.serialize_float32(embedding), k)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def _timed(fn, queries: list[list[float]]) -> list[float]:
+    latencies = []
+    for embedding in queries:
+        start = time.perf_counter()
+        fn(embedding)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _report(label: str, latencies: list[float]) -> None:
+    print(
+        f"{label:<28} mean={statistics.mean(latencies):7.3f} ms  "
+        f"p50={statistics.median(latencies):7.3f} ms  "
+        f"max={max(latencies):7.3f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    queries = [[rng.random() for _ in range(args.dims)] for _ in range(args.queries)]
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.unlink(db_path)
+    try:
+        _build_index(db_path, args.chunks, args.dims)
+        print(f"index: {args.chunks} chunks x {args.dims} dims, k={args.k}")
+
+        before = _timed(lambda e: _query_per_connection(db_path, e, args.k), queries)
+
+        adapter = S3SqliteRagContextAdapter(MagicMock(), "bench", None, None, None)
+        after = _timed(lambda e: adapter._query_db(db_path, e, args.k), queries)
+        adapter.close()
+
+        _report("before (connect per query)", before)
+        _report("after (reused connection)", after)
+    finally:
+        os.unlink(db_path)
+
+
+if __name__ == "__main__":
+    main()
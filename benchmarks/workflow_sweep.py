@@ -0,0 +1,353 @@
+"""End-to-end benchmark: the compiled workflow over growing commits, offline.
+
+Runs the real ``create_workflow`` graph (MCP retrieval, routing, RAG, the six
+experts and merge) against the fakes in ``workflow_fakes.py``: a scripted
+chat model with configurable latency and output size, an in-process MCP
+server and, when this Python's sqlite3 can load extensions, a local
+sqlite-vec index. ``WorkflowSettings`` come from the usual ``TITVO_*``
+variables, so knobs can be compared run against run.
+
+Each commit size runs in its own interpreter so peak RSS is per size. The
+JSON report has, per size: wall-clock, time per graph node, peak RSS, prompt
+sizes per node (characters sent to the model, and the prompt tokens the
+experts counted), total token usage with the prompt cache hit ratio the fake
+model reports, and the scan outcome.
+
+Usage:
+
+    PYTHONPATH=src python benchmarks/workflow_sweep.py \
+        --sizes 1,10,100,2000 --latency-ms 200 --output sweep.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from workflow_fakes import (
+    FakeMcpServer,
+    InMemoryMcpClient,
+    ScriptedChatModel,
+    build_rag_index,
+    local_rag_context,
+    serve_http,
+    sqlite_vec_available,
+    synthetic_commit,
+)
+
+from code_analysis.infra.adapters.langgraph.nodes.rag_retrieval_node import (
+    RagRetrievalNode,
+)
+from code_analysis.infra.adapters.langgraph.settings import WorkflowSettings
+from code_analysis.infra.adapters.langgraph.workflow import create_workflow
+
+REPOSITORY_URL = "https://github.com/benchmark/repo"
+BRANCH = "main"
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Wall time per graph node and prompt sizes per node, from callbacks."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.nodes: dict[str, dict[str, float]] = {}
+        self.prompts: dict[str, list[int]] = {}
+        self._open: dict[UUID, tuple[str, float]] = {}
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # The node's own run, not routing functions or runnables inside it
+        if node is not None and kwargs.get("name") == node:
+            self._open[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._close(run_id)
+
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._close(run_id)
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[Any]],
+        *,
+        run_id: UUID,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node", "unknown")
+        chars = sum(len(str(m.content)) for batch in messages for m in batch)
+        self.prompts.setdefault(node, []).append(chars)
+
+    def _close(self, run_id: UUID) -> None:
+        opened = self._open.pop(run_id, None)
+        if opened is None:
+            return
+        node, started = opened
+        ended = time.perf_counter()
+        stats = self.nodes.setdefault(
+            node,
+            {
+                "runs": 0,
+                "total_s": 0.0,
+                "max_s": 0.0,
+                "first_start_s": started - self.started,
+                "last_end_s": 0.0,
+            },
+        )
+        elapsed = ended - started
+        stats["runs"] += 1
+        stats["total_s"] += elapsed
+        stats["max_s"] = max(stats["max_s"], elapsed)
+        stats["last_end_s"] = max(stats["last_end_s"], ended - self.started)
+
+    def report(self) -> dict[str, Any]:
+        nodes = {
+            name: {key: round(value, 4) for key, value in stats.items()}
+            for name, stats in sorted(
+                self.nodes.items(), key=lambda item: item[1]["first_start_s"]
+            )
+        }
+        prompts = {
+            name: {
+                "calls": len(sizes),
+                "total_chars": sum(sizes),
+                "max_chars": max(sizes),
+            }
+            for name, sizes in sorted(self.prompts.items())
+        }
+        return {"nodes": nodes, "prompts": prompts}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _initial_state() -> dict[str, Any]:
+    return {
+        "task_id": "benchmark",
+        "repository_url": REPOSITORY_URL,
+        "branch": BRANCH,
+        "commit_hash": "0" * 40,
+        "extra_args": {},
+        "files": [],
+        "scaned_files": 0,
+        "issues": [],
+        "expert_errors": [],
+    }
+
+
+async def _run_workflow(mcp_client: Any, model: ScriptedChatModel, rag_node, args):
+    settings = WorkflowSettings.from_env()
+    build_started = time.perf_counter()
+    workflow = create_workflow(mcp_client, model, rag_node=rag_node, settings=settings)
+    build_s = time.perf_counter() - build_started
+
+    timer = NodeTimer()
+    baseline_rss_mb = _peak_rss_mb()
+    started = time.perf_counter()
+    if rag_node is not None:
+        # As the agent does: the index download overlaps MCP retrieval
+        rag_node.prefetch(REPOSITORY_URL, BRANCH)
+    try:
+        result = await workflow.ainvoke(_initial_state(), config={"callbacks": [timer]})
+    finally:
+        if rag_node is not None:
+            await rag_node.release()
+    wall_s = time.perf_counter() - started
+    return result, timer, build_s, wall_s, baseline_rss_mb
+
+
+async def run_size(file_count: int, args: argparse.Namespace) -> dict[str, Any]:
+    """Run the workflow once over a synthetic commit of ``file_count`` files."""
+    files = synthetic_commit(file_count, args.lines_per_file)
+    server = FakeMcpServer(
+        files,
+        commit_files_delay_s=args.commit_files_delay_ms / 1000,
+        file_latency_s=args.mcp_file_latency_ms / 1000,
+    )
+    model = ScriptedChatModel(
+        model_name=args.model_id,
+        latency_s=args.latency_ms / 1000,
+        tokens_per_s=args.tokens_per_s,
+        output_tokens=args.output_tokens,
+        issues_per_call=args.issues_per_call,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rag_node = None
+        rag_report: dict[str, Any] | None = None
+        if args.rag_enabled:
+            index_path = os.path.join(tmp, "index.db")
+            index_started = time.perf_counter()
+            chunks = build_rag_index(index_path, files, args.rag_dims)
+            rag_report = {
+                "chunks": chunks,
+                "dims": args.rag_dims,
+                "index_build_s": round(time.perf_counter() - index_started, 3),
+            }
+            rag_node = RagRetrievalNode(
+                rag_context_factory=lambda: local_rag_context(index_path, args.rag_dims)
+            )
+
+        if args.mcp_transport == "http":
+            from langchain_mcp_adapters.client import MultiServerMCPClient
+
+            with serve_http(server) as url:
+                client = MultiServerMCPClient(
+                    {"titvo-mcp-server": {"transport": "streamable_http", "url": url}}
+                )
+                outcome = await _run_workflow(client, model, rag_node, args)
+        else:
+            async with InMemoryMcpClient(server) as client:
+                outcome = await _run_workflow(client, model, rag_node, args)
+
+    result, timer, build_s, wall_s, baseline_rss_mb = outcome
+    final_output = result.get("final_output") or {}
+    expert_metadata = result.get("expert_metadata", {})
+    return {
+        "files": file_count,
+        "wall_s": round(wall_s, 4),
+        "build_s": round(build_s, 4),
+        "baseline_rss_mb": baseline_rss_mb,
+        "peak_rss_mb": _peak_rss_mb(),
+        **timer.report(),
+        "expert_prompt_tokens": {
+            name: meta["prompt_tokens"]
+            for name, meta in expert_metadata.items()
+            if isinstance(meta, dict) and "prompt_tokens" in meta
+        },
+        "expert_shards": {
+            name: meta.get("shards", 1)
+            for name, meta in expert_metadata.items()
+            if isinstance(meta, dict) and "prompt_tokens" in meta
+        },
+        "llm_usage": (final_output.get("usage") or {}).get("total"),
+        "model_calls": len(model.calls),
+        "mcp_calls": dict(server.calls),
+        "rag": rag_report,
+        "status": final_output.get("status", result.get("status")),
+        "scaned_files": result.get("scaned_files", 0),
+        "issues": len(final_output.get("issues", [])),
+        "expert_errors": result.get("expert_errors", []),
+    }
+
+
+def _run_isolated(file_count: int) -> dict[str, Any]:
+    """Run one size in a fresh interpreter (peak RSS is per process)."""
+    completed = subprocess.run(
+        [sys.executable, __file__, *sys.argv[1:], "--size", str(file_count)],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr)
+        raise RuntimeError(f"size {file_count} failed ({completed.returncode})")
+    return json.loads(completed.stdout)
+
+
+def _summary_line(result: dict[str, Any]) -> str:
+    slowest = max(result["nodes"].items(), key=lambda item: item[1]["max_s"])
+    return (
+        f"files={result['files']:>5}  wall={result['wall_s']:8.3f}s  "
+        f"peak_rss={result['peak_rss_mb']:7.1f} MB  "
+        f"model_calls={result['model_calls']:>3}  "
+        f"slowest_node={slowest[0]} ({slowest[1]['max_s']:.3f}s)  "
+        f"status={result['status']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,100,2000")
+    parser.add_argument("--lines-per-file", type=int, default=80)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--tokens-per-s", type=float, default=0.0)
+    parser.add_argument("--output-tokens", type=int, default=400)
+    parser.add_argument("--issues-per-call", type=int, default=2)
+    parser.add_argument("--model-id", default="fake-benchmark")
+    parser.add_argument("--mcp-transport", choices=("memory", "http"), default="memory")
+    parser.add_argument("--mcp-file-latency-ms", type=float, default=0.0)
+    parser.add_argument("--commit-files-delay-ms", type=float, default=0.0)
+    parser.add_argument("--rag", choices=("auto", "on", "off"), default="auto")
+    parser.add_argument("--rag-dims", type=int, default=64)
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="run every size in this process (peak RSS becomes cumulative)",
+    )
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    available = sqlite_vec_available()
+    if args.rag == "on" and not available:
+        parser.error("--rag on: this Python's sqlite3 cannot load sqlite-vec")
+    args.rag_enabled = args.rag == "on" or (args.rag == "auto" and available)
+
+    if args.size is not None:
+        json.dump(asyncio.run(run_size(args.size, args)), sys.stdout)
+        return
+
+    if not args.rag_enabled:
+        print("RAG disabled (sqlite-vec not loadable or --rag off)", file=sys.stderr)
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        if args.in_process:
+            result = asyncio.run(run_size(size, args))
+        else:
+            result = _run_isolated(size)
+        print(_summary_line(result), file=sys.stderr)
+        results.append(result)
+
+    config = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("output", "size", "sizes")
+    }
+    report = {
+        "benchmark": "workflow_sweep",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "workflow_settings": asdict(WorkflowSettings.from_env()),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
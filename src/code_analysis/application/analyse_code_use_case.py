@@ -1,6 +1,10 @@
 import asyncio
 import json
 import logging
+import time
+from collections.abc import Callable
+from dataclasses import fields
+from typing import Optional
 
 from code_analysis.domain.dto.result_dto import AnalysisStatus, ResultDto
 from code_analysis.domain.entities.task_entity import Task
@@ -9,13 +13,14 @@ from code_analysis.domain.ports.ia_agent import AbstractAgent, AgentMessage
 from code_analysis.domain.ports.rag_index_status_port import IRagIndexStatusPort
 from code_analysis.domain.ports.task_repository import ITaskRepository
 from rag_indexer_trigger.rag_indexer_batch_trigger import RagIndexerBatchTrigger
+from shared.infra.metrics import EmfEmitter, ScanMetrics
+from shared.infra.polling import PollPolicy, PollTimeoutError
 
 LOGGER = logging.getLogger(__name__)
 
-_RAG_POLL_INTERVAL_S = 10
-_RAG_MAX_ATTEMPTS = 60
 _SCAN_MODE_COMMIT = "commit"
 _SCAN_MODE_FULL = "full"
+_RESULT_DTO_FIELDS = frozenset(field.name for field in fields(ResultDto))
 
 
 class AnalyseCodeUseCase:
@@ -28,6 +33,11 @@ class AnalyseCodeUseCase:
         notification_service (NotificationService): Servicio de notificaciones.
         rag_index_status (IRagIndexStatusPort): Consulta si el índice RAG existe.
         rag_indexer_trigger (RagIndexerBatchTrigger): Dispara jobs de indexación.
+        rag_poll_policy (PollPolicy): Backoff y timeout al esperar la indexación.
+        task_time_budget_s (float): Presupuesto de tiempo total de la tarea; las
+            esperas de indexación no pueden excederlo.
+        metrics_emitter (EmfEmitter): Publica las métricas de cada tarea (nodos y
+            llamadas externas) al terminar; None no las publica.
     """
 
     def __init__(
@@ -38,6 +48,9 @@ class AnalyseCodeUseCase:
         content_template: str,
         rag_index_status: IRagIndexStatusPort,
         rag_indexer_trigger: RagIndexerBatchTrigger,
+        rag_poll_policy: Optional[PollPolicy] = None,
+        task_time_budget_s: Optional[float] = None,
+        metrics_emitter: Optional[EmfEmitter] = None,
     ):
         self.task_repository = task_repository
         self.agent = agent
@@ -45,6 +58,9 @@ class AnalyseCodeUseCase:
         self.notification_service = notification_service
         self.rag_index_status = rag_index_status
         self.rag_indexer_trigger = rag_indexer_trigger
+        self.rag_poll_policy = rag_poll_policy or PollPolicy()
+        self.task_time_budget_s = task_time_budget_s
+        self.metrics_emitter = metrics_emitter
 
     @staticmethod
     def _normalize_scan_mode(scan_mode: object) -> str:
@@ -54,36 +70,63 @@ class AnalyseCodeUseCase:
             raise ValueError("scan_mode must be one of: commit, full")
         return str(scan_mode)
 
-    async def _wait_for_rag_job(self, job_id: str, repo_url: str, label: str) -> None:
-        for attempt in range(1, _RAG_MAX_ATTEMPTS + 1):
-            await asyncio.sleep(_RAG_POLL_INTERVAL_S)
-            status = self.rag_indexer_trigger.get_job_status(job_id)
-            LOGGER.info(
-                "Indexing job %s status: %s (attempt %d/%d)",
-                job_id,
-                status.status,
-                attempt,
-                _RAG_MAX_ATTEMPTS,
+    async def _wait_for_rag_job(
+        self,
+        job_id: str,
+        repo_url: str,
+        label: str,
+        deadline: Optional[float] = None,
+    ) -> None:
+        try:
+            result = await self.rag_indexer_trigger.wait_for_job(
+                job_id, self.rag_poll_policy, deadline
             )
-            if status.is_succeeded:
-                LOGGER.info("RAG indexing completed for %s (%s)", repo_url, label)
-                return
-            if status.is_failed:
-                raise RuntimeError(
-                    f"RAG indexing job {job_id} failed for {repo_url} ({label})"
-                )
+        except PollTimeoutError as exc:
+            raise TimeoutError(
+                f"RAG indexing timed out for {repo_url} ({label}) "
+                f"after {exc.waited_s:.0f}s ({exc.attempts} checks)"
+            ) from exc
 
-        raise TimeoutError(
-            f"RAG indexing timed out for {repo_url} ({label}) "
-            f"after {_RAG_MAX_ATTEMPTS * _RAG_POLL_INTERVAL_S}s"
-        )
+        if result.value.is_failed:
+            raise RuntimeError(
+                f"RAG indexing job {job_id} failed for {repo_url} ({label})"
+            )
+        LOGGER.info("RAG indexing completed for %s (%s)", repo_url, label)
+
+    @staticmethod
+    async def _submit_rag_job(
+        submitted_jobs: Optional[list[asyncio.Future]],
+        submit: Callable[..., str],
+        *args: str,
+    ) -> str:
+        """Submit an indexing job from a thread and record the submission.
 
-    async def _ensure_branch_rag_index(self, repo_url: str, branch: str) -> None:
+        The submission is shielded: when the wait for the index is cancelled
+        it still completes, so the job id stays known to the caller.
+        """
+        submission = asyncio.ensure_future(asyncio.to_thread(submit, *args))
+        if submitted_jobs is not None:
+            submitted_jobs.append(submission)
+        return await asyncio.shield(submission)
+
+    @staticmethod
+    async def _submitted_job_ids(submitted_jobs: list[asyncio.Future]) -> list[str]:
+        """Ids of the indexing jobs whose submission succeeded."""
+        results = await asyncio.gather(*submitted_jobs, return_exceptions=True)
+        return [job_id for job_id in results if isinstance(job_id, str)]
+
+    async def _ensure_branch_rag_index(
+        self,
+        repo_url: str,
+        branch: str,
+        deadline: Optional[float] = None,
+        submitted_jobs: Optional[list[asyncio.Future]] = None,
+    ) -> None:
         """Ensure the RAG index exists for the branch.
 
         Blocks until the indexing job completes or raises on failure/timeout.
         """
-        if self.rag_index_status.is_indexed(repo_url, branch):
+        if await asyncio.to_thread(self.rag_index_status.is_indexed, repo_url, branch):
             LOGGER.info("RAG index already available for %s@%s", repo_url, branch)
             return
 
@@ -92,20 +135,34 @@ class AnalyseCodeUseCase:
             repo_url,
             branch,
         )
-        job_id = self.rag_indexer_trigger.trigger_full(repo_url, branch)
+        job_id = await self._submit_rag_job(
+            submitted_jobs, self.rag_indexer_trigger.trigger_full, repo_url, branch
+        )
         LOGGER.info("Full indexing job submitted: %s", job_id)
-        await self._wait_for_rag_job(job_id, repo_url, branch)
+        await self._wait_for_rag_job(job_id, repo_url, branch, deadline)
 
     async def _ensure_rag_index(
-        self, repo_url: str, branch: str, commit_hash: str, scan_mode: str
+        self,
+        repo_url: str,
+        branch: str,
+        commit_hash: str,
+        scan_mode: str,
+        deadline: Optional[float] = None,
+        submitted_jobs: Optional[list[asyncio.Future]] = None,
     ) -> None:
-        """Ensure RAG context is available, and fresh for full scans."""
-        await self._ensure_branch_rag_index(repo_url, branch)
+        """Ensure RAG context is available, and fresh for full scans.
+
+        ``deadline`` (``time.monotonic()`` based) bounds both indexing waits.
+        Submissions of the indexing jobs are appended to ``submitted_jobs``.
+        """
+        await self._ensure_branch_rag_index(repo_url, branch, deadline, submitted_jobs)
 
         if scan_mode != _SCAN_MODE_FULL:
             return
 
-        if self.rag_index_status.is_commit_indexed(repo_url, branch, commit_hash):
+        if await asyncio.to_thread(
+            self.rag_index_status.is_commit_indexed, repo_url, branch, commit_hash
+        ):
             LOGGER.info(
                 "RAG index already fresh for %s@%s (%s)",
                 repo_url,
@@ -120,15 +177,58 @@ class AnalyseCodeUseCase:
             branch,
             commit_hash[:7],
         )
-        job_id = self.rag_indexer_trigger.trigger_delta(repo_url, branch, commit_hash)
+        job_id = await self._submit_rag_job(
+            submitted_jobs,
+            self.rag_indexer_trigger.trigger_delta,
+            repo_url,
+            branch,
+            commit_hash,
+        )
         LOGGER.info("Delta indexing job submitted for full scan freshness: %s", job_id)
-        await self._wait_for_rag_job(job_id, repo_url, f"{branch}@{commit_hash[:7]}")
+        await self._wait_for_rag_job(
+            job_id, repo_url, f"{branch}@{commit_hash[:7]}", deadline
+        )
+
+    @staticmethod
+    async def _settle_rag_index_wait(rag_index_ready: asyncio.Task) -> None:
+        """Stop waiting for indexing once the analysis is done and log the outcome.
+
+        Indexing failures no longer fail the task: the analysis already ran,
+        without RAG context if the index was not ready in time.
+        """
+        if not rag_index_ready.done():
+            LOGGER.info("RAG indexing still in progress after analysis — not waiting")
+            rag_index_ready.cancel()
+        await asyncio.wait([rag_index_ready])
+        if rag_index_ready.cancelled():
+            return
+        exc = rag_index_ready.exception()
+        if exc is not None:
+            LOGGER.warning("RAG index unavailable for this analysis: %s", exc)
 
     def _trigger_delta_indexing(
-        self, repo_url: str, branch: str, commit_hash: str
+        self,
+        repo_url: str,
+        branch: str,
+        commit_hash: str,
+        submitted_job_ids: Optional[list[str]] = None,
     ) -> None:
-        """Fire-and-forget delta indexing. Errors are logged but do not propagate."""
+        """Fire-and-forget delta indexing. Errors are logged but do not propagate.
+
+        Skipped while an indexing job submitted for this task is still
+        running: it already indexes the commit.
+        """
         try:
+            for job_id in submitted_job_ids or ():
+                if not self.rag_indexer_trigger.get_job_status(job_id).is_terminal:
+                    LOGGER.info(
+                        "Indexing job %s still running for %s@%s — "
+                        "skipping delta trigger",
+                        job_id,
+                        repo_url,
+                        commit_hash[:7],
+                    )
+                    return
             if self.rag_index_status.is_commit_indexed(repo_url, branch, commit_hash):
                 LOGGER.info(
                     "Commit %s already indexed for %s@%s — skipping delta trigger",
@@ -179,8 +279,24 @@ class AnalyseCodeUseCase:
         return content
 
     async def execute(self, task_id: str) -> Task:
+        # Every node and external call of this task records into one collector,
+        # published even when the task fails
+        scan_metrics = ScanMetrics(task_id)
+        try:
+            with scan_metrics.activate():
+                return await self._execute(task_id)
+        finally:
+            if self.metrics_emitter is not None:
+                self.metrics_emitter.emit(scan_metrics)
+
+    async def _execute(self, task_id: str) -> Task:
         LOGGER.info("Executing analyse code use case with task id %s", task_id)
-        task = self.task_repository.get_task(task_id)
+        deadline = (
+            time.monotonic() + self.task_time_budget_s
+            if self.task_time_budget_s
+            else None
+        )
+        task = await asyncio.to_thread(self.task_repository.get_task, task_id)
 
         if not task.branch:
             raise ValueError(
@@ -189,12 +305,22 @@ class AnalyseCodeUseCase:
             )
 
         task.mark_in_progress()
-        self.task_repository.update_task(task)
+        await asyncio.to_thread(self.task_repository.update_task, task)
         LOGGER.debug("Marking task %s as in progress", task_id)
 
         scan_mode = self._normalize_scan_mode(task.args.get("scan_mode"))
-        await self._ensure_rag_index(
-            task.repository_url, task.branch, task.commit_hash, scan_mode
+        # Indexing waits run concurrently with file retrieval; the agent's RAG
+        # step awaits this task only when it needs chunks (bounded wait).
+        submitted_jobs: list[asyncio.Future] = []
+        rag_index_ready = asyncio.create_task(
+            self._ensure_rag_index(
+                task.repository_url,
+                task.branch,
+                task.commit_hash,
+                scan_mode,
+                deadline,
+                submitted_jobs,
+            )
         )
 
         analysis_args = {**task.args, "scan_mode": scan_mode}
@@ -223,33 +349,61 @@ class AnalyseCodeUseCase:
                 files_content="",
             ),
             metadata={
+                "task_id": task_id,
                 "repository_url": task.repository_url,
                 "commit_hash": task.commit_hash,
                 "branch": task.branch,
                 "scan_mode": scan_mode,
                 "scan_ref": task.branch,
                 "extra_args": analysis_args,
+                "rag_index_ready": rag_index_ready,
             },
         )
         LOGGER.debug("Sending message to agent: %s", message.content)
-        agent_response = await self.agent.invoke(message)
+        try:
+            agent_response = await self.agent.invoke(message)
+        finally:
+            await self._settle_rag_index_wait(rag_index_ready)
         LOGGER.debug("Agent response: %s", agent_response.content)
-        self._trigger_delta_indexing(task.repository_url, task.branch, task.commit_hash)
+        submitted_job_ids = await self._submitted_job_ids(submitted_jobs)
+        # Finalize phase: the delta indexing trigger runs alongside the
+        # notifications and the DynamoDB status update instead of before them.
+        delta_indexing = asyncio.create_task(
+            asyncio.to_thread(
+                self._trigger_delta_indexing,
+                task.repository_url,
+                task.branch,
+                task.commit_hash,
+                submitted_job_ids,
+            )
+        )
+        try:
+            return await self._finalize(task, task_id, agent_response)
+        finally:
+            await delta_indexing
+
+    async def _finalize(
+        self, task: Task, task_id: str, agent_response: AgentMessage
+    ) -> Task:
+        """Send notifications for the agent result and persist the final task state."""
         agent_response.content = self.__sanitize_content_response(
             agent_response.content
         )
         LOGGER.debug("Sanitized agent response: %s", agent_response.content)
         result = json.loads(agent_response.content)
         LOGGER.info("Result: %s", result)
+        # Only the report fields; the rest (e.g. token usage) is stored as is
         result_dto = ResultDto(
             **{
-                **result,
+                **{k: v for k, v in result.items() if k in _RESULT_DTO_FIELDS},
                 "source": task.source.value,
                 "args": task.args,
                 "commit_hash": task.commit_hash,
             }
         )
-        notifications_results = self.notification_service.send_notifications(result_dto)
+        notifications_results = (
+            await self.notification_service.send_notifications_async(result_dto)
+        )
         # Remove issues from result if exists
         if "issues" in result:
             result.pop("issues")
@@ -271,4 +425,4 @@ class AnalyseCodeUseCase:
         except Exception as e:
             LOGGER.error("Error marking task %s as %s: %s", task_id, status, e)
             task.mark_error()
-        return self.task_repository.update_task(task)
+        return await asyncio.to_thread(self.task_repository.update_task, task)
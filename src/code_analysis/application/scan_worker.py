@@ -0,0 +1,166 @@
+"""Long-running worker that processes many scan tasks per container.
+
+The worker pulls task IDs from an ``ITaskQueuePort`` and runs up to
+``concurrency`` scans at once through one ``AnalyseCodeUseCase``, so the
+compiled workflow, model clients, MCP client and AWS clients are built once
+per container instead of once per scan.
+
+``request_stop()`` (wired to SIGTERM by ``main``) starts a graceful drain:
+no new tasks are pulled, tasks received but not started are released back to
+the queue, and running scans finish (or are cancelled after
+``drain_timeout_s`` and released).
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
+
+from code_analysis.domain.ports.task_queue_port import ITaskQueuePort, QueuedTask
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ScanWorker:
+    """Pulls scan task IDs from a queue and executes them concurrently.
+
+    Args:
+        queue (ITaskQueuePort): Origen de los IDs de tarea.
+        execute (Callable): Ejecuta una tarea por ID (``AnalyseCodeUseCase.execute``).
+        concurrency (int): Escaneos simultáneos como máximo.
+        poll_wait_s (float): Espera máxima de cada lectura de la cola; también
+            acota cuánto tarda en atenderse ``request_stop``.
+        heartbeat_s (float): Intervalo para extender la visibilidad de las
+            tareas en curso.
+        drain_timeout_s (float): Tiempo máximo de espera por los escaneos en
+            curso tras ``request_stop``; ``None`` espera sin límite.
+        stop_when_empty (bool): Termina cuando la cola está vacía y no hay
+            escaneos en curso (colas locales).
+    """
+
+    def __init__(
+        self,
+        queue: ITaskQueuePort,
+        execute: Callable[[str], Awaitable[Any]],
+        concurrency: int = 2,
+        poll_wait_s: float = 20.0,
+        heartbeat_s: float = 60.0,
+        drain_timeout_s: Optional[float] = None,
+        stop_when_empty: bool = False,
+    ):
+        self.queue = queue
+        self.execute = execute
+        self.concurrency = max(1, concurrency)
+        self.poll_wait_s = poll_wait_s
+        self.heartbeat_s = heartbeat_s
+        self.drain_timeout_s = drain_timeout_s
+        self.stop_when_empty = stop_when_empty
+        self.completed = 0
+        self.failed = 0
+        self._stopping = asyncio.Event()
+        self._running: dict[asyncio.Task, QueuedTask] = {}
+
+    def request_stop(self) -> None:
+        """Stop pulling tasks and drain the running ones."""
+        if not self._stopping.is_set():
+            LOGGER.info(
+                "Worker stop requested — draining %d running scan(s)",
+                len(self._running),
+            )
+        self._stopping.set()
+
+    async def run(self) -> None:
+        LOGGER.info("Worker started (concurrency=%d)", self.concurrency)
+        started = time.monotonic()
+        while not self._stopping.is_set():
+            free = self.concurrency - len(self._running)
+            if free <= 0:
+                await self._wait_for_slot()
+                continue
+            received = await asyncio.to_thread(
+                self.queue.receive, free, self.poll_wait_s
+            )
+            if self._stopping.is_set():
+                await self._release(received)
+                break
+            for queued in received:
+                self._start(queued)
+            if not received and not self._running and self.stop_when_empty:
+                LOGGER.info("Queue empty — stopping worker")
+                break
+        await self._drain()
+        LOGGER.info(
+            "Worker stopped after %.1fs: %d completed, %d failed",
+            time.monotonic() - started,
+            self.completed,
+            self.failed,
+        )
+
+    def _start(self, queued: QueuedTask) -> None:
+        LOGGER.info("Starting scan task %s", queued.task_id)
+        task = asyncio.create_task(self._process(queued), name=queued.task_id)
+        self._running[task] = queued
+        task.add_done_callback(self._running.pop)
+
+    async def _wait_for_slot(self) -> None:
+        stop = asyncio.create_task(self._stopping.wait())
+        try:
+            await asyncio.wait(
+                [*self._running, stop], return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            stop.cancel()
+
+    async def _process(self, queued: QueuedTask) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(queued))
+        started = time.monotonic()
+        try:
+            await self.execute(queued.task_id)
+        except asyncio.CancelledError:
+            LOGGER.warning("Scan task %s cancelled — releasing", queued.task_id)
+            await asyncio.to_thread(self.queue.release, queued)
+            raise
+        except Exception:
+            self.failed += 1
+            LOGGER.exception(
+                "Scan task %s failed after %.1fs — left for redelivery",
+                queued.task_id,
+                time.monotonic() - started,
+            )
+            return
+        finally:
+            heartbeat.cancel()
+        self.completed += 1
+        await asyncio.to_thread(self.queue.ack, queued)
+        LOGGER.info(
+            "Scan task %s done in %.1fs", queued.task_id, time.monotonic() - started
+        )
+
+    async def _heartbeat(self, queued: QueuedTask) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_s)
+            try:
+                await asyncio.to_thread(self.queue.heartbeat, queued)
+            except Exception:
+                LOGGER.warning(
+                    "Heartbeat failed for task %s", queued.task_id, exc_info=True
+                )
+
+    async def _release(self, received: list[QueuedTask]) -> None:
+        for queued in received:
+            LOGGER.info("Releasing unstarted task %s", queued.task_id)
+            await asyncio.to_thread(self.queue.release, queued)
+
+    async def _drain(self) -> None:
+        if not self._running:
+            return
+        running = list(self._running)
+        _, pending = await asyncio.wait(running, timeout=self.drain_timeout_s)
+        if pending:
+            LOGGER.warning(
+                "Drain timeout — cancelling %d running scan(s)", len(pending)
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.wait(pending)
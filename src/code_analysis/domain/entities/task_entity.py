@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, FrozenSet, Optional, Set
 
 
 class TaskSource(Enum):
@@ -30,6 +30,35 @@ class Task:
     status: TaskStatus
     source: TaskSource
     branch: Optional[str] = field(default=None)
+    # Fields assigned since the task was loaded or last saved; repositories use
+    # them to write only what changed. In-place edits of result/args are not
+    # tracked: reassign the dict instead.
+    _dirty: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _persisted_status: Optional[TaskStatus] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self.mark_clean()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        dirty = self.__dict__.get("_dirty")
+        if dirty is not None and not name.startswith("_"):
+            dirty.add(name)
+
+    @property
+    def dirty_fields(self) -> FrozenSet[str]:
+        return frozenset(self._dirty)
+
+    @property
+    def persisted_status(self) -> Optional[TaskStatus]:
+        """Status as last read from or written to the repository."""
+        return self._persisted_status
+
+    def mark_clean(self):
+        self._dirty.clear()
+        self._persisted_status = self.status
 
     @property
     def repository_url(self) -> str:
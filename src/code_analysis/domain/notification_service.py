@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Any, Dict
 
@@ -44,63 +45,85 @@ class NotificationService:
             )
         return normalized_issues
 
+    def __report_dto(self, result_dto: ResultDto) -> ResultDto:
+        return ResultDto(
+            status=result_dto.status,
+            issues=self.__normalize_issues(result_dto.commit_hash, result_dto.issues),
+            source=result_dto.source,
+            args=result_dto.args,
+            commit_hash=result_dto.commit_hash,
+            scaned_files=result_dto.scaned_files,
+        )
+
+    def __create_report(self, report_dto: ResultDto) -> str:
+        report_result = self.report_repository.create_report(report_dto)
+        LOGGER.info("Report result: %s", report_result)
+        return report_result["reportURL"]
+
+    def __notify_bitbucket(
+        self, report_dto: ResultDto, report_url: str
+    ) -> Dict[str, Any]:
+        try:
+            bitbucket_code_insights_input_dto = BitbucketCodeInsightsInputDto(
+                reportURL=report_url,
+                workspaceId=report_dto.args.get("bitbucket_workspace"),
+                commitHash=report_dto.args.get("bitbucket_commit"),
+                repoSlug=report_dto.args.get("bitbucket_repo_slug"),
+                status=report_dto.status,
+                annotations=report_dto.issues,
+                scanMode=report_dto.args.get("scan_mode", "commit"),
+            )
+            create_code_insights = self.bitbucket_repository.create_code_insights_report
+            bitbucket_result = create_code_insights(bitbucket_code_insights_input_dto)
+            code_insights_url = bitbucket_result.get("codeInsightsURL")
+            if not code_insights_url:
+                raise ValueError("Code Insights response missing codeInsightsURL")
+            return {"code_insights_url": code_insights_url}
+        except Exception as exc:
+            LOGGER.warning(
+                "Bitbucket Code Insights notification failed; keeping HTML report: %s",
+                exc,
+                exc_info=True,
+            )
+            return {"code_insights_error": str(exc)}
+
+    def __notify_github(self, report_dto: ResultDto) -> Dict[str, Any]:
+        github_result = self.github_repository.create_github_issue(report_dto)
+        return {"html_url": github_result["htmlURL"]}
+
     def send_notifications(self, result_dto: ResultDto) -> Dict[str, Any]:
         if result_dto.status == AnalysisStatus.COMPLETED.value:
             return {}
-        notifications_results = {}
-        issues = self.__normalize_issues(result_dto.commit_hash, result_dto.issues)
-        report_result = self.report_repository.create_report(
-            ResultDto(
-                status=result_dto.status,
-                issues=issues,
-                source=result_dto.source,
-                args=result_dto.args,
-                commit_hash=result_dto.commit_hash,
-                scaned_files=result_dto.scaned_files,
+        report_dto = self.__report_dto(result_dto)
+        notifications_results = {"report_url": self.__create_report(report_dto)}
+        if result_dto.source == TaskSource.BITBUCKET.value:
+            notifications_results.update(
+                self.__notify_bitbucket(report_dto, notifications_results["report_url"])
             )
-        )
-        LOGGER.info("Report result: %s", report_result)
-        notifications_results["report_url"] = report_result["reportURL"]
+        elif result_dto.source == TaskSource.GITHUB.value:
+            notifications_results.update(self.__notify_github(report_dto))
+        LOGGER.info("Notifications results: %s", notifications_results)
+        return notifications_results
+
+    async def send_notifications_async(self, result_dto: ResultDto) -> Dict[str, Any]:
+        """Like ``send_notifications`` but without blocking the event loop.
+
+        Repository calls are blocking boto3 invocations and run in worker
+        threads. The GitHub issue is only created once the report exists, so
+        a task retried after a report failure does not open a second issue.
+        """
+        if result_dto.status == AnalysisStatus.COMPLETED.value:
+            return {}
+        report_dto = self.__report_dto(result_dto)
+        report_url = await asyncio.to_thread(self.__create_report, report_dto)
+        notifications_results = {"report_url": report_url}
         if result_dto.source == TaskSource.BITBUCKET.value:
-            try:
-                bitbucket_code_insights_input_dto = BitbucketCodeInsightsInputDto(
-                    reportURL=report_result["reportURL"],
-                    workspaceId=result_dto.args.get("bitbucket_workspace"),
-                    commitHash=result_dto.args.get("bitbucket_commit"),
-                    repoSlug=result_dto.args.get("bitbucket_repo_slug"),
-                    status=result_dto.status,
-                    annotations=issues,
-                    scanMode=result_dto.args.get("scan_mode", "commit"),
-                )
-                create_code_insights = (
-                    self.bitbucket_repository.create_code_insights_report
-                )
-                bitbucket_result = create_code_insights(
-                    bitbucket_code_insights_input_dto
-                )
-                code_insights_url = bitbucket_result.get("codeInsightsURL")
-                if not code_insights_url:
-                    raise ValueError("Code Insights response missing codeInsightsURL")
-                notifications_results["code_insights_url"] = code_insights_url
-            except Exception as exc:
-                LOGGER.warning(
-                    "Bitbucket Code Insights notification failed; "
-                    "keeping HTML report: %s",
-                    exc,
-                    exc_info=True,
-                )
-                notifications_results["code_insights_error"] = str(exc)
+            notifications_results.update(
+                await asyncio.to_thread(self.__notify_bitbucket, report_dto, report_url)
+            )
         elif result_dto.source == TaskSource.GITHUB.value:
-            github_result = self.github_repository.create_github_issue(
-                ResultDto(
-                    status=result_dto.status,
-                    issues=issues,
-                    source=result_dto.source,
-                    args=result_dto.args,
-                    commit_hash=result_dto.commit_hash,
-                    scaned_files=result_dto.scaned_files,
-                )
+            notifications_results.update(
+                await asyncio.to_thread(self.__notify_github, report_dto)
             )
-            notifications_results["html_url"] = github_result["htmlURL"]
         LOGGER.info("Notifications results: %s", notifications_results)
         return notifications_results
@@ -0,0 +1,39 @@
+"""Port for caching expert findings by content address."""
+
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+def expert_cache_key(
+    expert_name: str, prompt: str, model_id: str, files_block: str
+) -> str:
+    """Return the content address for an expert run.
+
+    The key covers the expert, the exact expert prompt (so prompt edits
+    invalidate it), the model id and the formatted file block sent to the
+    model. RAG background context is deliberately not part of the key.
+    """
+    parts = [
+        expert_name,
+        hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        model_id,
+        hashlib.sha256(files_block.encode("utf-8")).hexdigest(),
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class IExpertResultCachePort(ABC):
+    """Key/value store for expert issues (``ExpertIssue.to_dict()`` lists).
+
+    Implementations must be safe to call from worker threads and should
+    degrade gracefully: ``get`` returns None and ``put`` is a no-op on error.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        """Return cached issues for key, or None on a miss."""
+
+    @abstractmethod
+    def put(self, key: str, issues: list[dict[str, Any]]) -> None:
+        """Store issues under key (an empty list is a valid result)."""
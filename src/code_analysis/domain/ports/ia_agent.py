@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any, Dict, Generic, List, Optional, TypeVar, Union
@@ -55,12 +56,21 @@ class AbstractAgent(ABC, Generic[T, M]):
         self._tools_factory = tools_factory
         self._model = None
         self._tools = None
+        self._init_lock: Optional[asyncio.Lock] = None
 
     @abstractmethod
     async def _initialize(self, model: M, tools: List[T]) -> None:
         raise NotImplementedError
 
     async def __ensure_initialized(self) -> None:
+        # Concurrent first invocations (worker mode) must not create the
+        # tools and model twice
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        async with self._init_lock:
+            await self.__initialize_once()
+
+    async def __initialize_once(self) -> None:
         if self._tools is None:
             if isinstance(self._tools_factory, AsyncAgentToolsFactory):
                 self._tools = await self._tools_factory.create_tools()
@@ -9,8 +9,10 @@ class IRagContextPort(ABC):
 
     Usage per job:
         1. Call configure(repository_url, branch) once before any search.
-        2. Call search() as many times as needed.
-        3. Call close() to release resources (temp files, etc.).
+        2. Optionally call prepare() (e.g. in a background thread) to fetch
+           the index before the first search needs it.
+        3. Call search() / search_many() as many times as needed.
+        4. Call close() to release resources (temp files, etc.).
     """
 
     @abstractmethod
@@ -35,6 +37,25 @@ class IRagContextPort(ABC):
             Returns empty list on any error (graceful degradation).
         """
 
+    def prepare(self) -> None:
+        """Fetch the index and open resources ahead of the first search.
+
+        Must be called after configure(). Adapters that download or open
+        anything lazily should override this; errors must not be raised
+        (search() degrades gracefully instead). The default does nothing.
+        """
+
+    def search_many(self, queries: list[str], k: int) -> list[list[dict[str, Any]]]:
+        """Search several queries at once.
+
+        Adapters should override this to embed all queries in a single
+        request. The default implementation calls search() per query.
+
+        Returns:
+            One result list per query, in the same order as ``queries``.
+        """
+        return [self.search(query, k) for query in queries]
+
     @abstractmethod
     def close(self) -> None:
         """Release resources (e.g. delete temporary index.db file)."""
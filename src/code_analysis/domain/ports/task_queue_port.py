@@ -0,0 +1,30 @@
+"""Port for the queue a long-running worker pulls scan task IDs from."""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class QueuedTask:
+    """A task ID received from the queue plus the handle needed to settle it."""
+
+    task_id: str
+    receipt: Any = None
+
+
+class ITaskQueuePort(ABC):
+    @abstractmethod
+    def receive(self, max_tasks: int, wait_s: float) -> list[QueuedTask]:
+        """Return up to max_tasks tasks, waiting at most wait_s for the first."""
+
+    @abstractmethod
+    def ack(self, task: QueuedTask) -> None:
+        """Remove a processed task from the queue."""
+
+    @abstractmethod
+    def release(self, task: QueuedTask) -> None:
+        """Hand a received but unprocessed task back to the queue."""
+
+    def heartbeat(self, task: QueuedTask) -> None:
+        """Keep a task that is still being processed from being redelivered."""
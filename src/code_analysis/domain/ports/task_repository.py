@@ -3,6 +3,10 @@ from abc import ABC, abstractmethod
 from code_analysis.domain.entities.task_entity import Task
 
 
+class TaskStatusConflictError(RuntimeError):
+    """The stored task status changed since the task was read."""
+
+
 class ITaskRepository(ABC):
     @abstractmethod
     def get_task(self, task_id: str) -> Task:
@@ -1,12 +1,19 @@
-import json
 import logging
-from datetime import datetime
+import math
+import uuid
+from collections.abc import Mapping
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Any
 
+import botocore.exceptions
 from dynamodb_json import json_util as dynamo_json
 
 from code_analysis.domain.entities.task_entity import Task, TaskSource, TaskStatus
-from code_analysis.domain.ports.task_repository import ITaskRepository
+from code_analysis.domain.ports.task_repository import (
+    ITaskRepository,
+    TaskStatusConflictError,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -42,64 +49,113 @@ class DynamoTaskRepository(ITaskRepository):
         )
 
     def update_task(self, task: Task) -> Task:
-        LOGGER.debug("Updating task: %s", task)
-        update_expression = (
-            "set #scan_result = :scan_result, "
-            "#args = :args, "
-            "#hint_id = :hint_id, "
-            "#scaned_files = :scaned_files, "
-            "#created_at = :created_at, "
-            "#updated_at = :updated_at, "
-            "#status = :status, "
-            "#source = :source"
-        )
-        expression_attribute_names = {
-            "#scan_result": "scan_result",
-            "#args": "args",
-            "#hint_id": "hint_id",
-            "#scaned_files": "scaned_files",
-            "#created_at": "created_at",
-            "#updated_at": "updated_at",
-            "#status": "status",
-            "#source": "source",
-        }
-
-        created_at = task.created_at
-        updated_at = task.updated_at
+        """Write the attributes changed since the task was read or last saved.
 
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-        if isinstance(updated_at, str):
-            updated_at = datetime.fromisoformat(updated_at)
+        Values are marshalled straight into DynamoDB attribute values. Status
+        changes are conditional on the status last read, so a concurrent
+        writer is reported as ``TaskStatusConflictError`` instead of being
+        silently overwritten.
+        """
+        changed = [name for name in _ATTRIBUTES if name in task.dirty_fields]
+        if not changed:
+            LOGGER.debug("Task %s unchanged — skipping update", task.id)
+            return task
 
-        LOGGER.debug("Created at: %s", created_at)
-        LOGGER.debug("Updated at: %s", updated_at)
-        LOGGER.debug("Result: %s", task.result)
-        LOGGER.debug("Args: %s", task.args)
-        LOGGER.debug("Hint id: %s", task.hint_id)
-        LOGGER.debug("Scaned files: %s", task.scaned_files)
-        LOGGER.debug("Status: %s", task.status)
-        LOGGER.debug("Source: %s", task.source)
-        scan_result = dynamo_json.dumps(task.result)
-        scan_args = dynamo_json.dumps(task.args)
-        expression_attribute_values = {
-            ":scan_result": {"M": json.loads(scan_result)},
-            ":args": {"M": json.loads(scan_args)},
-            ":hint_id": {"S": task.hint_id},
-            ":scaned_files": {"N": str(task.scaned_files)},
-            ":created_at": {"S": created_at.isoformat()},
-            ":updated_at": {"S": updated_at.isoformat()},
-            ":status": {"S": task.status.value},
-            ":source": {"S": task.source.value},
-        }
+        assignments = []
+        expression_attribute_names = {}
+        expression_attribute_values = {}
+        for field_name in changed:
+            attribute = _ATTRIBUTES[field_name]
+            assignments.append(f"#{attribute} = :{attribute}")
+            expression_attribute_names[f"#{attribute}"] = attribute
+            expression_attribute_values[f":{attribute}"] = _attribute_value(
+                task, field_name
+            )
+        update_kwargs = {}
+        if "status" in changed and task.persisted_status is not None:
+            update_kwargs["ConditionExpression"] = (
+                "attribute_not_exists(#status) OR #status = :expected_status"
+            )
+            expression_attribute_values[":expected_status"] = {
+                "S": task.persisted_status.value
+            }
+        update_expression = "set " + ", ".join(assignments)
         LOGGER.debug("Update expression: %s", update_expression)
         LOGGER.debug("Expression attribute names: %s", expression_attribute_names)
-        LOGGER.debug("Expression attribute values: %s", expression_attribute_values)
-        self.dynamo_client.update_item(
-            TableName=self.table_name,
-            Key={"scan_id": {"S": task.id}},
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=expression_attribute_values,
-        )
+        try:
+            self.dynamo_client.update_item(
+                TableName=self.table_name,
+                Key={"scan_id": {"S": task.id}},
+                UpdateExpression=update_expression,
+                ExpressionAttributeNames=expression_attribute_names,
+                ExpressionAttributeValues=expression_attribute_values,
+                **update_kwargs,
+            )
+        except botocore.exceptions.ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") == _CONDITION_FAILED:
+                raise TaskStatusConflictError(
+                    f"Task {task.id} is no longer {task.persisted_status.value}; "
+                    f"refusing to set it to {task.status.value}"
+                ) from exc
+            raise
+        task.mark_clean()
         return task
+
+
+# Task field -> DynamoDB attribute written by update_task
+_ATTRIBUTES = {
+    "result": "scan_result",
+    "args": "args",
+    "hint_id": "hint_id",
+    "scaned_files": "scaned_files",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "status": "status",
+    "source": "source",
+}
+
+_CONDITION_FAILED = "ConditionalCheckFailedException"
+
+
+def _attribute_value(task: Task, field_name: str) -> dict[str, Any]:
+    value = getattr(task, field_name)
+    if field_name in ("created_at", "updated_at"):
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return {"S": value.isoformat()}
+    if field_name in ("status", "source"):
+        return {"S": value.value}
+    return marshal_attribute(value)
+
+
+def marshal_attribute(value: Any) -> dict[str, Any]:
+    """Convert a Python value to a DynamoDB attribute value.
+
+    Equivalent to ``dynamodb_json.dumps`` followed by ``json.loads`` (the
+    previous path) without serializing to a JSON string and parsing it back.
+    """
+    if value is None:
+        return {"NULL": True}
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, (int, Decimal)):
+        return {"N": str(value)}
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise TypeError(f"Non-finite number {value!r} is not supported")
+        return {"N": repr(value)}
+    if isinstance(value, Mapping):
+        return {"M": {str(k): marshal_attribute(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return {"L": [marshal_attribute(item) for item in value]}
+    if isinstance(value, datetime):
+        return {"S": value.strftime("%Y-%m-%dT%H:%M:%S.%f")}
+    if isinstance(value, date):
+        return {"S": value.strftime("%Y-%m-%d")}
+    if isinstance(value, uuid.UUID):
+        return {"S": value.hex}
+    raise TypeError(
+        f"Object of type {value.__class__.__name__} is not DynamoDB serializable"
+    )
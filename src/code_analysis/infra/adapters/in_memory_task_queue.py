@@ -0,0 +1,47 @@
+"""In-process task queue: local runs from a file of task IDs, and tests."""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable
+from pathlib import Path
+
+from code_analysis.domain.ports.task_queue_port import ITaskQueuePort, QueuedTask
+
+
+class InMemoryTaskQueue(ITaskQueuePort):
+    def __init__(self, task_ids: Iterable[str] = ()):
+        self._pending: deque[str] = deque(task_ids)
+        self._condition = threading.Condition()
+        self.acked: list[str] = []
+
+    @classmethod
+    def from_file(cls, path: str) -> "InMemoryTaskQueue":
+        """One task ID per line; blank lines and ``#`` comments are skipped."""
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        return cls(
+            line.strip() for line in lines if line.strip() and not line.startswith("#")
+        )
+
+    def put(self, task_id: str) -> None:
+        with self._condition:
+            self._pending.append(task_id)
+            self._condition.notify()
+
+    def receive(self, max_tasks: int, wait_s: float) -> list[QueuedTask]:
+        deadline = time.monotonic() + wait_s
+        with self._condition:
+            while not self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._condition.wait(remaining)
+            count = min(max_tasks, len(self._pending))
+            return [QueuedTask(self._pending.popleft()) for _ in range(count)]
+
+    def ack(self, task: QueuedTask) -> None:
+        with self._condition:
+            self.acked.append(task.task_id)
+
+    def release(self, task: QueuedTask) -> None:
+        self.put(task.task_id)
@@ -15,8 +15,10 @@ LOGGER = logging.getLogger(__name__)
 
 
 class LambdaBitbucketRepository(IBitbucketRepository):
-    def __init__(self, function_name: str):
-        self.lambda_client = boto3.client("lambda")
+    def __init__(self, function_name: str, lambda_client: Any = None):
+        self.lambda_client = (
+            lambda_client if lambda_client is not None else boto3.client("lambda")
+        )
         self.function_name = function_name
 
     def create_code_insights_report(
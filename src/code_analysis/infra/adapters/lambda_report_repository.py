@@ -13,8 +13,10 @@ LOGGER = logging.getLogger(__name__)
 
 
 class LambdaReportRepository(IReportRepository):
-    def __init__(self, function_name: str):
-        self.lambda_client = boto3.client("lambda")
+    def __init__(self, function_name: str, lambda_client: Any = None):
+        self.lambda_client = (
+            lambda_client if lambda_client is not None else boto3.client("lambda")
+        )
         self.function_name = function_name
 
     def create_report(self, result_dto: ResultDto) -> Dict[str, Any]:
@@ -1,15 +1,18 @@
+"""LangChain adapters: chat model factory, MCP tools factory and agent.
+
+Provider SDKs (``langchain_openai``, ``langchain_anthropic``,
+``langchain_google_genai``) are imported inside
+``LangchainAgentModelFactory.create_model`` for the configured provider only,
+and ``langchain.agents`` when the agent is first initialized: each of them
+takes hundreds of milliseconds to import and a run uses a single provider.
+"""
+
 import logging
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from langchain.agents import create_agent
-from langchain_anthropic import ChatAnthropic
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.tools import BaseTool
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_openai import ChatOpenAI
-from langfuse.langchain import CallbackHandler
 
 from code_analysis.domain.ports.ia_agent import (
     AbstractAgent,
@@ -20,6 +23,10 @@ from code_analysis.domain.ports.ia_agent import (
     AsyncAgentToolsFactory,
 )
 
+if TYPE_CHECKING:
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+    from langfuse.langchain import CallbackHandler
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -46,7 +53,7 @@ class AIProvider(Enum):
 class AsyncMCPToolsFactory(AsyncAgentToolsFactory[BaseTool]):
     """Factory asíncrono - inicializa tools desde MCP client"""
 
-    def __init__(self, mcp_client: MultiServerMCPClient):
+    def __init__(self, mcp_client: "MultiServerMCPClient"):
         self._mcp_client = mcp_client
 
     @staticmethod
@@ -103,6 +110,8 @@ class LangchainAgentModelFactory(AgentModelFactory[BaseChatModel]):
             base_url,
         )
         if provider == AIProvider.OPENAI:
+            from langchain_openai import ChatOpenAI
+
             # Custom OpenAI-compatible endpoints expose the Chat Completions
             # API, not the Responses API, so use_responses_api must be False.
             if base_url is not None:
@@ -120,6 +129,8 @@ class LangchainAgentModelFactory(AgentModelFactory[BaseChatModel]):
         elif provider == AIProvider.OPENROUTER:
             # OpenRouter is OpenAI-compatible but only supports Chat Completions,
             # never the Responses API.
+            from langchain_openai import ChatOpenAI
+
             return ChatOpenAI(
                 model=self._ai_model,
                 api_key=self._ai_api_key,
@@ -127,6 +138,8 @@ class LangchainAgentModelFactory(AgentModelFactory[BaseChatModel]):
                 use_responses_api=False,
             )
         elif provider == AIProvider.ANTHROPIC:
+            from langchain_anthropic import ChatAnthropic
+
             if base_url is not None:
                 return ChatAnthropic(
                     model=self._ai_model,
@@ -135,6 +148,8 @@ class LangchainAgentModelFactory(AgentModelFactory[BaseChatModel]):
                 )
             return ChatAnthropic(model=self._ai_model, api_key=self._ai_api_key)
         elif provider == AIProvider.GOOGLE:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
             if base_url is not None:
                 return ChatGoogleGenerativeAI(
                     model=self._ai_model,
@@ -152,7 +167,7 @@ class LangchainAgent(AbstractAgent[BaseTool, BaseChatModel]):
         system_prompt: str,
         model_factory: AgentModelFactory[BaseChatModel],
         tools_factory: AgentToolsFactory[BaseTool] | AsyncAgentToolsFactory[BaseTool],
-        langfuse_callback_handler: Optional[CallbackHandler],
+        langfuse_callback_handler: Optional["CallbackHandler"],
         langfuse_metadata: Optional[Dict[str, Any]],
     ):
         super().__init__(system_prompt, model_factory, tools_factory)
@@ -162,6 +177,8 @@ class LangchainAgent(AbstractAgent[BaseTool, BaseChatModel]):
 
     async def _initialize(self, model: BaseChatModel, tools: List[BaseTool]) -> None:
         if self.__agent is None:
+            from langchain.agents import create_agent
+
             self.__agent = create_agent(
                 system_prompt=self._system_prompt,
                 model=model,
@@ -0,0 +1,62 @@
+"""Cap on concurrent expert model calls within one workflow run.
+
+LangGraph's ``max_concurrency`` bounds graph nodes, but an expert node
+analysing a large commit fans out one model call per shard. A single
+``ModelCallLimiter`` shared by every expert of a workflow bounds those calls
+as a whole: at most ``expert_max_concurrency`` at once, and one at a time
+when the experts run sequentially.
+
+The compiled workflow is shared by every scan a worker runs, so the slots
+belong to a run rather than to the limiter: ``model_call_scope()`` (entered
+by ``LangGraphAgent`` around each invocation, like
+``ScanMetrics.activate()``) gives the run its own slots. Calls outside a
+scope share one set of slots per event loop.
+"""
+
+import asyncio
+import weakref
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+_RUN_SLOTS: ContextVar[dict["ModelCallLimiter", asyncio.Semaphore] | None] = ContextVar(
+    "model_call_slots", default=None
+)
+
+
+@contextmanager
+def model_call_scope() -> Iterator[None]:
+    """Give the workflow run started inside this block its own call slots."""
+    token = _RUN_SLOTS.set({})
+    try:
+        yield
+    finally:
+        _RUN_SLOTS.reset(token)
+
+
+class ModelCallLimiter:
+    """Bounds concurrent model calls across the experts of a workflow run."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._unscoped: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        slots = _RUN_SLOTS.get()
+        if slots is None:
+            slots = self._unscoped
+            key = asyncio.get_running_loop()
+        else:
+            key = self
+        semaphore = slots.get(key)
+        if semaphore is None:
+            semaphore = slots[key] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one call slot of the current run."""
+        async with self._semaphore():
+            yield
@@ -0,0 +1,205 @@
+"""LLM token usage and estimated cost per expert.
+
+``TokenUsage`` sums the ``usage_metadata`` LangChain normalizes across
+providers (input, output, and the cache reads/writes reported in
+``input_token_details``). ``PriceTable`` turns it into an estimated USD cost
+from per-model prices matched by model-id prefix, like the context profiles
+in ``token_budget``.
+
+The built-in prices are list prices in USD per million tokens and go stale;
+``TITVO_LLM_PRICES`` (read into ``WorkflowSettings``) overrides or extends
+them with a JSON object keyed by model-id prefix::
+
+    {"gpt-4.1": {"input": 2.0, "output": 8.0, "cached_input": 0.5}}
+
+Models without a price still report tokens, only ``cost_usd`` is left out.
+"""
+
+import json
+import logging
+import os
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, dataclass
+from typing import Any
+
+LOGGER = logging.getLogger(__name__)
+
+_PER_TOKENS = 1_000_000
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per million tokens for a model family.
+
+    Attributes:
+        input: Uncached input tokens.
+        output: Output tokens (reasoning tokens included).
+        cached_input: Input tokens read from the provider's prompt cache
+            (None: billed as ``input``).
+        cache_write: Input tokens written to the prompt cache (None: billed
+            as ``input``).
+    """
+
+    input: float
+    output: float
+    cached_input: float | None = None
+    cache_write: float | None = None
+
+
+# Ordered most-specific first; matched against the model id with any
+# "provider/" routing prefix (OpenRouter) removed.
+_MODEL_PRICES: list[tuple[str, ModelPrice]] = [
+    ("gpt-4.1-nano", ModelPrice(0.10, 0.40, cached_input=0.025)),
+    ("gpt-4.1-mini", ModelPrice(0.40, 1.60, cached_input=0.10)),
+    ("gpt-4.1", ModelPrice(2.00, 8.00, cached_input=0.50)),
+    ("gpt-4o-mini", ModelPrice(0.15, 0.60, cached_input=0.075)),
+    ("gpt-4o", ModelPrice(2.50, 10.00, cached_input=1.25)),
+    ("gpt-5-nano", ModelPrice(0.05, 0.40, cached_input=0.005)),
+    ("gpt-5-mini", ModelPrice(0.25, 2.00, cached_input=0.025)),
+    ("gpt-5", ModelPrice(1.25, 10.00, cached_input=0.125)),
+    ("o4-mini", ModelPrice(1.10, 4.40, cached_input=0.275)),
+    ("o3-mini", ModelPrice(1.10, 4.40, cached_input=0.55)),
+    ("o3", ModelPrice(2.00, 8.00, cached_input=0.50)),
+    ("claude-opus-4-5", ModelPrice(5.00, 25.00, 0.50, 6.25)),
+    ("claude-opus-4", ModelPrice(15.00, 75.00, 1.50, 18.75)),
+    ("claude-sonnet-4", ModelPrice(3.00, 15.00, 0.30, 3.75)),
+    ("claude-3-7-sonnet", ModelPrice(3.00, 15.00, 0.30, 3.75)),
+    ("claude-3-5-sonnet", ModelPrice(3.00, 15.00, 0.30, 3.75)),
+    ("claude-haiku-4-5", ModelPrice(1.00, 5.00, 0.10, 1.25)),
+    ("claude-3-5-haiku", ModelPrice(0.80, 4.00, 0.08, 1.00)),
+    ("gemini-2.5-pro", ModelPrice(1.25, 10.00, cached_input=0.125)),
+    ("gemini-2.5-flash-lite", ModelPrice(0.10, 0.40, cached_input=0.01)),
+    ("gemini-2.5-flash", ModelPrice(0.30, 2.50, cached_input=0.03)),
+]
+
+
+@dataclass
+class TokenUsage:
+    """Token counts summed over one or more model calls."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    @classmethod
+    def from_metadata(cls, usage: Any) -> "TokenUsage":
+        """One call's usage from a ``usage_metadata`` dict (empty if absent)."""
+        if not isinstance(usage, Mapping):
+            return cls(calls=1)
+        details = usage.get("input_token_details")
+        if not isinstance(details, Mapping):
+            details = {}
+        return cls(
+            calls=1,
+            input_tokens=int(usage.get("input_tokens") or 0),
+            output_tokens=int(usage.get("output_tokens") or 0),
+            cached_tokens=int(details.get("cache_read") or 0),
+            cache_write_tokens=int(details.get("cache_creation") or 0),
+        )
+
+    @classmethod
+    def from_message(cls, message: Any) -> "TokenUsage":
+        """One call's usage from a model response message."""
+        return cls.from_metadata(getattr(message, "usage_metadata", None))
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "TokenUsage":
+        return cls(**{key: int(data.get(key) or 0) for key in cls.__dataclass_fields__})
+
+    def add(self, other: "TokenUsage") -> None:
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cached_tokens += other.cached_tokens
+        self.cache_write_tokens += other.cache_write_tokens
+
+    @property
+    def cached_ratio(self) -> float | None:
+        """Share of input tokens read from the provider's prompt cache."""
+        if not self.input_tokens:
+            return None
+        return self.cached_tokens / self.input_tokens
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def price_overrides_from_env() -> tuple[tuple[str, ModelPrice], ...]:
+    """Prices from ``TITVO_LLM_PRICES`` (none when unset or invalid)."""
+    raw = os.getenv("TITVO_LLM_PRICES")
+    if not raw:
+        return ()
+    try:
+        return tuple(
+            (prefix, ModelPrice(**price)) for prefix, price in json.loads(raw).items()
+        )
+    except (TypeError, ValueError, AttributeError) as exc:
+        LOGGER.warning("Ignoring invalid TITVO_LLM_PRICES: %s", exc)
+        return ()
+
+
+class PriceTable:
+    """Per-model prices used to estimate the cost of ``TokenUsage``.
+
+    ``overrides`` take precedence over the built-in prices.
+    """
+
+    def __init__(self, overrides: Iterable[tuple[str, ModelPrice]] = ()):
+        # Longer prefixes first so overrides stay most-specific among themselves
+        custom = sorted(overrides, key=lambda item: -len(item[0]))
+        self._prices = [(p.lower(), price) for p, price in custom] + _MODEL_PRICES
+
+    def price(self, model_id: str) -> ModelPrice | None:
+        name = model_id.lower().rsplit("/", 1)[-1]
+        for prefix, price in self._prices:
+            if name.startswith(prefix):
+                return price
+        return None
+
+    def cost(self, model_id: str, usage: TokenUsage) -> float | None:
+        """Estimated USD cost of ``usage`` (None when the model has no price)."""
+        price = self.price(model_id)
+        if price is None:
+            return None
+        cached = price.input if price.cached_input is None else price.cached_input
+        write = price.input if price.cache_write is None else price.cache_write
+        # Providers count cache reads and writes within input_tokens
+        uncached = max(
+            0, usage.input_tokens - usage.cached_tokens - usage.cache_write_tokens
+        )
+        return (
+            uncached * price.input
+            + usage.cached_tokens * cached
+            + usage.cache_write_tokens * write
+            + usage.output_tokens * price.output
+        ) / _PER_TOKENS
+
+    def report(
+        self,
+        model_id: str,
+        experts: Mapping[str, TokenUsage],
+        consolidation: TokenUsage,
+    ) -> dict[str, Any]:
+        """Usage, prompt cache hit ratio and cost per expert, for
+        consolidation and in total."""
+        total = TokenUsage()
+        for usage in (*experts.values(), consolidation):
+            total.add(usage)
+
+        def entry(usage: TokenUsage) -> dict[str, Any]:
+            data: dict[str, Any] = usage.to_dict()
+            if usage.cached_ratio is not None:
+                data["cached_ratio"] = round(usage.cached_ratio, 4)
+            cost = self.cost(model_id, usage)
+            if cost is not None:
+                data["cost_usd"] = round(cost, 6)
+            return data
+
+        return {
+            "model": model_id,
+            "experts": {name: entry(usage) for name, usage in experts.items()},
+            "consolidation": entry(consolidation),
+            "total": entry(total),
+        }
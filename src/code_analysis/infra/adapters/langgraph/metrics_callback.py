@@ -0,0 +1,136 @@
+"""LangChain callback handler feeding the workflow into ``ScanMetrics``.
+
+Passed in the run config by ``LangGraphAgent``, so it sees every graph node
+(duration; failed when the node reports ``mcp_error`` or ``expert_errors``),
+every chat model call (duration, prompt and answer size, token usage and
+prompt cache reads from ``usage_metadata``) and every MCP tool call
+(duration, payload size), each attributed to the node it ran in.
+"""
+
+import time
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from shared.infra import metrics
+from shared.infra.metrics import ScanMetrics
+
+
+class ScanMetricsCallbackHandler(BaseCallbackHandler):
+    """Records graph nodes, LLM calls and MCP tool calls of one scan."""
+
+    # Timing must not include a hop through the callback thread pool
+    run_inline = True
+
+    def __init__(self, scan_metrics: ScanMetrics):
+        self._metrics = scan_metrics
+        self._open: dict[UUID, tuple[str, str, float, int]] = {}
+
+    def _start(self, run_id: UUID, kind: str, name: str, size: int = 0) -> None:
+        self._open[run_id] = (kind, name, time.perf_counter(), size)
+
+    def _end(self, run_id: UUID, ok: bool, size: int = 0, **fields: Any) -> None:
+        opened = self._open.pop(run_id, None)
+        if opened is None:
+            return
+        kind, name, started, sent = opened
+        self._metrics.record(
+            kind,
+            name,
+            time.perf_counter() - started,
+            ok=ok,
+            size_bytes=sent + size,
+            **fields,
+        )
+
+    # Graph nodes -----------------------------------------------------------
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # The node's own run, not routing functions or runnables inside it
+        if node is not None and kwargs.get("name") == node:
+            self._start(run_id, metrics.NODE, node)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        failed = isinstance(outputs, dict) and bool(
+            outputs.get("mcp_error") or outputs.get("expert_errors")
+        )
+        self._end(run_id, ok=not failed)
+
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._end(run_id, ok=False)
+
+    # LLM calls -------------------------------------------------------------
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[Any]],
+        *,
+        run_id: UUID,
+        metadata: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        node = (metadata or {}).get("langgraph_node", "unknown")
+        size = sum(len(str(m.content)) for batch in messages for m in batch)
+        self._start(run_id, metrics.LLM, node, size)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        size = 0
+        input_tokens = output_tokens = cached_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                size += len(generation.text or "")
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+                details = usage.get("input_token_details") or {}
+                cached_tokens += details.get("cache_read", 0) or 0
+        self._end(
+            run_id,
+            ok=True,
+            size=size,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cached_tokens=cached_tokens,
+        )
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._end(run_id, ok=False)
+
+    # MCP tools -------------------------------------------------------------
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        **kwargs: Any,
+    ) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        self._start(run_id, metrics.MCP_TOOL, name, len(input_str or ""))
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        content = getattr(output, "content", output)
+        self._end(run_id, ok=True, size=len(str(content)) if content else 0)
+
+    def on_tool_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._end(run_id, ok=False)
@@ -0,0 +1,107 @@
+"""Incremental parsing of streamed expert responses.
+
+Experts answer with ``{"issues": [{...}, {...}]}`` (optionally inside a
+markdown fence). ``IssueStreamParser`` is fed the response text as it
+streams and returns each issue object as soon as its closing brace arrives,
+so a response cut off at the output-token limit still yields every issue
+that was fully received.
+
+Design notes
+------------
+- Only the first ``"issues": [`` array is tracked; anything before it
+  (fences, prose) is ignored.
+- A small state machine tracks string literals and escapes so braces inside
+  strings (code snippets) do not confuse object boundaries.
+- Each closed object is decoded with ``json.loads``; objects that fail to
+  decode are skipped rather than aborting the stream.
+"""
+
+import json
+import logging
+import re
+from typing import Any
+
+LOGGER = logging.getLogger(__name__)
+
+_ISSUES_ARRAY_RE = re.compile(r'"issues"\s*:\s*\[')
+
+
+class IssueStreamParser:
+    """Extracts complete objects from a streamed ``issues`` array."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0  # next unscanned index in _buffer
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._object_start = -1
+
+    @property
+    def done(self) -> bool:
+        """Whether the closing ``]`` of the issues array was seen."""
+        return self._done
+
+    def feed(self, text: str) -> list[dict[str, Any]]:
+        """Consume a chunk of text; return the issue objects it completed."""
+        if self._done or not text:
+            return []
+        self._buffer += text
+
+        if not self._in_array:
+            match = _ISSUES_ARRAY_RE.search(self._buffer)
+            if match is None:
+                return []
+            self._in_array = True
+            self._pos = match.end()
+
+        completed: list[dict[str, Any]] = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._object_start = i
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    issue = self._decode(buffer[self._object_start : i + 1])
+                    if issue is not None:
+                        completed.append(issue)
+                    self._object_start = -1
+            elif char == "]" and self._depth == 0:
+                self._done = True
+                break
+        self._pos = len(buffer)
+
+        # Drop text that can no longer be part of an open object
+        if self._object_start >= 0:
+            keep_from = self._object_start
+        else:
+            keep_from = self._pos
+        self._buffer = buffer[keep_from:]
+        self._pos -= keep_from
+        if self._object_start >= 0:
+            self._object_start = 0
+        return completed
+
+    @staticmethod
+    def _decode(raw: str) -> dict[str, Any] | None:
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            LOGGER.debug("Skipping undecodable streamed issue: %s", raw[:200])
+            return None
+        return value if isinstance(value, dict) else None
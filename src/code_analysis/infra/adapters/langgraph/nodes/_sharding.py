@@ -0,0 +1,135 @@
+"""Token-budgeted sharding of commit files for map-reduce expert analysis.
+
+When an expert's files do not fit one prompt, BaseExpertNode splits them
+into shards that each fit the files budget, analyses the shards with
+concurrent model calls and concatenates the issues, instead of truncating
+every file down to a structural summary.
+
+Design notes
+------------
+- Files keep their commit order and are packed greedily, so files from the
+  same directory tend to land in the same shard.
+- A single file larger than a whole shard is split on line boundaries into
+  pieces labelled with their line range, so reported line numbers stay
+  absolute.
+- ``max_shards`` bounds the fan-out (and cost) per expert. Past it the files
+  are spread over ``max_shards`` shards and the usual truncation applies.
+"""
+
+import logging
+import math
+from collections.abc import Callable
+from dataclasses import dataclass
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_SHARDS = 8
+DEFAULT_SHARD_CONCURRENCY = 4
+# Head-room when sizing file pieces from a chars-per-token ratio
+_PIECE_FILL = 0.9
+
+
+@dataclass(frozen=True)
+class ShardPolicy:
+    """How an expert splits files that do not fit one prompt.
+
+    Attributes:
+        max_shards: Maximum prompts per expert; 1 disables sharding (files
+            are truncated to fit a single prompt).
+        concurrency: Maximum concurrent model calls per expert.
+    """
+
+    max_shards: int = DEFAULT_MAX_SHARDS
+    concurrency: int = DEFAULT_SHARD_CONCURRENCY
+
+
+def plan_shards(
+    files: list[dict[str, str]],
+    cost: Callable[[dict[str, str]], int],
+    budget_tokens: int,
+    max_shards: int,
+) -> list[list[dict[str, str]]]:
+    """Split files into shards whose formatted cost fits ``budget_tokens``.
+
+    Args:
+        files: Commit files (``path``/``content`` dicts) in commit order.
+        cost: Tokens a file takes once formatted (content + framing).
+        budget_tokens: Files budget of a single prompt.
+        max_shards: Upper bound on the number of shards.
+
+    Returns:
+        A single shard with all files when they already fit (or sharding is
+        disabled); otherwise one list of files or file pieces per shard.
+    """
+    costs = [cost(f) for f in files]
+    if max_shards <= 1 or budget_tokens <= 0 or sum(costs) <= budget_tokens:
+        return [files]
+
+    items: list[tuple[dict[str, str], int]] = []
+    for f, file_cost in zip(files, costs, strict=True):
+        if file_cost <= budget_tokens:
+            items.append((f, file_cost))
+            continue
+        framing = cost({**f, "content": ""})
+        for piece in _split_file(f, file_cost - framing, budget_tokens - framing):
+            items.append((piece, cost(piece)))
+
+    shards = _pack(items, budget_tokens, limit=None)
+    if len(shards) > max_shards:
+        total = sum(item_cost for _, item_cost in items)
+        LOGGER.warning(
+            "%d files need %d shards (max %d); truncating to fit",
+            len(files),
+            len(shards),
+            max_shards,
+        )
+        shards = _pack(items, math.ceil(total / max_shards), limit=max_shards)
+    return shards
+
+
+def _pack(
+    items: list[tuple[dict[str, str], int]], capacity: int, limit: int | None
+) -> list[list[dict[str, str]]]:
+    """Greedy in-order packing; the last allowed shard takes any remainder."""
+    shards: list[list[dict[str, str]]] = []
+    current: list[dict[str, str]] = []
+    used = 0
+    for item, item_cost in items:
+        room_left = limit is None or len(shards) < limit - 1
+        if current and used + item_cost > capacity and room_left:
+            shards.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += item_cost
+    if current:
+        shards.append(current)
+    return shards
+
+
+def _split_file(
+    f: dict[str, str], content_tokens: int, piece_tokens: int
+) -> list[dict[str, str]]:
+    """Split one file into line-range pieces of about ``piece_tokens`` each."""
+    content = f["content"]
+    chars_per_token = len(content) / max(1, content_tokens)
+    piece_chars = max(1, int(piece_tokens * chars_per_token * _PIECE_FILL))
+
+    pieces = []
+    lines = content.splitlines(keepends=True)
+    start = 0
+    while start < len(lines):
+        end, size = start, 0
+        while end < len(lines) and (
+            end == start or size + len(lines[end]) <= piece_chars
+        ):
+            size += len(lines[end])
+            end += 1
+        pieces.append(
+            {
+                "path": f["path"],
+                "content": "".join(lines[start:end]),
+                "lines": f"{start + 1}-{end}",
+            }
+        )
+        start = end
+    return pieces
@@ -3,37 +3,136 @@
 Provides common functionality for all security expert nodes.
 """
 
+import asyncio
+import contextlib
+import fnmatch
 import json
 import logging
+import re
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Any
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages.ai import add_usage
 
 from code_analysis import prompts as prompt_registry
 from code_analysis.domain.entities.expert_result import ExpertIssue, ExpertResult
+from code_analysis.domain.ports.expert_result_cache_port import (
+    IExpertResultCachePort,
+    expert_cache_key,
+)
+from code_analysis.infra.adapters.langgraph.call_limiter import ModelCallLimiter
+from code_analysis.infra.adapters.langgraph.llm_usage import TokenUsage
+from code_analysis.infra.adapters.langgraph.nodes._issue_stream import (
+    IssueStreamParser,
+)
+from code_analysis.infra.adapters.langgraph.nodes._sharding import (
+    ShardPolicy,
+    plan_shards,
+)
 from code_analysis.infra.adapters.langgraph.nodes._structural_lines import is_structural
 from code_analysis.infra.adapters.langgraph.state import AgentState
+from code_analysis.infra.adapters.langgraph.token_budget import (
+    PromptBudget,
+    allocate_budgets,
+)
 
 LOGGER = logging.getLogger(__name__)
 
-# Adaptive per-file character budget based on commit size.
-# Ensures the total prompt stays within the model's context window.
-# Ratios: chars ÷ 4 ≈ tokens (rough estimate).
+_TRUNCATION_MARKER = "[... file truncated: structural signature preserved above ...]"
+# Re-truncation passes when a char-based cut still overshoots the token budget
+_FIT_ATTEMPTS = 3
+_BLOCK_CACHE_SIZE = 32
 
+# Expert prompt as the system message, files and RAG context after it
+PROMPT_LAYOUT_EXPERT_FIRST = "expert_first"
+# Shared system prompt, then files and RAG context, expert instructions last
+PROMPT_LAYOUT_SHARED_FIRST = "shared_first"
+PROMPT_LAYOUTS = (PROMPT_LAYOUT_EXPERT_FIRST, PROMPT_LAYOUT_SHARED_FIRST)
+_INSTRUCTIONS_HEADER = "=== EXPERT INSTRUCTIONS ==="
 
-def _max_file_chars(num_files: int) -> int:
-    """Return per-file char budget so total prompt fits in a 128k-token model."""
-    if num_files <= 5:
-        return 30_000  # ≈ 7 500 tokens/file → ~37 k total
-    if num_files <= 10:
-        return 15_000  # ≈ 3 750 tokens/file → ~37 k total
-    if num_files <= 20:
-        return 8_000  # ≈ 2 000 tokens/file → ~40 k total
-    if num_files <= 40:
-        return 5_000  # ≈ 1 250 tokens/file → ~50 k total
-    return 3_000  # ≈  750 tokens/file → fits very large commits
+
+@dataclass
+class _ShardOutcome:
+    """Issues and accounting from one shard's model call (or cache hit)."""
+
+    issues: list[ExpertIssue]
+    prompt_tokens: int
+    cache_hit: bool
+    # Seconds from the expert's start to its first streamed issue
+    first_issue_s: float | None = None
+    # Response was cut off; issues are the ones fully received
+    partial: bool = False
+    # Tokens the provider reported for the model call (empty on a cache hit)
+    usage: TokenUsage = field(default_factory=TokenUsage)
+
+
+def _compile_patterns(patterns: list[str]) -> re.Pattern[str] | None:
+    """Compile fnmatch patterns into one regex (matched against lowercased paths)."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p.lower())})" for p in patterns))
+
+
+class FormattedBlockCache:
+    """Formatted file blocks shared by the experts of one workflow.
+
+    Experts that are routed the same files with the same effective budget
+    (e.g. every expert without file patterns on a commit that fits) reuse
+    one formatted block instead of re-truncating the same files.
+    """
+
+    def __init__(self, maxsize: int = _BLOCK_CACHE_SIZE):
+        self._blocks: OrderedDict[tuple, str] = OrderedDict()
+        self._maxsize = maxsize
+
+    def get_or_format(
+        self,
+        files: list[dict[str, str]],
+        budget_tokens: int | None,
+        format_files: Callable[[], str],
+    ) -> str:
+        key = (
+            budget_tokens,
+            tuple(
+                (f["path"], f.get("lines"), len(f["content"]), hash(f["content"]))
+                for f in files
+            ),
+        )
+        block = self._blocks.get(key)
+        if block is None:
+            block = format_files()
+            self._blocks[key] = block
+            if len(self._blocks) > self._maxsize:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(key)
+        return block
+
+
+def model_id(model: BaseChatModel) -> str:
+    """Best-effort identifier of the concrete model behind a chat model."""
+    for attr in ("model_name", "model", "model_id"):
+        value = getattr(model, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    return type(model).__name__
+
+
+def supports_cache_control(model: BaseChatModel) -> bool:
+    """Whether prompt cache breakpoints must be marked (Anthropic models).
+
+    Claude models only cache up to explicit ``cache_control`` markers, also
+    through OpenRouter; OpenAI and Gemini cache common prefixes on their own.
+    """
+    name = model_id(model).lower().rsplit("/", 1)[-1]
+    return "claude" in name or type(model).__name__ == "ChatAnthropic"
 
 
 class BaseExpertNode(ABC):
@@ -42,12 +141,44 @@ class BaseExpertNode(ABC):
     Each expert node:
     1. Filters files based on expert-specific patterns
     2. Formats files for analysis
-    3. Invokes LLM with expert prompt
+    3. Invokes LLM with expert prompt (skipped on a result cache hit)
     4. Parses JSON response into ExpertResult
+
+    Files and RAG context are packed against a token ``PromptBudget`` derived
+    from the model's context window. Files that do not fit one prompt are
+    split into shards analysed by concurrent model calls (map) whose issues
+    are concatenated (reduce); see ``ShardPolicy``. A ``ModelCallLimiter``
+    shared by the experts of a workflow caps their model calls as a whole.
+
+    With the ``shared_first`` prompt layout every expert sends the same
+    system prompt and the same files/RAG block (files in path order) before
+    its own instructions, so provider prompt caches can reuse that prefix
+    across the experts of a scan; on Anthropic models the block is marked
+    with ``cache_control``.
     """
 
-    def __init__(self, model: BaseChatModel):
+    def __init__(
+        self,
+        model: BaseChatModel,
+        result_cache: IExpertResultCachePort | None = None,
+        budget: PromptBudget | None = None,
+        sharding: ShardPolicy | None = None,
+        block_cache: FormattedBlockCache | None = None,
+        streaming: bool = False,
+        prompt_layout: str = PROMPT_LAYOUT_EXPERT_FIRST,
+        call_limiter: ModelCallLimiter | None = None,
+    ):
+        if prompt_layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"prompt_layout must be one of: {PROMPT_LAYOUTS}")
         self._model = model
+        self._result_cache = result_cache
+        self._budget = budget or PromptBudget.for_model(model_id(model))
+        self._sharding = sharding or ShardPolicy()
+        self._block_cache = block_cache or FormattedBlockCache()
+        self._streaming = streaming
+        self._shared_first = prompt_layout == PROMPT_LAYOUT_SHARED_FIRST
+        self._cache_markers = self._shared_first and supports_cache_control(model)
+        self._call_limiter = call_limiter
 
     @property
     @abstractmethod
@@ -62,37 +193,46 @@ class BaseExpertNode(ABC):
         """
         return []
 
+    @cached_property
+    def _file_pattern(self) -> re.Pattern[str] | None:
+        return _compile_patterns(self.get_file_patterns())
+
     def should_analyze_file(self, file_path: str) -> bool:
         """Check if file should be analyzed by this expert."""
-        patterns = self.get_file_patterns()
-        if not patterns:
-            return True
+        pattern = self._file_pattern
+        return pattern is None or pattern.match(file_path.lower()) is not None
 
-        import fnmatch
+    def route(self, paths: list[str]) -> list[int]:
+        """Return indexes of the (lowercased) paths this expert analyzes."""
+        pattern = self._file_pattern
+        if pattern is None:
+            return list(range(len(paths)))
 
-        return any(fnmatch.fnmatch(file_path.lower(), p.lower()) for p in patterns)
-
-    def _filter_files(
-        self,
-        files: list[dict[str, str]],
-    ) -> list[dict[str, str]]:
-        """Filter files based on expert patterns."""
-        patterns = self.get_file_patterns()
-        if not patterns:
-            return files
-
-        filtered = [f for f in files if self.should_analyze_file(f["path"])]
+        matched = [i for i, path in enumerate(paths) if pattern.match(path)]
 
         # Fallback: if nothing matched, analyze all
-        if not filtered and files:
+        if not matched and paths:
             LOGGER.debug(
                 "No files matched patterns %s for %s, using fallback",
-                patterns,
+                self.get_file_patterns(),
                 self.expert_name,
             )
-            return files
+            return list(range(len(paths)))
+
+        return matched
 
-        return filtered
+    def _filter_files(
+        self,
+        files: list[dict[str, str]],
+        routing: dict[str, list[int]] | None = None,
+    ) -> list[dict[str, str]]:
+        """Filter files based on expert patterns (or a precomputed routing)."""
+        indexes = (routing or {}).get(self.expert_name)
+        if indexes is None:
+            indexes = self.route([f["path"].lower() for f in files])
+        if len(indexes) == len(files):
+            return files
+        return [files[i] for i in indexes]
 
     async def __call__(self, state: AgentState) -> dict[str, Any]:
         """Execute expert analysis.
@@ -103,10 +243,11 @@ class BaseExpertNode(ABC):
         Returns:
             State updates with new issues
         """
+        started = time.monotonic()
         try:
             # Filter files for this expert
             files = state.get("files", [])
-            filtered_files = self._filter_files(files)
+            filtered_files = self._filter_files(files, state.get("routing"))
 
             LOGGER.info(
                 "%s analyzing %d files (%d total)",
@@ -119,86 +260,388 @@ class BaseExpertNode(ABC):
                 LOGGER.debug("No files to analyze for %s", self.expert_name)
                 return {"issues": []}
 
-            # Format commit files for LLM
-            files_content = self._format_files(filtered_files)
+            if self._shared_first:
+                # Same files, same order: identical prefixes across experts
+                filtered_files = sorted(filtered_files, key=lambda f: f["path"])
 
-            # Filter RAG chunks by this expert's file patterns and append
+            # Get expert prompt
+            expert_prompt = prompt_registry.get_expert_prompt(self.expert_name)
+            instructions = self._instructions(expert_prompt)
+
+            # Filter RAG chunks by this expert's file patterns
             all_rag_chunks = state.get("rag_chunks", [])
             filtered_rag = [
                 c
                 for c in all_rag_chunks
                 if self.should_analyze_file(c.get("file_path", ""))
             ]
-            rag_content = self._format_rag_chunks(filtered_rag)
-
-            # Get expert prompt
-            expert_prompt = prompt_registry.get_expert_prompt(self.expert_name)
 
-            # Create messages
-            system_msg = SystemMessage(content=expert_prompt)
-            human_msg = HumanMessage(content=files_content + rag_content)
-
-            # Invoke LLM
-            LOGGER.debug("Invoking %s expert", self.expert_name)
-            response = await self._model.ainvoke([system_msg, human_msg])
-
-            # Parse response
-            result = self._parse_response(response.content, filtered_files)
-
-            LOGGER.info(
-                "%s found %d issues",
-                self.expert_name,
-                len(result.issues),
+            # Shared-first: a budget independent of the expert, so experts
+            # routed the same files also truncate and shard them identically
+            files_budget, rag_budget = self._budget.split(
+                self._longest_instructions if self._shared_first else instructions,
+                self._budget.count(self._format_rag_chunks(filtered_rag)),
             )
+            shards = plan_shards(
+                filtered_files,
+                self._file_cost,
+                files_budget,
+                self._sharding.max_shards,
+            )
+            if len(shards) > 1:
+                LOGGER.info(
+                    "%s splitting %d files into %d shards",
+                    self.expert_name,
+                    len(filtered_files),
+                    len(shards),
+                )
 
-            # Return issues to merge into state
-            return {
-                "issues": state.get("issues", []) + result.issues,
-                "expert_metadata": {
-                    **state.get("expert_metadata", {}),
-                    self.expert_name: {
-                        "files_analyzed": len(filtered_files),
-                        "issues_found": len(result.issues),
-                    },
-                },
+            # Map: one model call per shard, bounded per expert
+            semaphore = asyncio.Semaphore(self._sharding.concurrency)
+
+            async def analyze(shard: list[dict[str, str]]) -> _ShardOutcome:
+                async with semaphore:
+                    return await self._analyze_shard(
+                        expert_prompt,
+                        instructions,
+                        shard,
+                        filtered_rag,
+                        files_budget,
+                        rag_budget,
+                        started,
+                    )
+
+            outcomes = await asyncio.gather(
+                *(analyze(shard) for shard in shards), return_exceptions=True
+            )
+            failures = [o for o in outcomes if isinstance(o, BaseException)]
+            for failure in failures:
+                if not isinstance(failure, Exception) or len(failures) == len(outcomes):
+                    raise failure
+
+            # Reduce: concatenate issues from the shards that succeeded
+            succeeded = [o for o in outcomes if not isinstance(o, BaseException)]
+            issues = [issue for o in succeeded for issue in o.issues]
+            LOGGER.info("%s found %d issues", self.expert_name, len(issues))
+
+            # Return only this expert's delta; state reducers append it so
+            # experts running in parallel do not overwrite each other.
+            usage = TokenUsage()
+            for outcome in succeeded:
+                usage.add(outcome.usage)
+            metadata: dict[str, Any] = {
+                "files_analyzed": len(filtered_files),
+                "issues_found": len(issues),
+                "prompt_tokens": sum(o.prompt_tokens for o in succeeded),
+                "usage": usage.to_dict(),
             }
+            if len(shards) > 1:
+                metadata["shards"] = len(shards)
+            if self._result_cache is not None:
+                hits = sum(o.cache_hit for o in succeeded)
+                metadata.update(cache_hits=hits, cache_misses=len(succeeded) - hits)
+            if self._streaming:
+                first = [o.first_issue_s for o in succeeded if o.first_issue_s]
+                metadata["time_to_first_issue_s"] = (
+                    round(min(first), 3) if first else None
+                )
+                if any(o.partial for o in succeeded):
+                    metadata["partial_response"] = True
+            update: dict[str, Any] = {
+                "issues": issues,
+                "expert_metadata": {self.expert_name: metadata},
+            }
+            if failures:
+                for failure in failures:
+                    LOGGER.error("%s shard failed: %s", self.expert_name, failure)
+                metadata["failed_shards"] = len(failures)
+                update["expert_errors"] = [
+                    f"{self.expert_name}: {len(failures)}/{len(shards)} shards "
+                    f"failed: {failures[0]}"
+                ]
+            return update
 
         except Exception as e:
             LOGGER.exception("Expert %s failed", self.expert_name)
             # Record error but continue workflow
             return {
-                "issues": state.get("issues", []),
-                "expert_errors": [
-                    *state.get("expert_errors", []),
-                    f"{self.expert_name}: {e}",
-                ],
-                "expert_metadata": {
-                    **state.get("expert_metadata", {}),
-                    self.expert_name: {"error": str(e)},
-                },
+                "issues": [],
+                "expert_errors": [f"{self.expert_name}: {e}"],
+                "expert_metadata": {self.expert_name: {"error": str(e)}},
             }
 
-    def _format_files(self, files: list[dict[str, str]]) -> str:
-        """Format commit files for LLM consumption.
+    async def _analyze_shard(
+        self,
+        expert_prompt: str,
+        instructions: str,
+        files: list[dict[str, str]],
+        rag_chunks: list[dict],
+        files_budget: int,
+        rag_budget: int,
+        started: float,
+    ) -> "_ShardOutcome":
+        """Run one prompt (cache lookup, model call, parse) over a shard."""
+        # Pack commit files, then RAG context, into the token budget;
+        # RAG also gets whatever the files leave unused.
+        files_content = self._formatted_files(files, files_budget)
+        rag_budget += max(0, files_budget - self._budget.count(files_content))
+        rag_content = self._format_rag_chunks(rag_chunks, rag_budget)
+
+        cache_key = None
+        if self._result_cache is not None:
+            cache_key = expert_cache_key(
+                self.expert_name,
+                instructions,
+                model_id(self._model),
+                files_content,
+            )
+            cached = await asyncio.to_thread(self._result_cache.get, cache_key)
+            if cached is not None:
+                issues = [ExpertIssue.from_dict(issue) for issue in cached]
+                LOGGER.info("%s cache hit: %d issues", self.expert_name, len(issues))
+                return _ShardOutcome(issues=issues, prompt_tokens=0, cache_hit=True)
+
+        # Create messages
+        context = files_content + rag_content
+        messages = self._messages(expert_prompt, context)
+
+        # Invoke LLM
+        LOGGER.debug("Invoking %s expert", self.expert_name)
+        first_issue_s = None
+        partial = False
+        async with self._call_slot():
+            if self._streaming:
+                result, first_issue_s, partial, usage = await self._stream_response(
+                    messages, files, started
+                )
+            else:
+                response = await self._model.ainvoke(messages)
+                usage = TokenUsage.from_message(response)
+
+                # Parse response
+                result = self._parse_response(response.content, files)
+
+        # Only cache well-formed answers; parse failures should be retried
+        if cache_key is not None and result.error is None:
+            await asyncio.to_thread(
+                self._result_cache.put,
+                cache_key,
+                [issue.to_dict() for issue in result.issues],
+            )
+
+        return _ShardOutcome(
+            issues=result.issues,
+            prompt_tokens=self._budget.count(instructions)
+            + self._budget.count(context),
+            cache_hit=False,
+            first_issue_s=first_issue_s,
+            partial=partial,
+            usage=usage,
+        )
+
+    def _call_slot(self) -> contextlib.AbstractAsyncContextManager[None]:
+        """Slot of the workflow's model call limiter (none without one)."""
+        if self._call_limiter is None:
+            return contextlib.nullcontext()
+        return self._call_limiter.slot()
+
+    def _instructions(self, expert_prompt: str) -> str:
+        """Prompt text sent besides the files and RAG context."""
+        if not self._shared_first:
+            return expert_prompt
+        return "\n\n".join(
+            (
+                prompt_registry.get_expert_shared_system_prompt(),
+                _INSTRUCTIONS_HEADER,
+                expert_prompt,
+            )
+        )
+
+    @cached_property
+    def _longest_instructions(self) -> str:
+        return max(
+            (
+                self._instructions(prompt_registry.get_expert_prompt(name))
+                for name in prompt_registry.list_experts()
+            ),
+            key=self._budget.count,
+        )
+
+    def _messages(
+        self, expert_prompt: str, context: str
+    ) -> list[SystemMessage | HumanMessage]:
+        """Model messages for one prompt in the configured layout."""
+        if not self._shared_first:
+            return [SystemMessage(content=expert_prompt), HumanMessage(content=context)]
+        shared: dict[str, Any] = {"type": "text", "text": context}
+        if self._cache_markers:
+            # Cache breakpoint: system prompt and context are the shared prefix
+            shared["cache_control"] = {"type": "ephemeral"}
+        return [
+            SystemMessage(content=prompt_registry.get_expert_shared_system_prompt()),
+            HumanMessage(
+                content=[
+                    shared,
+                    {
+                        "type": "text",
+                        "text": f"\n{_INSTRUCTIONS_HEADER}\n\n{expert_prompt}",
+                    },
+                ]
+            ),
+        ]
+
+    async def _stream_response(
+        self,
+        messages: list[SystemMessage | HumanMessage],
+        files: list[dict[str, str]],
+        started: float,
+    ) -> tuple[ExpertResult, float | None, bool, TokenUsage]:
+        """Stream the model's answer, parsing issues as each object closes.
+
+        Returns the parsed result, seconds from ``started`` to the first
+        complete issue, whether the response was cut off and the token usage
+        reported by the chunks (usually the last one). A response
+        cut off at the output limit (or a stream that fails mid-way) keeps
+        the issues that were fully received; it is marked with an error so
+        it is not cached.
+        """
+        parser = IssueStreamParser()
+        parts: list[str] = []
+        streamed: list[dict[str, Any]] = []
+        first_issue_s = None
+        usage_metadata = None
+        try:
+            async for chunk in self._model.astream(messages):
+                chunk_usage = getattr(chunk, "usage_metadata", None)
+                if isinstance(chunk_usage, dict):
+                    usage_metadata = add_usage(usage_metadata, chunk_usage)
+                text = self._content_text(chunk.content)
+                if not text:
+                    continue
+                parts.append(text)
+                completed = parser.feed(text)
+                if completed and first_issue_s is None:
+                    first_issue_s = time.monotonic() - started
+                streamed.extend(completed)
+        except Exception as e:
+            if not streamed:
+                raise
+            LOGGER.warning(
+                "%s stream failed after %d issues, keeping them: %s",
+                self.expert_name,
+                len(streamed),
+                e,
+            )
+            return (
+                ExpertResult(
+                    expert_name=self.expert_name,
+                    issues=self._parse_issues(streamed),
+                    error=f"Stream interrupted: {e}",
+                    files_analyzed=len(files),
+                ),
+                first_issue_s,
+                True,
+                TokenUsage.from_metadata(usage_metadata),
+            )
+
+        usage = TokenUsage.from_metadata(usage_metadata)
+        result = self._parse_response("".join(parts), files)
+        if result.error is not None and streamed:
+            LOGGER.warning(
+                "%s response cut off, keeping %d complete issues",
+                self.expert_name,
+                len(streamed),
+            )
+            result = ExpertResult(
+                expert_name=self.expert_name,
+                issues=self._parse_issues(streamed),
+                error="Truncated JSON response",
+                files_analyzed=len(files),
+            )
+            return result, first_issue_s, True, usage
+        return result, first_issue_s, False, usage
+
+    def _file_cost(self, f: dict[str, str]) -> int:
+        """Tokens a file takes in the prompt, framing included."""
+        return (
+            self._budget.count(f["content"])
+            + self._budget.count(self._file_header(f["path"], f.get("lines")))
+            + self._budget.count(_TRUNCATION_MARKER)
+            + 4
+        )
 
-        Uses an adaptive per-file char budget (smaller budget for large commits)
-        and structure-aware truncation so that even truncated files preserve
-        imports + function/class signatures alongside as much body as fits.
+    def _formatted_files(self, files: list[dict[str, str]], budget_tokens: int) -> str:
+        """``_format_files`` memoized in the workflow's shared block cache."""
+        # Output does not depend on the budget when every file fits whole
+        if sum(self._file_cost(f) for f in files) <= budget_tokens:
+            key_budget = None
+        else:
+            key_budget = budget_tokens
+        return self._block_cache.get_or_format(
+            files, key_budget, lambda: self._format_files(files, budget_tokens)
+        )
+
+    def _format_files(
+        self, files: list[dict[str, str]], budget_tokens: int | None = None
+    ) -> str:
+        """Format commit files for LLM consumption within a token budget.
+
+        The budget (default: the model's whole input budget) is shared fairly:
+        files smaller than an equal share are sent whole and larger files
+        split the remainder. Files over their share get structure-aware
+        truncation so they still preserve imports + function/class
+        signatures alongside as much body as fits.
         """
-        limit = _max_file_chars(len(files))
+        if budget_tokens is None:
+            budget_tokens = self._budget.input_tokens
+        count = self._budget.count
+        sizes = [self._file_cost(f) for f in files]
+        overheads = [
+            size - count(f["content"]) for f, size in zip(files, sizes, strict=True)
+        ]
+        allocations = allocate_budgets(sizes, budget_tokens)
+
         parts = []
-        for f in files:
-            content, truncated = self._smart_truncate(f["content"], limit)
-            parts.append(f"=== FILE: {f['path']} ===")
+        for f, size, overhead, allocation in zip(
+            files, sizes, overheads, allocations, strict=True
+        ):
+            if allocation >= size:
+                content, truncated = f["content"], False
+            else:
+                content, truncated = self._fit_tokens(
+                    f["content"], allocation - overhead
+                )
+            parts.append(self._file_header(f["path"], f.get("lines")))
             parts.append(content)
             if truncated:
-                parts.append(
-                    "[... file truncated: structural signature preserved above ...]"
-                )
+                parts.append(_TRUNCATION_MARKER)
             parts.append("=== END FILE ===")
             parts.append("")
         return "\n".join(parts)
 
+    @staticmethod
+    def _file_header(path: str, lines: str | None = None) -> str:
+        if lines:
+            return f"=== FILE: {path} (lines {lines}) ==="
+        return f"=== FILE: {path} ==="
+
+    def _fit_tokens(self, content: str, max_tokens: int) -> tuple[str, bool]:
+        """Smart-truncate content until it fits in max_tokens."""
+        if max_tokens <= 0:
+            return "", True
+        tokens = self._budget.count(content)
+        if tokens <= max_tokens:
+            return content, False
+        limit = int(len(content) * max_tokens / tokens)
+        truncated = ""
+        for _ in range(_FIT_ATTEMPTS):
+            truncated, _ = self._smart_truncate(content, limit)
+            used = self._budget.count(truncated)
+            if used <= max_tokens:
+                break
+            limit = int(limit * max_tokens / used * 0.95)
+        return truncated, True
+
     @staticmethod
     def _smart_truncate(content: str, max_chars: int) -> tuple[str, bool]:
         """Truncate file content while preserving structural lines.
@@ -237,18 +680,35 @@ class BaseExpertNode(ABC):
 
         return head, True
 
-    def _format_rag_chunks(self, chunks: list[dict]) -> str:
+    def _format_rag_chunks(
+        self, chunks: list[dict], budget_tokens: int | None = None
+    ) -> str:
         """Format RAG context chunks for LLM consumption.
 
-        Returns empty string when chunks list is empty so no block is added.
+        Chunks are kept in rank order until ``budget_tokens`` is used up.
+        Returns empty string when no chunk fits so no block is added.
         """
         if not chunks:
             return ""
-        parts = ["\n=== RAG CONTEXT (codebase background) ==="]
+        header = "\n=== RAG CONTEXT (codebase background) ==="
+        footer = "=== END RAG CONTEXT ===\n"
+        parts = [header]
+        if budget_tokens is not None:
+            budget_tokens -= self._budget.count(header) + self._budget.count(footer)
         for chunk in chunks:
-            parts.append(f"--- {chunk.get('file_path', 'unknown')} ---")
-            parts.append(chunk.get("chunk_text", ""))
-        parts.append("=== END RAG CONTEXT ===\n")
+            block = (
+                f"--- {chunk.get('file_path', 'unknown')} ---\n"
+                f"{chunk.get('chunk_text', '')}"
+            )
+            if budget_tokens is not None:
+                cost = self._budget.count(block) + 1
+                if cost > budget_tokens:
+                    break
+                budget_tokens -= cost
+            parts.append(block)
+        if len(parts) == 1:
+            return ""
+        parts.append(footer)
         return "\n".join(parts)
 
     def _parse_response(
@@ -257,29 +717,7 @@ class BaseExpertNode(ABC):
         files: list[dict[str, str]],
     ) -> ExpertResult:
         """Parse LLM response into ExpertResult."""
-        # Handle content that might be a list (OpenAI Responses API)
-        if isinstance(content, list):
-            text_parts = []
-            for block in content:
-                if isinstance(block, str):
-                    text_parts.append(block)
-                elif isinstance(block, dict) and "text" in block:
-                    text_parts.append(block["text"])
-            content = "".join(text_parts)
-
-        content = str(content).strip()
-
-        # Try to extract JSON from markdown fences
-        if content.startswith("```json"):
-            content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-        elif content.startswith("```"):
-            content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-
-        content = content.strip()
+        content = self._json_text(content)
 
         try:
             data = json.loads(content)
@@ -306,6 +744,44 @@ class BaseExpertNode(ABC):
             )
             issues_data = []
 
+        return ExpertResult(
+            expert_name=self.expert_name,
+            issues=self._parse_issues(issues_data),
+            files_analyzed=len(files),
+        )
+
+    @classmethod
+    def _json_text(cls, content: str | list[Any]) -> str:
+        """Response text with any Markdown code fence around the JSON removed."""
+        # Handle content that might be a list (OpenAI Responses API)
+        content = cls._content_text(content).strip()
+
+        # Try to extract JSON from markdown fences
+        if content.startswith("```json"):
+            content = content[7:]
+            if content.endswith("```"):
+                content = content[:-3]
+        elif content.startswith("```"):
+            content = content[3:]
+            if content.endswith("```"):
+                content = content[:-3]
+
+        return content.strip()
+
+    @staticmethod
+    def _content_text(content: str | list[Any]) -> str:
+        """Text of a message or chunk (OpenAI Responses API uses block lists)."""
+        if isinstance(content, list):
+            text_parts = []
+            for block in content:
+                if isinstance(block, str):
+                    text_parts.append(block)
+                elif isinstance(block, dict) and "text" in block:
+                    text_parts.append(block["text"])
+            return "".join(text_parts)
+        return str(content)
+
+    def _parse_issues(self, issues_data: list[Any]) -> list[ExpertIssue]:
         issues = []
         for issue_data in issues_data:
             try:
@@ -318,9 +794,4 @@ class BaseExpertNode(ABC):
                     e,
                     issue_data,
                 )
-
-        return ExpertResult(
-            expert_name=self.expert_name,
-            issues=issues,
-            files_analyzed=len(files),
-        )
+        return issues
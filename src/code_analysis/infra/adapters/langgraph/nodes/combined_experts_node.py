@@ -0,0 +1,215 @@
+"""Combined expert node: every applicable expert in one model call.
+
+For small commits the six expert prompts would each resend the same few
+files, so the round trips dominate the scan. This node sends the files and
+RAG context once, followed by the instructions of every expert that was
+routed files, and asks for one JSON answer with an issue list per expert.
+
+The workflow routes a commit here instead of fanning out to the experts when
+``fits`` holds: its files and RAG context take at most ``max_context_tokens``
+and the whole combined prompt fits the model's input budget. Experts whose
+section is missing from the answer (or all of them, when the answer cannot be
+parsed or the call fails) are run individually as a fallback.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from code_analysis import prompts as prompt_registry
+from code_analysis.domain.entities.expert_result import ExpertIssue
+from code_analysis.infra.adapters.langgraph.call_limiter import ModelCallLimiter
+from code_analysis.infra.adapters.langgraph.llm_usage import TokenUsage
+from code_analysis.infra.adapters.langgraph.nodes.base_expert_node import (
+    BaseExpertNode,
+    FormattedBlockCache,
+)
+from code_analysis.infra.adapters.langgraph.state import AgentState
+from code_analysis.infra.adapters.langgraph.token_budget import PromptBudget
+
+LOGGER = logging.getLogger(__name__)
+
+COMBINED_EXPERTS_NAME = "combined_experts"
+# Files + RAG context tokens under which a commit is analysed in one call
+DEFAULT_COMBINED_MAX_TOKENS = 8000
+
+
+class CombinedExpertsNode(BaseExpertNode):
+    """Runs the applicable experts in a single structured model call."""
+
+    def __init__(
+        self,
+        model: BaseChatModel,
+        experts: list[BaseExpertNode],
+        max_context_tokens: int = DEFAULT_COMBINED_MAX_TOKENS,
+        budget: PromptBudget | None = None,
+        block_cache: FormattedBlockCache | None = None,
+        fallback_concurrency: int = 1,
+        call_limiter: ModelCallLimiter | None = None,
+    ):
+        super().__init__(
+            model, budget=budget, block_cache=block_cache, call_limiter=call_limiter
+        )
+        self._experts = experts
+        self._max_context_tokens = max_context_tokens
+        self._fallback_concurrency = max(1, fallback_concurrency)
+
+    @property
+    def expert_name(self) -> str:
+        return COMBINED_EXPERTS_NAME
+
+    def fits(self, state: AgentState) -> bool:
+        """Whether the commit is small enough for the combined call."""
+        files = state.get("files", [])
+        if self._max_context_tokens <= 0 or not files:
+            return False
+        context_tokens = sum(self._file_cost(f) for f in files) + self._budget.count(
+            self._format_rag_chunks(state.get("rag_chunks", []))
+        )
+        if context_tokens > self._max_context_tokens:
+            return False
+        sections = self._sections(files, state.get("routing"))
+        prompt_tokens = context_tokens + self._budget.count(
+            prompt_registry.get_experts_combined_system_prompt()
+            + "".join(text for _, _, text in sections)
+        )
+        return bool(sections) and prompt_tokens <= self._budget.input_tokens
+
+    def _sections(
+        self,
+        files: list[dict[str, str]],
+        routing: dict[str, list[int]] | None,
+    ) -> list[tuple[BaseExpertNode, int, str]]:
+        """(expert, files routed, instructions section) per applicable expert."""
+        sections = []
+        for expert in self._experts:
+            routed = expert._filter_files(files, routing)
+            if not routed:
+                continue
+            name = expert.expert_name
+            text = "\n".join(
+                (
+                    f"=== EXPERT: {name} ===",
+                    "Files: " + ", ".join(sorted(f["path"] for f in routed)),
+                    "",
+                    prompt_registry.get_expert_prompt(name),
+                    f"=== END EXPERT: {name} ===",
+                    "",
+                )
+            )
+            sections.append((expert, len(routed), text))
+        return sections
+
+    async def __call__(self, state: AgentState) -> dict[str, Any]:
+        started = time.monotonic()
+        files = sorted(state.get("files", []), key=lambda f: f["path"])
+        sections = self._sections(files, state.get("routing"))
+        LOGGER.info(
+            "%s analyzing %d files for %d experts in one call",
+            self.expert_name,
+            len(files),
+            len(sections),
+        )
+
+        context = self._formatted_files(
+            files, self._budget.input_tokens
+        ) + self._format_rag_chunks(state.get("rag_chunks", []))
+        system = prompt_registry.get_experts_combined_system_prompt()
+        human = "\n".join((context, *(text for _, _, text in sections)))
+        metadata: dict[str, Any] = {
+            "experts": [expert.expert_name for expert, _, _ in sections],
+            "prompt_tokens": self._budget.count(system) + self._budget.count(human),
+        }
+
+        answers: dict[str, list[ExpertIssue]] = {}
+        usage = TokenUsage()
+        try:
+            async with self._call_slot():
+                response = await self._model.ainvoke(
+                    [SystemMessage(content=system), HumanMessage(content=human)]
+                )
+            usage = TokenUsage.from_message(response)
+            answers = self._parse_sections(response.content)
+        except Exception as e:
+            LOGGER.warning("%s call failed: %s", self.expert_name, e)
+            metadata["error"] = str(e)
+        metadata["usage"] = usage.to_dict()
+
+        update: dict[str, Any] = {
+            "issues": [],
+            "expert_metadata": {self.expert_name: metadata},
+        }
+        fallback = []
+        for expert, routed, _ in sections:
+            issues = answers.get(expert.expert_name)
+            if issues is None:
+                fallback.append(expert)
+                continue
+            update["issues"].extend(issues)
+            update["expert_metadata"][expert.expert_name] = {
+                "files_analyzed": routed,
+                "issues_found": len(issues),
+                "combined": True,
+            }
+
+        if fallback:
+            names = [expert.expert_name for expert in fallback]
+            LOGGER.warning(
+                "%s missing answers for %s, running them individually",
+                self.expert_name,
+                ", ".join(names),
+            )
+            metadata["fallback"] = names
+            for result in await self._run_individually(fallback, state):
+                update["issues"].extend(result.get("issues", []))
+                update["expert_metadata"].update(result.get("expert_metadata", {}))
+                if result.get("expert_errors"):
+                    update.setdefault("expert_errors", []).extend(
+                        result["expert_errors"]
+                    )
+
+        LOGGER.info(
+            "%s found %d issues in %.2fs",
+            self.expert_name,
+            len(update["issues"]),
+            time.monotonic() - started,
+        )
+        return update
+
+    def _parse_sections(self, content: str | list[Any]) -> dict[str, list[ExpertIssue]]:
+        """Issues per expert name from the combined answer (empty if invalid)."""
+        text = self._json_text(content)
+        try:
+            experts = json.loads(text).get("experts")
+        except (json.JSONDecodeError, AttributeError):
+            LOGGER.warning(
+                "Failed to parse JSON from %s response: %s",
+                self.expert_name,
+                text[:200],
+            )
+            return {}
+        if not isinstance(experts, dict):
+            LOGGER.warning("Invalid experts format from %s", self.expert_name)
+            return {}
+        sections = {}
+        for name, section in experts.items():
+            issues = section.get("issues") if isinstance(section, dict) else None
+            if isinstance(issues, list):
+                sections[name] = self._parse_issues(issues)
+        return sections
+
+    async def _run_individually(
+        self, experts: list[BaseExpertNode], state: AgentState
+    ) -> list[dict[str, Any]]:
+        semaphore = asyncio.Semaphore(self._fallback_concurrency)
+
+        async def run(expert: BaseExpertNode) -> dict[str, Any]:
+            async with semaphore:
+                return await expert(state)
+
+        return await asyncio.gather(*(run(expert) for expert in experts))
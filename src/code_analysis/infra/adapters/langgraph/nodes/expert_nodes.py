@@ -2,9 +2,15 @@
 
 from langchain_core.language_models.chat_models import BaseChatModel
 
+from code_analysis.domain.ports.expert_result_cache_port import IExpertResultCachePort
+from code_analysis.infra.adapters.langgraph.call_limiter import ModelCallLimiter
+from code_analysis.infra.adapters.langgraph.nodes._sharding import ShardPolicy
 from code_analysis.infra.adapters.langgraph.nodes.base_expert_node import (
+    PROMPT_LAYOUT_EXPERT_FIRST,
     BaseExpertNode,
+    FormattedBlockCache,
 )
+from code_analysis.infra.adapters.langgraph.token_budget import PromptBudget
 
 
 class PromptHardeningNode(BaseExpertNode):
@@ -156,13 +162,33 @@ EXPERT_CLASSES = {
 
 def create_expert_nodes(
     model: BaseChatModel,
+    result_cache: IExpertResultCachePort | None = None,
+    budget: PromptBudget | None = None,
+    sharding: ShardPolicy | None = None,
+    block_cache: FormattedBlockCache | None = None,
+    streaming: bool = False,
+    prompt_layout: str = PROMPT_LAYOUT_EXPERT_FIRST,
+    call_limiter: ModelCallLimiter | None = None,
 ) -> list[BaseExpertNode]:
-    """Factory function to create all expert nodes."""
+    """Factory function to create all expert nodes.
+
+    The experts share one ``FormattedBlockCache`` (a new one unless given)
+    and ``call_limiter``, when given.
+    """
+    options = {
+        "result_cache": result_cache,
+        "budget": budget,
+        "sharding": sharding,
+        "block_cache": block_cache or FormattedBlockCache(),
+        "streaming": streaming,
+        "prompt_layout": prompt_layout,
+        "call_limiter": call_limiter,
+    }
     return [
-        PromptHardeningNode(model),
-        OwaspApiNode(model),
-        OwaspWebNode(model),
-        OwaspMobileNode(model),
-        DevSecOpsNode(model),
-        CodeVulnerabilitiesNode(model),
+        PromptHardeningNode(model, **options),
+        OwaspApiNode(model, **options),
+        OwaspWebNode(model, **options),
+        OwaspMobileNode(model, **options),
+        DevSecOpsNode(model, **options),
+        CodeVulnerabilitiesNode(model, **options),
     ]
@@ -0,0 +1,35 @@
+"""File Routing Node for LangGraph workflow.
+
+Executes right after mcp_retrieve. Matches every commit path once against
+each expert's compiled file patterns and stores the resulting file × expert
+routing in state.routing (expert name → indexes into state.files), so the
+expert nodes do not each re-filter the whole commit.
+"""
+
+import logging
+from typing import Any
+
+from code_analysis.infra.adapters.langgraph.nodes.base_expert_node import (
+    BaseExpertNode,
+)
+from code_analysis.infra.adapters.langgraph.state import AgentState
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FileRoutingNode:
+    """Builds the file → expert routing matrix for the commit."""
+
+    def __init__(self, experts: list[BaseExpertNode]):
+        self._experts = experts
+
+    async def __call__(self, state: AgentState) -> dict[str, Any]:
+        files = state.get("files", [])
+        paths = [f["path"].lower() for f in files]
+        routing = {expert.expert_name: expert.route(paths) for expert in self._experts}
+        LOGGER.info(
+            "[Routing] %d files: %s",
+            len(files),
+            ", ".join(f"{name}={len(indexes)}" for name, indexes in routing.items()),
+        )
+        return {"routing": routing}
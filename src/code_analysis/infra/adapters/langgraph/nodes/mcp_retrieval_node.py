@@ -1,6 +1,8 @@
 """MCP Retrieval Node for LangGraph workflow.
 
 This node handles Phase 1 (git.commit-files) and Phase 2 (files) of the MCP workflow.
+Phase 2 reads files concurrently (bounded by a semaphore, with a per-file timeout
+and retries) and returns them sorted by path so prompts stay deterministic.
 
 The MCP gateway exposes ``mcp.tool.git.commit-files`` as an *async* tool: the first call
 returns ``jobId`` and ``pollToolName``. Callers MUST poll
@@ -11,17 +13,23 @@ returns ``jobId`` and ``pollToolName``. Callers MUST poll
 import asyncio
 import json
 import logging
-from typing import Any
-
-from langchain_mcp_adapters.client import MultiServerMCPClient
+import time
+from typing import TYPE_CHECKING, Any
 
 from code_analysis.infra.adapters.langgraph.state import AgentState
 
+if TYPE_CHECKING:
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+
 LOGGER = logging.getLogger(__name__)
 
 GIT_COMMIT_POLL_TOOL = "mcp.tool.git.commit-files.poll"
 POLL_INTERVAL_SEC = 1.0
 POLL_MAX_ATTEMPTS = 180  # hasta ~3 min (Lambda/SQS en LocalStack pueden ir lentos)
+FETCH_CONCURRENCY = 16
+FETCH_TIMEOUT_SEC = 30.0
+FETCH_RETRIES = 2
+FETCH_RETRY_BACKOFF_SEC = 0.5
 
 
 class MCPRetrievalNode:
@@ -29,11 +37,21 @@ class MCPRetrievalNode:
 
     Executes:
     1. git.commit-files (async) - poll until complete
-    2. files (sync) - for each file path retrieved
+    2. files (sync) - for each file path retrieved, up to ``fetch_concurrency``
+       reads in flight
     """
 
-    def __init__(self, mcp_client: MultiServerMCPClient):
+    def __init__(
+        self,
+        mcp_client: "MultiServerMCPClient",
+        fetch_concurrency: int = FETCH_CONCURRENCY,
+        fetch_timeout_sec: float = FETCH_TIMEOUT_SEC,
+        fetch_retries: int = FETCH_RETRIES,
+    ):
         self._mcp_client = mcp_client
+        self._fetch_concurrency = max(1, fetch_concurrency)
+        self._fetch_timeout_sec = fetch_timeout_sec
+        self._fetch_retries = max(0, fetch_retries)
 
     async def __call__(self, state: AgentState) -> dict[str, Any]:
         """Execute MCP retrieval phases.
@@ -169,31 +187,15 @@ class MCPRetrievalNode:
                     "files": [],
                 }
 
-            files_content = []
-            for file_path in file_paths:
-                try:
-                    # Note: files tool only expects 'path' parameter
-                    file_result = await files_tool.ainvoke(
-                        {
-                            "path": file_path,
-                        }
-                    )
+            files_content, fetch_metadata = await self._fetch_files(
+                files_tool, file_paths, storage_prefix
+            )
 
-                    content = self._extract_file_content(file_result)
-                    if content is not None:
-                        files_content.append(
-                            {
-                                "path": self._normalize_storage_path(
-                                    file_path, storage_prefix
-                                ),
-                                "content": content,
-                            }
-                        )
-                except Exception as e:
-                    LOGGER.warning("Failed to read file %s: %s", file_path, e)
-                    # Continue with other files
-
-            LOGGER.info("[MCP Node] Successfully read %d files", len(files_content))
+            LOGGER.info(
+                "[MCP Node] Successfully read %d files in %.2fs",
+                len(files_content),
+                fetch_metadata["fetch_wall_s"],
+            )
 
             if not files_content:
                 LOGGER.error(
@@ -205,12 +207,14 @@ class MCPRetrievalNode:
                     "status": "FAILED",
                     "scaned_files": 0,
                     "files": [],
+                    "expert_metadata": {"mcp_retrieve": fetch_metadata},
                 }
 
             return {
                 "files": files_content,
                 "scaned_files": len(files_content),
                 "mcp_error": None,
+                "expert_metadata": {"mcp_retrieve": fetch_metadata},
             }
 
         except Exception as e:
@@ -222,6 +226,83 @@ class MCPRetrievalNode:
                 "files": [],
             }
 
+    async def _fetch_files(
+        self,
+        files_tool: Any,
+        file_paths: list[str],
+        storage_prefix: str | None,
+    ) -> tuple[list[dict[str, str]], dict[str, Any]]:
+        """Read all files concurrently and return them sorted by path.
+
+        Returns the file list plus fetch metadata (per-file latency in seconds,
+        failed paths and wall-clock time) for ``expert_metadata``.
+        """
+        semaphore = asyncio.Semaphore(self._fetch_concurrency)
+        started = time.perf_counter()
+
+        async def fetch(file_path: str) -> tuple[str, str | None, float]:
+            async with semaphore:
+                file_started = time.perf_counter()
+                content = await self._fetch_file(files_tool, file_path)
+                return file_path, content, time.perf_counter() - file_started
+
+        results = await asyncio.gather(*(fetch(path) for path in file_paths))
+
+        files_content = []
+        latencies: dict[str, float] = {}
+        failed: list[str] = []
+        for file_path, content, elapsed in results:
+            latencies[file_path] = round(elapsed, 4)
+            if content is None:
+                failed.append(file_path)
+                continue
+            files_content.append(
+                {
+                    "path": self._normalize_storage_path(file_path, storage_prefix),
+                    "content": content,
+                }
+            )
+        files_content.sort(key=lambda f: f["path"])
+
+        ordered = sorted(latencies.values())
+        metadata: dict[str, Any] = {
+            "files_requested": len(file_paths),
+            "files_read": len(files_content),
+            "files_failed": failed,
+            "fetch_concurrency": self._fetch_concurrency,
+            "fetch_wall_s": round(time.perf_counter() - started, 4),
+            "fetch_latency_p50_s": ordered[len(ordered) // 2] if ordered else 0.0,
+            "fetch_latency_max_s": ordered[-1] if ordered else 0.0,
+            "fetch_latency_s": latencies,
+        }
+        return files_content, metadata
+
+    async def _fetch_file(self, files_tool: Any, file_path: str) -> str | None:
+        """Read one file with a timeout, retrying transient failures."""
+        for attempt in range(self._fetch_retries + 1):
+            try:
+                # Note: files tool only expects 'path' parameter
+                file_result = await asyncio.wait_for(
+                    files_tool.ainvoke({"path": file_path}),
+                    timeout=self._fetch_timeout_sec,
+                )
+                # Unreadable content is not transient: do not retry it
+                return self._extract_file_content(file_result)
+            except Exception as e:
+                if attempt >= self._fetch_retries:
+                    LOGGER.warning(
+                        "Failed to read file %s after %d attempts: %r",
+                        file_path,
+                        attempt + 1,
+                        e,
+                    )
+                    return None
+                LOGGER.debug(
+                    "[MCP Node] Retrying %s (attempt %d): %r", file_path, attempt + 1, e
+                )
+                await asyncio.sleep(FETCH_RETRY_BACKOFF_SEC * (attempt + 1))
+        return None
+
     def _get_tool(
         self,
         tools: list[Any],
@@ -1,8 +1,12 @@
 """Merge Findings Node for LangGraph workflow.
 
 Final node that asks the consolidation model for final issues and status.
+The node is async: model calls go through ``ainvoke`` with a timeout, so the
+event loop keeps running (and the node can be cancelled) while consolidation
+is in flight.
 """
 
+import asyncio
 import json
 import logging
 import re
@@ -13,20 +17,38 @@ from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import HumanMessage
 
 from code_analysis.domain.entities.expert_result import ExpertIssue
-from code_analysis.infra.adapters.langgraph.state import AgentState
+from code_analysis.infra.adapters.langgraph.llm_usage import PriceTable, TokenUsage
+from code_analysis.infra.adapters.langgraph.state import (
+    AgentState,
+    IssuesReplacement,
+)
 from code_analysis.prompts import get_findings_consolidation_prompt
 
 LOGGER = logging.getLogger(__name__)
 CONSOLIDATION_TRACE_VERSION = "2026-06-09-agent-only-v4"
+MERGE_TIMEOUT_SEC = 300.0
 
 
 class MergeFindingsNode:
-    """Node for merging expert findings and determining final status."""
+    """Node for merging expert findings and determining final status.
 
-    def __init__(self, model: BaseChatModel | None = None) -> None:
+    ``final_output["usage"]`` reports the tokens and estimated cost (see
+    ``PriceTable``) of each expert and of the consolidation calls.
+    """
+
+    def __init__(
+        self,
+        model: BaseChatModel | None = None,
+        timeout_sec: float | None = MERGE_TIMEOUT_SEC,
+        prices: PriceTable | None = None,
+        model_id: str | None = None,
+    ) -> None:
         self._model = model
+        self._timeout_sec = timeout_sec
+        self._prices = prices or PriceTable()
+        self._model_id = model_id or "unknown"
 
-    def __call__(self, state: AgentState) -> dict[str, Any]:
+    async def __call__(self, state: AgentState) -> dict[str, Any]:
         """Merge findings and return final result.
 
         Args:
@@ -51,7 +73,10 @@ class MergeFindingsNode:
                 for error in expert_errors:
                     LOGGER.warning("Expert error: %s", error)
 
-            unique_issues = self._consolidate_findings(issues)
+            consolidation_usage = TokenUsage()
+            unique_issues = await self._consolidate_findings(
+                issues, consolidation_usage
+            )
 
             LOGGER.info("After consolidation: %d unique issues", len(unique_issues))
 
@@ -80,6 +105,7 @@ class MergeFindingsNode:
                 "status": status,
                 "scaned_files": scaned_files,
                 "issues": [issue.to_dict() for issue in unique_issues],
+                "usage": self._usage_report(state, consolidation_usage),
             }
             if error_message:
                 result["error"] = error_message
@@ -92,11 +118,12 @@ class MergeFindingsNode:
             )
 
             # Return final state with consolidated issues so both
-            # final_output and state.issues survive the StateGraph schema
+            # final_output and state.issues survive the StateGraph schema.
+            # IssuesReplacement overrides the append reducer on state.issues.
             return {
                 "status": status,
                 "final_output": result,
-                "issues": unique_issues,
+                "issues": IssuesReplacement(unique_issues),
             }
 
         except Exception as e:
@@ -104,7 +131,7 @@ class MergeFindingsNode:
             return {
                 "status": "FAILED",
                 "scaned_files": state.get("scaned_files", 0),
-                "issues": [],
+                "issues": IssuesReplacement(),
                 "error": str(e),
                 "final_output": {
                     "status": "FAILED",
@@ -113,9 +140,34 @@ class MergeFindingsNode:
                 },
             }
 
-    def _consolidate_findings(
+    def _usage_report(
+        self, state: AgentState, consolidation: TokenUsage
+    ) -> dict[str, Any]:
+        """Tokens and cost per expert (from its metadata) and consolidation."""
+        experts = {
+            name: TokenUsage.from_dict(meta["usage"])
+            for name, meta in state.get("expert_metadata", {}).items()
+            if isinstance(meta, dict) and isinstance(meta.get("usage"), dict)
+        }
+        report = self._prices.report(self._model_id, experts, consolidation)
+        total = report["total"]
+        LOGGER.info(
+            "LLM usage: model=%s calls=%d input_tokens=%d cached_tokens=%d "
+            "(ratio=%s) output_tokens=%d cost_usd=%s",
+            self._model_id,
+            total["calls"],
+            total["input_tokens"],
+            total["cached_tokens"],
+            total.get("cached_ratio"),
+            total["output_tokens"],
+            total.get("cost_usd"),
+        )
+        return report
+
+    async def _consolidate_findings(
         self,
         issues: list[ExpertIssue],
+        usage: TokenUsage | None = None,
     ) -> list[ExpertIssue]:
         """Use the model to produce a final consolidated findings list."""
         if self._model is None or len(issues) < 2:
@@ -141,7 +193,7 @@ class MergeFindingsNode:
             return issues
 
         try:
-            return self._request_consolidated_issues(findings, issues)
+            return await self._request_consolidated_issues(findings, issues, usage)
         except Exception as exc:
             LOGGER.warning(
                 "Findings consolidation failed; using original findings: "
@@ -165,10 +217,11 @@ class MergeFindingsNode:
             findings.append(finding)
         return findings
 
-    def _request_consolidated_issues(
+    async def _request_consolidated_issues(
         self,
         findings: list[dict[str, Any]],
         original_issues: list[ExpertIssue],
+        usage: TokenUsage | None = None,
     ) -> list[ExpertIssue]:
         findings_json = json.dumps(findings, ensure_ascii=False, separators=(",", ":"))
         prompt_template = get_findings_consolidation_prompt()
@@ -185,7 +238,7 @@ class MergeFindingsNode:
             len(findings),
             self._summarize_findings(findings),
         )
-        response = self._model.invoke([HumanMessage(content=prompt)])
+        response = await self._ainvoke([HumanMessage(content=prompt)], usage)
         content = getattr(response, "content", response)
         response_shape = self._describe_response_shape(content)
         LOGGER.info(
@@ -212,7 +265,9 @@ class MergeFindingsNode:
                 self._safe_response_preview(content),
             )
             try:
-                repaired_content = self._repair_json_response(content_text, prompt_hash)
+                repaired_content = await self._repair_json_response(
+                    content_text, prompt_hash, usage
+                )
                 data = self._parse_json_object(repaired_content)
             except Exception as repair_exc:
                 LOGGER.warning(
@@ -353,7 +408,25 @@ class MergeFindingsNode:
             for finding in findings
         ]
 
-    def _repair_json_response(self, content: str, prompt_hash: str) -> str:
+    async def _ainvoke(
+        self, messages: list[HumanMessage], usage: TokenUsage | None = None
+    ) -> Any:
+        """Call the model without blocking the event loop, bounded by timeout.
+
+        Raises TimeoutError when the call exceeds ``timeout_sec``; cancellation
+        of the node propagates to the in-flight request. The reported token
+        usage is added to ``usage``.
+        """
+        response = await asyncio.wait_for(
+            self._model.ainvoke(messages), timeout=self._timeout_sec
+        )
+        if usage is not None:
+            usage.add(TokenUsage.from_message(response))
+        return response
+
+    async def _repair_json_response(
+        self, content: str, prompt_hash: str, usage: TokenUsage | None = None
+    ) -> str:
         repair_prompt = (
             "Convierte la siguiente respuesta a JSON estricto válido. "
             "No cambies el contenido semántico. No agregues explicaciones. "
@@ -361,7 +434,7 @@ class MergeFindingsNode:
             "La respuesta debe empezar con { y terminar con }.\n\n"
             f"Respuesta a reparar:\n{content}"
         )
-        response = self._model.invoke([HumanMessage(content=repair_prompt)])
+        response = await self._ainvoke([HumanMessage(content=repair_prompt)], usage)
         repaired = str(getattr(response, "content", response))
         LOGGER.info(
             "Findings consolidation repair response received: trace_version=%s "
@@ -2,13 +2,28 @@
 
 Executes after mcp_retrieve and before expert nodes. For each file in the
 commit, queries the vector store for semantically related chunks from the
-full branch codebase. Results are stored in state.rag_chunks for expert nodes.
+full branch codebase. All queries go through one ``search_many`` call so the
+embedding cost is a single request regardless of file count. Results are
+stored in state.rag_chunks for expert nodes.
 
 On any error (index unavailable, S3 error, embedding error) returns
 rag_chunks=[] so downstream experts continue with commit files only.
+
+The index location depends only on repository_url + branch, so the agent
+calls ``prefetch()`` when the workflow starts. The prefetch first waits for
+the index to be ready (the use case may still be waiting for an indexing
+job), then downloads it and opens its connection in a background thread —
+all while mcp_retrieve polls and reads files. The node blocks on it only
+when chunks are needed, for at most ``max_wait_s``; past that the experts
+run without RAG.
 """
 
+import asyncio
 import logging
+import time
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
 from typing import Any
 
 from code_analysis.domain.ports.rag_context_port import IRagContextPort
@@ -21,34 +36,211 @@ LOGGER = logging.getLogger(__name__)
 
 _MAX_CHUNKS_TOTAL = 30
 _CHUNKS_PER_FILE = 3
-_MAX_FILES_TO_QUERY = 10
+_MAX_FILES_TO_QUERY = 40
 _MAX_STRUCTURAL_LINES = 40
 _FALLBACK_QUERY_CHARS = 400
+DEFAULT_RAG_MAX_WAIT_SEC = 120.0
+
+
+@dataclass
+class _RagSession:
+    """Per-scan RAG state: the port in use and its pending prefetch."""
+
+    rag_context: IRagContextPort
+    prefetch: asyncio.Task | None = None
+    target: tuple[str, str] | None = None
+    preparing: bool = False
 
 
 class RagRetrievalNode:
     """Retrieves RAG context chunks for all commit files.
 
     For each file (up to _MAX_FILES_TO_QUERY), builds a structural query
-    (imports + function/class signatures) and searches the vector store.
-    Deduplicates by chunk_text and limits total chunks to _MAX_CHUNKS_TOTAL.
+    (imports + function/class signatures) and searches the vector store in one
+    batch. Chunks are taken round-robin by rank (every file's best match
+    first) so the _MAX_CHUNKS_TOTAL budget covers as many files as possible,
+    and are deduplicated by chunk_text.
+
+    Per-scan state lives in a session bound to the current context (the
+    agent's ``invoke``), so one compiled workflow can run several scans at
+    once. With ``rag_context_factory`` every session gets its own port;
+    otherwise all sessions share ``rag_context`` (one scan at a time).
     """
 
-    def __init__(self, rag_context: IRagContextPort):
+    def __init__(
+        self,
+        rag_context: IRagContextPort | None = None,
+        max_wait_s: float = DEFAULT_RAG_MAX_WAIT_SEC,
+        rag_context_factory: Callable[[], IRagContextPort] | None = None,
+    ):
+        if rag_context is None and rag_context_factory is None:
+            raise ValueError("rag_context or rag_context_factory is required")
         self._rag_context = rag_context
+        self._rag_context_factory = rag_context_factory
+        self._max_wait_s = max_wait_s
+        self._session_var: ContextVar[_RagSession | None] = ContextVar(
+            f"rag_session_{id(self)}", default=None
+        )
+
+    def _session(self) -> _RagSession:
+        session = self._session_var.get()
+        if session is None:
+            if self._rag_context_factory is not None:
+                rag_context = self._rag_context_factory()
+            else:
+                rag_context = self._rag_context
+            session = _RagSession(rag_context)
+            self._session_var.set(session)
+        return session
+
+    def prefetch(
+        self,
+        repository_url: str,
+        branch: str,
+        ready: Awaitable[Any] | None = None,
+    ) -> None:
+        """Start preparing the index for repository_url@branch in the background.
+
+        Args:
+            repository_url: Repository whose index to fetch.
+            branch: Branch whose index to fetch.
+            ready: Optional awaitable that completes when the index exists
+                (e.g. the use case's indexing wait); it raises if indexing
+                failed. It is never cancelled by this node.
+
+        Must be called from the running event loop. The node awaits the
+        prefetch when it runs; ``release()`` cleans up if it never does.
+        """
+        if not repository_url or not branch:
+            return
+        session = self._session()
+        if session.prefetch is not None:
+            return
+        LOGGER.info("[RAG Node] Prefetching index for %s@%s", repository_url, branch)
+        session.target = (repository_url, branch)
+        session.preparing = False
+        session.prefetch = asyncio.create_task(
+            self._run_prefetch(session, repository_url, branch, ready)
+        )
+
+    async def release(self) -> None:
+        """Settle an unconsumed or abandoned prefetch and end the scan's session."""
+        session = self._session_var.get()
+        if session is None:
+            return
+        self._session_var.set(None)
+        task, session.prefetch = session.prefetch, None
+        session.target = None
+        if task is None:
+            return
+        await asyncio.wait([task])
+        if not task.cancelled():
+            task.exception()  # retrieved; already logged by the node if relevant
+        self._close(session)
+
+    async def _run_prefetch(
+        self,
+        session: _RagSession,
+        repository_url: str,
+        branch: str,
+        ready: Awaitable[Any] | None,
+    ) -> bool:
+        """Wait for readiness, then prepare; return whether the index is usable."""
+        if ready is not None:
+            started = time.monotonic()
+            try:
+                await asyncio.shield(ready)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                LOGGER.warning("[RAG Node] RAG index unavailable: %s", exc)
+                return False
+            LOGGER.info(
+                "[RAG Node] RAG index ready after %.1fs", time.monotonic() - started
+            )
+        session.preparing = True
+        await asyncio.to_thread(self._prepare, session, repository_url, branch)
+        return True
+
+    @staticmethod
+    def _prepare(session: _RagSession, repository_url: str, branch: str) -> None:
+        session.rag_context.configure(repository_url, branch)
+        session.rag_context.prepare()
+
+    @staticmethod
+    async def _discard_prefetch(session: _RagSession) -> None:
+        """Drop a prefetch for another target before the port is reconfigured.
+
+        A readiness wait is cancelled; a download in progress is allowed to
+        finish so it never races with ``configure()``.
+        """
+        task, session.prefetch = session.prefetch, None
+        session.target = None
+        if task is None:
+            return
+        if not session.preparing:
+            task.cancel()
+        await asyncio.wait([task])
+        if not task.cancelled():
+            task.exception()  # retrieved; the port falls back to a fresh download
+
+    async def _await_prefetch(self, session: _RagSession) -> bool:
+        """Wait up to max_wait_s for the prefetch; return whether to search.
+
+        On timeout the prefetch is left to ``release()``: a readiness wait is
+        cancelled (nothing is open yet), a download in progress is allowed to
+        finish so it never races with ``close()``.
+        """
+        task = session.prefetch
+        if task is None:
+            return True
+        started = time.monotonic()
+        done, _ = await asyncio.wait([task], timeout=self._max_wait_s)
+        waited = time.monotonic() - started
+        if not done:
+            LOGGER.warning(
+                "[RAG Node] RAG index not ready after %.1fs — continuing without RAG",
+                waited,
+            )
+            if not session.preparing:
+                task.cancel()
+            return False
+
+        session.prefetch = None
+        session.target = None
+        LOGGER.info("[RAG Node] Waited %.2fs for index prefetch", waited)
+        if task.cancelled():
+            return False
+        exc = task.exception()
+        if exc is not None:
+            LOGGER.warning("[RAG Node] Index prefetch failed", exc_info=exc)
+            return True
+        return task.result()
 
     async def __call__(self, state: AgentState) -> dict[str, Any]:
         files = state.get("files", [])
+        repository_url = state.get("repository_url", "")
+        branch = state.get("branch", "")
+        session = self._session()
+
+        if session.target not in (None, (repository_url, branch)):
+            LOGGER.warning("[RAG Node] Prefetch was for another target — discarding")
+            await self._discard_prefetch(session)
+        if not await self._await_prefetch(session):
+            if session.prefetch is None:
+                self._close(session)
+            return {"rag_chunks": []}
 
         if not files:
             LOGGER.debug("[RAG Node] No files in state — skipping enrichment")
+            self._close(session)
             return {"rag_chunks": []}
 
-        repository_url = state.get("repository_url", "")
-        branch = state.get("branch", "")
         try:
-            self._rag_context.configure(repository_url, branch)
-            chunks = self._retrieve_chunks(files)
+            session.rag_context.configure(repository_url, branch)
+            chunks = await asyncio.to_thread(
+                self._retrieve_chunks, session.rag_context, files
+            )
             LOGGER.info("[RAG Node] Retrieved %d unique RAG chunks", len(chunks))
             return {"rag_chunks": chunks}
         except Exception:
@@ -57,25 +249,33 @@ class RagRetrievalNode:
             )
             return {"rag_chunks": []}
         finally:
-            try:
-                self._rag_context.close()
-            except Exception:
-                LOGGER.warning("[RAG Node] close() failed", exc_info=True)
-
-    def _retrieve_chunks(self, files: list[dict[str, str]]) -> list[dict[str, Any]]:
-        seen_texts: set[str] = set()
-        results: list[dict[str, Any]] = []
+            self._close(session)
 
-        for file in files[:_MAX_FILES_TO_QUERY]:
-            if len(results) >= _MAX_CHUNKS_TOTAL:
-                break
+    @staticmethod
+    def _close(session: _RagSession) -> None:
+        try:
+            session.rag_context.close()
+        except Exception:
+            LOGGER.warning("[RAG Node] close() failed", exc_info=True)
 
-            query = self._build_file_query(file["path"], file["content"])
-            chunks = self._rag_context.search(query, k=_CHUNKS_PER_FILE)
+    def _retrieve_chunks(
+        self, rag_context: IRagContextPort, files: list[dict[str, str]]
+    ) -> list[dict[str, Any]]:
+        queries = [
+            self._build_file_query(file["path"], file["content"])
+            for file in files[:_MAX_FILES_TO_QUERY]
+        ]
+        per_file = rag_context.search_many(queries, k=_CHUNKS_PER_FILE)
 
-            for chunk in chunks:
+        seen_texts: set[str] = set()
+        results: list[dict[str, Any]] = []
+        for rank in range(_CHUNKS_PER_FILE):
+            for chunks in per_file:
                 if len(results) >= _MAX_CHUNKS_TOTAL:
-                    break
+                    return results
+                if rank >= len(chunks):
+                    continue
+                chunk = chunks[rank]
                 text = chunk.get("chunk_text", "")
                 if text and text not in seen_texts:
                     seen_texts.add(text)
@@ -0,0 +1,148 @@
+"""Runtime settings for the LangGraph security analysis workflow.
+
+Values are read from ``TITVO_*`` environment variables by ``from_env()`` so
+operators can tune a deployment without a new image. Defaults match the
+behaviour recommended for production providers.
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+
+from code_analysis.infra.adapters.langgraph.llm_usage import (
+    ModelPrice,
+    price_overrides_from_env,
+)
+from code_analysis.infra.adapters.langgraph.nodes._sharding import (
+    DEFAULT_MAX_SHARDS,
+    DEFAULT_SHARD_CONCURRENCY,
+)
+from code_analysis.infra.adapters.langgraph.nodes.base_expert_node import (
+    PROMPT_LAYOUT_EXPERT_FIRST,
+    PROMPT_LAYOUTS,
+)
+from code_analysis.infra.adapters.langgraph.nodes.combined_experts_node import (
+    DEFAULT_COMBINED_MAX_TOKENS,
+)
+from code_analysis.infra.adapters.langgraph.nodes.mcp_retrieval_node import (
+    FETCH_CONCURRENCY,
+    FETCH_RETRIES,
+    FETCH_TIMEOUT_SEC,
+)
+from code_analysis.infra.adapters.langgraph.nodes.merge_findings_node import (
+    MERGE_TIMEOUT_SEC,
+)
+from code_analysis.infra.adapters.langgraph.token_budget import DEFAULT_RAG_SHARE
+from shared.infra.env import env_bool, env_float, env_int
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_EXPERT_MAX_CONCURRENCY = 6
+
+
+@dataclass(frozen=True)
+class WorkflowSettings:
+    """Tunables for the LangGraph workflow.
+
+    Attributes:
+        parallel_experts: Fan all experts out from the retrieval phase and
+            join them at ``merge``. Set to False to chain them sequentially
+            (for providers with tight rate limits).
+        expert_max_concurrency: Maximum number of graph nodes LangGraph runs
+            at the same time, and of concurrent expert LLM calls per scan
+            (shards included) in parallel mode; sequential mode makes one
+            call at a time.
+        mcp_fetch_concurrency: Maximum concurrent MCP ``files`` reads.
+        mcp_fetch_timeout_sec: Timeout for a single MCP ``files`` read.
+        mcp_fetch_retries: Retries per file after a failed or timed-out read.
+        merge_timeout_sec: Timeout for each findings consolidation model call;
+            on timeout the merge keeps the unconsolidated findings.
+        prompt_max_tokens: Optional cap on expert prompt tokens below the
+            model's context window (None uses the whole input budget).
+        rag_budget_share: Fraction of the expert prompt budget reserved for
+            RAG context when commit files would fill it.
+        expert_max_shards: Maximum prompts per expert when its files do not
+            fit one prompt (1 disables sharding and truncates instead).
+        expert_shard_concurrency: Maximum concurrent model calls per expert
+            across its shards, within the ``expert_max_concurrency`` cap.
+        expert_streaming: Stream expert answers with ``astream`` and parse
+            issues as they arrive; a cut-off answer keeps the complete issues.
+        prompt_layout: ``expert_first`` (expert prompt as system message) or
+            ``shared_first`` (files and RAG context as a prefix shared by all
+            experts, instructions last) so provider prompt caches hit.
+        llm_prices: (model-id prefix, price) pairs overriding the built-in
+            price table used to estimate the cost in ``final_output["usage"]``.
+        combined_max_tokens: Commits whose files and RAG context take at most
+            this many tokens are analysed by all experts in one model call
+            instead of one call per expert (0 disables it).
+    """
+
+    parallel_experts: bool = True
+    expert_max_concurrency: int = DEFAULT_EXPERT_MAX_CONCURRENCY
+    mcp_fetch_concurrency: int = FETCH_CONCURRENCY
+    mcp_fetch_timeout_sec: float = FETCH_TIMEOUT_SEC
+    mcp_fetch_retries: int = FETCH_RETRIES
+    merge_timeout_sec: float = MERGE_TIMEOUT_SEC
+    prompt_max_tokens: int | None = None
+    rag_budget_share: float = DEFAULT_RAG_SHARE
+    expert_max_shards: int = DEFAULT_MAX_SHARDS
+    expert_shard_concurrency: int = DEFAULT_SHARD_CONCURRENCY
+    expert_streaming: bool = False
+    prompt_layout: str = PROMPT_LAYOUT_EXPERT_FIRST
+    llm_prices: tuple[tuple[str, ModelPrice], ...] = ()
+    combined_max_tokens: int = DEFAULT_COMBINED_MAX_TOKENS
+
+    @classmethod
+    def from_env(cls) -> "WorkflowSettings":
+        """Build settings from environment variables."""
+        return cls(
+            parallel_experts=not env_bool("TITVO_EXPERTS_SEQUENTIAL", False),
+            expert_max_concurrency=env_int(
+                "TITVO_EXPERT_MAX_CONCURRENCY",
+                DEFAULT_EXPERT_MAX_CONCURRENCY,
+                minimum=1,
+            ),
+            mcp_fetch_concurrency=env_int(
+                "TITVO_MCP_FETCH_CONCURRENCY", FETCH_CONCURRENCY, minimum=1
+            ),
+            mcp_fetch_timeout_sec=env_float(
+                "TITVO_MCP_FETCH_TIMEOUT_SEC", FETCH_TIMEOUT_SEC, minimum=1.0
+            ),
+            mcp_fetch_retries=env_int(
+                "TITVO_MCP_FETCH_RETRIES", FETCH_RETRIES, minimum=0
+            ),
+            merge_timeout_sec=env_float(
+                "TITVO_MERGE_TIMEOUT_SEC", MERGE_TIMEOUT_SEC, minimum=1.0
+            ),
+            prompt_max_tokens=env_int("TITVO_PROMPT_MAX_TOKENS", 0, minimum=0) or None,
+            rag_budget_share=min(
+                1.0,
+                env_float("TITVO_RAG_BUDGET_SHARE", DEFAULT_RAG_SHARE, minimum=0.0),
+            ),
+            expert_max_shards=env_int(
+                "TITVO_EXPERT_MAX_SHARDS", DEFAULT_MAX_SHARDS, minimum=1
+            ),
+            expert_shard_concurrency=env_int(
+                "TITVO_EXPERT_SHARD_CONCURRENCY", DEFAULT_SHARD_CONCURRENCY, minimum=1
+            ),
+            expert_streaming=env_bool("TITVO_EXPERT_STREAMING", False),
+            prompt_layout=_prompt_layout_from_env(),
+            llm_prices=price_overrides_from_env(),
+            combined_max_tokens=env_int(
+                "TITVO_COMBINED_MAX_TOKENS", DEFAULT_COMBINED_MAX_TOKENS, minimum=0
+            ),
+        )
+
+
+def _prompt_layout_from_env() -> str:
+    raw = (os.getenv("TITVO_PROMPT_LAYOUT") or "").strip().lower()
+    if not raw:
+        return PROMPT_LAYOUT_EXPERT_FIRST
+    if raw not in PROMPT_LAYOUTS:
+        LOGGER.warning(
+            "Invalid TITVO_PROMPT_LAYOUT=%r — using %s",
+            raw,
+            PROMPT_LAYOUT_EXPERT_FIRST,
+        )
+        return PROMPT_LAYOUT_EXPERT_FIRST
+    return raw
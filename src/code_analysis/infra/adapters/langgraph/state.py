@@ -1,13 +1,44 @@
 """State definitions for LangGraph workflow.
 
 This module defines the TypedDict state that flows through the LangGraph nodes.
+
+Fields written by expert nodes use reducers so that experts running in the
+same superstep (parallel fan-out) append to the state instead of overwriting
+each other's results. Expert nodes therefore return only their own delta.
 """
 
-from typing import Any, NotRequired, TypedDict
+import operator
+from typing import Annotated, Any, NotRequired, TypedDict
 
 from code_analysis.domain.entities.expert_result import ExpertIssue
 
 
+class IssuesReplacement(list):
+    """Marks an ``issues`` update that replaces the accumulated list.
+
+    Used by the merge node, whose consolidated issues supersede the raw
+    expert findings instead of being appended to them.
+    """
+
+
+def reduce_issues(
+    current: list[ExpertIssue] | None,
+    update: list[ExpertIssue] | None,
+) -> list[ExpertIssue]:
+    """Append expert issues, or replace them with an IssuesReplacement."""
+    if isinstance(update, IssuesReplacement):
+        return list(update)
+    return [*(current or []), *(update or [])]
+
+
+def reduce_metadata(
+    current: dict[str, Any] | None,
+    update: dict[str, Any] | None,
+) -> dict[str, Any]:
+    """Merge per-node metadata dicts (later keys win)."""
+    return {**(current or {}), **(update or {})}
+
+
 class AgentState(TypedDict):
     """State object passed between LangGraph nodes.
 
@@ -29,22 +60,25 @@ class AgentState(TypedDict):
     scaned_files: int
     mcp_error: NotRequired[str | None]
 
+    # File routing (set by FileRoutingNode): expert name → indexes into files
+    routing: NotRequired[dict[str, list[int]]]
+
     # RAG context chunks (retrieved by RagRetrievalNode, consumed by expert nodes)
     rag_chunks: NotRequired[
         list[dict[str, Any]]
     ]  # {"file_path", "chunk_text", "distance"}
 
-    # Expert analysis results
-    issues: list[ExpertIssue]
+    # Expert analysis results (appended by each expert)
+    issues: Annotated[list[ExpertIssue], reduce_issues]
 
-    # Expert tracking (for sequential flow)
+    # Expert tracking
     current_expert_index: NotRequired[int]
-    expert_errors: NotRequired[list[str]]
+    expert_errors: NotRequired[Annotated[list[str], operator.add]]
 
     # Final output
     status: NotRequired[str]  # COMPLETED, WARNING, FAILED
     error: NotRequired[str | None]
     final_output: NotRequired[dict[str, Any]]
 
-    # Metadata for tracing
-    expert_metadata: NotRequired[dict[str, Any]]
+    # Metadata for tracing (one key per node/expert)
+    expert_metadata: NotRequired[Annotated[dict[str, Any], reduce_metadata]]
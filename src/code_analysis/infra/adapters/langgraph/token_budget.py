@@ -0,0 +1,186 @@
+"""Token budgeting for expert prompts.
+
+Replaces the old chars÷4 / fixed-128k heuristic with:
+
+- a registry of per-model context windows and output reserves
+  (``get_model_profile``), matched by model-id prefix;
+- real token counting with tiktoken (``TokenCounter``), cached per text so
+  each file is tokenized once per process even though six experts format it;
+- ``PromptBudget``, which splits the input budget between commit files and
+  RAG context, and ``allocate_budgets``, which shares a budget fairly
+  between files (small files keep everything, large files split the rest).
+
+tiktoken downloads its BPE ranks on first use (the Docker image pre-fetches
+them). If they are unavailable the counter falls back to a conservative
+UTF-8 bytes÷3 estimate, which also over-counts CJK and minified content
+rather than under-counting it.
+"""
+
+import logging
+import math
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+DEFAULT_RAG_SHARE = 0.2
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """Context limits for a model family.
+
+    Attributes:
+        context_window: Total tokens (input + output) the model accepts.
+        output_reserve: Tokens kept free for the model's answer.
+        count_scale: Multiplier applied to tiktoken counts for models whose
+            own tokenizer produces more tokens than o200k_base.
+    """
+
+    context_window: int
+    output_reserve: int
+    count_scale: float = 1.0
+
+    @property
+    def input_budget(self) -> int:
+        return self.context_window - self.output_reserve
+
+
+# Ordered most-specific first; matched against the model id with any
+# "provider/" routing prefix (OpenRouter) removed.
+_MODEL_PROFILES: list[tuple[str, ModelProfile]] = [
+    ("gpt-4.1", ModelProfile(1_047_576, 32_768)),
+    ("gpt-4o", ModelProfile(128_000, 16_384)),
+    ("gpt-5", ModelProfile(400_000, 128_000)),
+    ("o3", ModelProfile(200_000, 100_000)),
+    ("o4", ModelProfile(200_000, 100_000)),
+    ("claude", ModelProfile(200_000, 16_000, count_scale=1.2)),
+    ("gemini-1.5-pro", ModelProfile(2_097_152, 8_192, count_scale=1.1)),
+    ("gemini", ModelProfile(1_048_576, 65_536, count_scale=1.1)),
+]
+_DEFAULT_PROFILE = ModelProfile(128_000, 16_000, count_scale=1.2)
+
+
+def get_model_profile(model_id: str) -> ModelProfile:
+    """Return the context profile for a model id (default: 128k window)."""
+    name = model_id.lower().rsplit("/", 1)[-1]
+    for prefix, profile in _MODEL_PROFILES:
+        if name.startswith(prefix):
+            return profile
+    return _DEFAULT_PROFILE
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken, falling back to a byte-based estimate."""
+
+    _encodings: dict[str, object] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, encoding_name: str = DEFAULT_ENCODING, scale: float = 1.0):
+        self._encoding_name = encoding_name
+        self._scale = scale
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        return math.ceil(_count_tokens(self._encoding_name, text) * self._scale)
+
+    @classmethod
+    def encoding(cls, name: str):
+        """Return the tiktoken encoding, or None if it cannot be loaded."""
+        with cls._lock:
+            if name not in cls._encodings:
+                try:
+                    import tiktoken
+
+                    cls._encodings[name] = tiktoken.get_encoding(name)
+                except Exception as exc:
+                    LOGGER.warning(
+                        "tiktoken encoding %s unavailable (%s) — "
+                        "estimating tokens from UTF-8 length",
+                        name,
+                        exc,
+                    )
+                    cls._encodings[name] = None
+            return cls._encodings[name]
+
+
+@lru_cache(maxsize=8192)
+def _count_tokens(encoding_name: str, text: str) -> int:
+    encoding = TokenCounter.encoding(encoding_name)
+    if encoding is None:
+        return math.ceil(len(text.encode("utf-8")) / 3)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@dataclass(frozen=True)
+class PromptBudget:
+    """Token budget for one expert prompt (system prompt + human message).
+
+    Attributes:
+        profile: Context limits of the target model.
+        max_prompt_tokens: Optional operator cap below the model window
+            (bounds cost on 1M-token models).
+        rag_share: Fraction of the human-message budget reserved for RAG
+            context when files would otherwise use all of it.
+    """
+
+    profile: ModelProfile = _DEFAULT_PROFILE
+    max_prompt_tokens: int | None = None
+    rag_share: float = DEFAULT_RAG_SHARE
+    counter: TokenCounter = field(default_factory=TokenCounter, compare=False)
+
+    @classmethod
+    def for_model(
+        cls,
+        model_id: str,
+        max_prompt_tokens: int | None = None,
+        rag_share: float = DEFAULT_RAG_SHARE,
+    ) -> "PromptBudget":
+        profile = get_model_profile(model_id)
+        return cls(
+            profile=profile,
+            max_prompt_tokens=max_prompt_tokens,
+            rag_share=rag_share,
+            counter=TokenCounter(scale=profile.count_scale),
+        )
+
+    @property
+    def input_tokens(self) -> int:
+        """Total prompt tokens allowed (model input budget, capped)."""
+        budget = self.profile.input_budget
+        if self.max_prompt_tokens:
+            budget = min(budget, self.max_prompt_tokens)
+        return budget
+
+    def count(self, text: str) -> int:
+        return self.counter.count(text)
+
+    def split(self, system_prompt: str, rag_tokens: int) -> tuple[int, int]:
+        """Return (files_budget, rag_budget) for the human message.
+
+        RAG gets at most ``rag_share`` of what remains after the system
+        prompt (less if it needs less); files get the rest. Unused file
+        budget can still be handed to RAG by the caller afterwards.
+        """
+        available = max(0, self.input_tokens - self.count(system_prompt))
+        rag_budget = min(rag_tokens, int(available * self.rag_share))
+        return available - rag_budget, rag_budget
+
+
+def allocate_budgets(sizes: list[int], budget: int) -> list[int]:
+    """Share ``budget`` between items of the given sizes (water-filling).
+
+    Items smaller than an equal share keep their full size; what they leave
+    unused is split evenly between the larger ones.
+    """
+    allocations = [0] * len(sizes)
+    remaining = max(0, budget)
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    for position, index in enumerate(order):
+        share = remaining // (len(order) - position)
+        allocations[index] = min(sizes[index], share)
+        remaining -= allocations[index]
+    return allocations
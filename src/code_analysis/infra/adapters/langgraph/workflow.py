@@ -1,15 +1,29 @@
 """LangGraph workflow builder for security analysis."""
 
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.graph import END, StateGraph
 
+from code_analysis.domain.ports.expert_result_cache_port import IExpertResultCachePort
+from code_analysis.infra.adapters.langgraph.call_limiter import ModelCallLimiter
+from code_analysis.infra.adapters.langgraph.llm_usage import PriceTable
+from code_analysis.infra.adapters.langgraph.nodes._sharding import ShardPolicy
+from code_analysis.infra.adapters.langgraph.nodes.base_expert_node import (
+    FormattedBlockCache,
+    model_id,
+)
+from code_analysis.infra.adapters.langgraph.nodes.combined_experts_node import (
+    COMBINED_EXPERTS_NAME,
+    CombinedExpertsNode,
+)
 from code_analysis.infra.adapters.langgraph.nodes.expert_nodes import (
     create_expert_nodes,
 )
+from code_analysis.infra.adapters.langgraph.nodes.file_routing_node import (
+    FileRoutingNode,
+)
 from code_analysis.infra.adapters.langgraph.nodes.mcp_retrieval_node import (
     MCPRetrievalNode,
 )
@@ -19,7 +33,12 @@ from code_analysis.infra.adapters.langgraph.nodes.merge_findings_node import (
 from code_analysis.infra.adapters.langgraph.nodes.rag_retrieval_node import (
     RagRetrievalNode,
 )
+from code_analysis.infra.adapters.langgraph.settings import WorkflowSettings
 from code_analysis.infra.adapters.langgraph.state import AgentState
+from code_analysis.infra.adapters.langgraph.token_budget import PromptBudget
+
+if TYPE_CHECKING:
+    from langchain_mcp_adapters.client import MultiServerMCPClient
 
 LOGGER = logging.getLogger(__name__)
 
@@ -29,29 +48,89 @@ class LangGraphWorkflowBuilder:
 
     Constructs a StateGraph with:
     1. MCP Retrieval Node (fetches files)
-    2. Sequential Expert Nodes (5 experts)
-    3. Merge Findings Node (deduplication, status)
+    2. File Routing Node (file → expert matrix)
+    3. RAG Retrieval Node (optional)
+    4. Expert Nodes (6 experts), fanned out in parallel by default or
+       chained sequentially when ``settings.parallel_experts`` is False
+    5. Merge Findings Node (consolidation, status)
+
+    Small commits (files and RAG context within
+    ``settings.combined_max_tokens``) skip the fan-out: a Combined Experts
+    Node analyses them for every expert in one model call.
     """
 
     def __init__(
         self,
-        mcp_client: MultiServerMCPClient,
+        mcp_client: "MultiServerMCPClient",
         model: BaseChatModel,
         rag_node: RagRetrievalNode | None = None,
+        settings: WorkflowSettings | None = None,
+        expert_cache: IExpertResultCachePort | None = None,
     ):
         self._mcp_client = mcp_client
         self._model = model
         self._rag_node = rag_node
+        self._settings = settings or WorkflowSettings()
+        self._expert_cache = expert_cache
 
     def build(self) -> StateGraph:
         """Build and return the configured StateGraph."""
         LOGGER.info("Building LangGraph workflow")
 
         # Create nodes
-        mcp_node = MCPRetrievalNode(self._mcp_client)
+        mcp_node = MCPRetrievalNode(
+            self._mcp_client,
+            fetch_concurrency=self._settings.mcp_fetch_concurrency,
+            fetch_timeout_sec=self._settings.mcp_fetch_timeout_sec,
+            fetch_retries=self._settings.mcp_fetch_retries,
+        )
         rag_node = self._rag_node
-        expert_nodes = create_expert_nodes(self._model)
-        merge_node = MergeFindingsNode(self._model)
+        budget = PromptBudget.for_model(
+            model_id(self._model),
+            max_prompt_tokens=self._settings.prompt_max_tokens,
+            rag_share=self._settings.rag_budget_share,
+        )
+        LOGGER.info(
+            "Expert prompt budget: %d tokens (%s)", budget.input_tokens, budget.profile
+        )
+        sharding = ShardPolicy(
+            max_shards=self._settings.expert_max_shards,
+            concurrency=self._settings.expert_shard_concurrency,
+        )
+        block_cache = FormattedBlockCache()
+        parallel = self._settings.parallel_experts
+        # One cap for every expert model call of a run, shards included
+        call_limiter = ModelCallLimiter(
+            self._settings.expert_max_concurrency if parallel else 1
+        )
+        expert_nodes = create_expert_nodes(
+            self._model,
+            self._expert_cache,
+            budget,
+            sharding,
+            block_cache=block_cache,
+            streaming=self._settings.expert_streaming,
+            prompt_layout=self._settings.prompt_layout,
+            call_limiter=call_limiter,
+        )
+        combined_node = None
+        if self._settings.combined_max_tokens > 0:
+            combined_node = CombinedExpertsNode(
+                self._model,
+                expert_nodes,
+                max_context_tokens=self._settings.combined_max_tokens,
+                budget=budget,
+                block_cache=block_cache,
+                fallback_concurrency=call_limiter.limit,
+                call_limiter=call_limiter,
+            )
+        routing_node = FileRoutingNode(expert_nodes)
+        merge_node = MergeFindingsNode(
+            self._model,
+            timeout_sec=self._settings.merge_timeout_sec,
+            prices=PriceTable(self._settings.llm_prices),
+            model_id=model_id(self._model),
+        )
 
         # Build graph
         workflow = StateGraph(AgentState)
@@ -59,6 +138,9 @@ class LangGraphWorkflowBuilder:
         # Add MCP retrieval node
         workflow.add_node("mcp_retrieve", mcp_node)
 
+        # Add file routing node (file → expert matrix, built once)
+        workflow.add_node("route_files", routing_node)
+
         # Add RAG retrieval node (always present; returns [] gracefully if unavailable)
         if rag_node is not None:
             workflow.add_node("rag_retrieve", rag_node)
@@ -66,6 +148,8 @@ class LangGraphWorkflowBuilder:
         # Add expert nodes
         for expert in expert_nodes:
             workflow.add_node(f"expert_{expert.expert_name}", expert)
+        if combined_node is not None:
+            workflow.add_node(COMBINED_EXPERTS_NAME, combined_node)
 
         # Add merge node
         workflow.add_node("merge", merge_node)
@@ -73,62 +157,81 @@ class LangGraphWorkflowBuilder:
         # Set entry point
         workflow.set_entry_point("mcp_retrieve")
 
-        first_expert = "expert_prompt_hardening"
+        expert_names = [f"expert_{e.expert_name}" for e in expert_nodes]
+        # Nodes that run right after retrieval: every expert (fan-out) or
+        # only the head of the chain (sequential).
+        expert_entry = expert_names if parallel else expert_names[:1]
+
+        # Route mcp_retrieve → route_files (on success) or merge (on error)
+        def route_from_mcp(state: AgentState) -> str:
+            if state.get("mcp_error"):
+                return "merge"
+            if not state.get("files"):
+                return "merge"
+            return "route_files"
+
+        workflow.add_conditional_edges(
+            "mcp_retrieve",
+            route_from_mcp,
+            {"route_files": "route_files", "merge": "merge"},
+        )
 
         if rag_node is not None:
-            # Route mcp_retrieve → rag_retrieve (on success) or merge (on error)
-            def route_from_mcp(state: AgentState) -> str:
-                if state.get("mcp_error"):
-                    return "merge"
-                if not state.get("files"):
-                    return "merge"
-                return "rag_retrieve"
-
-            workflow.add_conditional_edges(
-                "mcp_retrieve",
-                route_from_mcp,
-                {"rag_retrieve": "rag_retrieve", "merge": "merge"},
-            )
-
-            # Route rag_retrieve → first expert (always; RAG errors are swallowed)
-            workflow.add_edge("rag_retrieve", first_expert)
+            # route_files → rag_retrieve → experts (always; RAG errors are
+            # swallowed)
+            workflow.add_edge("route_files", "rag_retrieve")
+            experts_source = "rag_retrieve"
         else:
-            # No RAG node — route mcp_retrieve directly to first expert
-            def route_from_mcp_no_rag(state: AgentState) -> str:
-                if state.get("mcp_error"):
-                    return "merge"
-                if not state.get("files"):
-                    return "merge"
-                return first_expert
+            # No RAG node — route_files goes directly to the experts
+            experts_source = "route_files"
+
+        if combined_node is not None:
+            # Small commits: one combined call instead of the expert fan-out
+            def route_to_experts(state: AgentState) -> list[str]:
+                if combined_node.fits(state):
+                    return [COMBINED_EXPERTS_NAME]
+                return expert_entry
 
             workflow.add_conditional_edges(
-                "mcp_retrieve",
-                route_from_mcp_no_rag,
-                {first_expert: first_expert, "merge": "merge"},
+                experts_source,
+                route_to_experts,
+                [*expert_entry, COMBINED_EXPERTS_NAME],
             )
+            workflow.add_edge(COMBINED_EXPERTS_NAME, "merge")
+        else:
+            for expert_name in expert_entry:
+                workflow.add_edge(experts_source, expert_name)
 
-        # Chain experts sequentially
-        expert_names = [f"expert_{e.expert_name}" for e in expert_nodes]
-
-        for i in range(len(expert_names) - 1):
-            current = expert_names[i]
-            next_node = expert_names[i + 1]
-            workflow.add_edge(current, next_node)
-            LOGGER.debug("Connected %s -> %s", current, next_node)
+        if parallel:
+            # Join: merge runs once, after every expert has finished
+            workflow.add_edge(expert_names, "merge")
+        else:
+            # Chain experts sequentially
+            for i in range(len(expert_names) - 1):
+                current = expert_names[i]
+                next_node = expert_names[i + 1]
+                workflow.add_edge(current, next_node)
+                LOGGER.debug("Connected %s -> %s", current, next_node)
 
-        # Connect last expert to merge
-        workflow.add_edge(expert_names[-1], "merge")
+            # Connect last expert to merge
+            workflow.add_edge(expert_names[-1], "merge")
 
         # Connect merge to end
         workflow.add_edge("merge", END)
 
         LOGGER.info(
             "[WorkflowBuilder] Workflow built: entry=mcp_retrieve, "
-            "%d experts, merge_node",
+            "%d experts (%s, max_concurrency=%d, combined_max_tokens=%d), "
+            "merge_node",
             len(expert_nodes),
+            "parallel" if parallel else "sequential",
+            self._settings.expert_max_concurrency,
+            self._settings.combined_max_tokens,
         )
 
-        compiled = workflow.compile()
+        compiled = workflow.compile().with_config(
+            max_concurrency=self._settings.expert_max_concurrency
+        )
         LOGGER.info("[WorkflowBuilder] Workflow compiled successfully")
         return compiled
 
@@ -148,10 +251,18 @@ class WorkflowBuildError(Exception):
 
 
 def create_workflow(
-    mcp_client: MultiServerMCPClient,
+    mcp_client: "MultiServerMCPClient",
     model: BaseChatModel,
     rag_node: RagRetrievalNode | None = None,
+    settings: WorkflowSettings | None = None,
+    expert_cache: IExpertResultCachePort | None = None,
 ) -> Any:
     """Factory function to create compiled workflow."""
-    builder = LangGraphWorkflowBuilder(mcp_client, model, rag_node=rag_node)
+    builder = LangGraphWorkflowBuilder(
+        mcp_client,
+        model,
+        rag_node=rag_node,
+        settings=settings,
+        expert_cache=expert_cache,
+    )
     return builder.build()
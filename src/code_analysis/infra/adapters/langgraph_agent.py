@@ -5,11 +5,11 @@ Implements AbstractAgent using LangGraph workflow with multiple expert nodes.
 
 import json
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from langchain_core.language_models.chat_models import BaseChatModel
-from langfuse.langchain import CallbackHandler
 
+from code_analysis.domain.ports.expert_result_cache_port import IExpertResultCachePort
 from code_analysis.domain.ports.ia_agent import (
     AbstractAgent,
     AgentMessage,
@@ -17,11 +17,20 @@ from code_analysis.domain.ports.ia_agent import (
     AgentResponse,
     AsyncAgentToolsFactory,
 )
+from code_analysis.infra.adapters.langgraph.call_limiter import model_call_scope
+from code_analysis.infra.adapters.langgraph.metrics_callback import (
+    ScanMetricsCallbackHandler,
+)
 from code_analysis.infra.adapters.langgraph.nodes.rag_retrieval_node import (
     RagRetrievalNode,
 )
+from code_analysis.infra.adapters.langgraph.settings import WorkflowSettings
 from code_analysis.infra.adapters.langgraph.state import AgentState
 from code_analysis.infra.adapters.langgraph.workflow import create_workflow
+from shared.infra.metrics import ScanMetrics, current_scan_metrics
+
+if TYPE_CHECKING:
+    from langfuse.langchain import CallbackHandler
 
 LOGGER = logging.getLogger(__name__)
 
@@ -31,7 +40,8 @@ class LangGraphAgent(AbstractAgent):
 
     This agent uses a StateGraph workflow with:
     - MCP Retrieval Node (fetches files from git)
-    - 5 Expert Nodes (prompt_hardening, owasp_api, owasp_web, devsecops, code_vulns)
+    - 6 Expert Nodes (prompt_hardening, owasp_api, owasp_web, owasp_mobile,
+      devsecops, code_vulns), parallel or sequential per WorkflowSettings
     - Merge Node (deduplication, final status)
     """
 
@@ -40,14 +50,18 @@ class LangGraphAgent(AbstractAgent):
         system_prompt: str,
         model_factory: AgentModelFactory[BaseChatModel],
         tools_factory: AsyncAgentToolsFactory,
-        langfuse_callback_handler: CallbackHandler | None = None,
+        langfuse_callback_handler: "CallbackHandler | None" = None,
         langfuse_metadata: dict[str, Any] | None = None,
         rag_node: RagRetrievalNode | None = None,
+        workflow_settings: WorkflowSettings | None = None,
+        expert_cache: IExpertResultCachePort | None = None,
     ):
         super().__init__(system_prompt, model_factory, tools_factory)
         self._langfuse_handler = langfuse_callback_handler
         self._langfuse_metadata = langfuse_metadata or {}
         self._rag_node = rag_node
+        self._workflow_settings = workflow_settings
+        self._expert_cache = expert_cache
         self._workflow = None
         self._mcp_client = None
 
@@ -85,7 +99,11 @@ class LangGraphAgent(AbstractAgent):
 
         # Build workflow
         self._workflow = create_workflow(
-            self._mcp_client, model, rag_node=self._rag_node
+            self._mcp_client,
+            model,
+            rag_node=self._rag_node,
+            settings=self._workflow_settings,
+            expert_cache=self._expert_cache,
         )
         LOGGER.info("LangGraph workflow initialized")
 
@@ -138,22 +156,52 @@ class LangGraphAgent(AbstractAgent):
                 "expert_errors": [],
             }
 
+            # Node and external-call metrics go to the use case's per-scan
+            # collector (or one for this run when called on its own)
+            scan_metrics = current_scan_metrics() or ScanMetrics(
+                initial_state["task_id"]
+            )
+
             # Execute workflow with optional Langfuse tracing
-            config = {"recursion_limit": 100}
+            config = {
+                "recursion_limit": 100,
+                "callbacks": [ScanMetricsCallbackHandler(scan_metrics)],
+            }
             if self._langfuse_handler:
-                config["callbacks"] = [self._langfuse_handler]
+                config["callbacks"].append(self._langfuse_handler)
                 config["metadata"] = {
                     **self._langfuse_metadata,
                     "agent_type": "langgraph",
                     "repository_url": initial_state["repository_url"],
                 }
+                # One Langfuse session per scan, also when a worker runs many
+                # scans through this agent
+                if params.get("task_id"):
+                    config["metadata"]["langfuse_session_id"] = params["task_id"]
 
             LOGGER.info(
                 "[LangGraphAgent] Invoking workflow: task_id=%s, repo=%s",
                 initial_state["task_id"],
                 initial_state["repository_url"],
             )
-            result = await self._workflow.ainvoke(initial_state, config=config)
+            # The RAG index depends only on repo + branch: start fetching it
+            # now (once the use case's indexing wait, if any, completes) so the
+            # wait and the download overlap MCP retrieval.
+            if self._rag_node is not None:
+                self._rag_node.prefetch(
+                    initial_state["repository_url"],
+                    initial_state["branch"],
+                    ready=params.get("rag_index_ready"),
+                )
+            try:
+                with scan_metrics.activate(), model_call_scope():
+                    result = await self._workflow.ainvoke(initial_state, config=config)
+            finally:
+                if self._rag_node is not None:
+                    await self._rag_node.release()
+            # Task-level totals so far (the use case's own calls included)
+            expert_metadata = result.setdefault("expert_metadata", {})
+            expert_metadata["scan_metrics"] = scan_metrics.totals()
             LOGGER.info(
                 "[LangGraphAgent] Workflow completed, keys: %s",
                 list(result.keys()),
@@ -187,6 +235,9 @@ class LangGraphAgent(AbstractAgent):
                     "scaned_files": final_output.get("scaned_files"),
                     "issue_count": len(final_output.get("issues", [])),
                     "expert_errors": result.get("expert_errors", []),
+                    "expert_cache": self._cache_counters(expert_metadata),
+                    "scan_metrics": expert_metadata["scan_metrics"],
+                    "usage": final_output.get("usage"),
                 },
             )
 
@@ -228,3 +279,13 @@ class LangGraphAgent(AbstractAgent):
                 params["commit_hash"] = line.replace("Commit:", "").strip()
 
         return params
+
+    @staticmethod
+    def _cache_counters(expert_metadata: dict[str, Any]) -> dict[str, int]:
+        """Sum per-expert result cache hits/misses."""
+        counters = {"hits": 0, "misses": 0}
+        for metadata in expert_metadata.values():
+            if isinstance(metadata, dict):
+                counters["hits"] += metadata.get("cache_hits", 0)
+                counters["misses"] += metadata.get("cache_misses", 0)
+        return counters
@@ -0,0 +1,259 @@
+"""Persistent on-disk cache for RAG index.db files downloaded from S3.
+
+Entries live under ``cache_dir/<sha256(key)>/`` (one per repository path +
+branch, since the S3 key encodes both) and are revalidated on every acquire
+with ``head_object``: when the ETag is unchanged the cached copy is reused,
+otherwise the new object is streamed from ``get_object`` with ``IfMatch`` and
+atomically swapped in.
+
+Cross-process coordination uses ``fcntl.flock`` on two lock files per entry:
+
+- ``download.lock`` (exclusive) serializes revalidation/download, so
+  concurrent processes on the host download a given index only once.
+- ``use.lock`` is held shared while an index is in use. Eviction only removes
+  entries whose ``use.lock`` it can take exclusively without blocking.
+
+Eviction is LRU (by index.db mtime, refreshed on every hit) bounded by
+``max_bytes``.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import botocore.exceptions
+
+from shared.infra.env import env_int
+
+LOGGER = logging.getLogger(__name__)
+
+_INDEX_FILE = "index.db"
+_META_FILE = "meta.json"
+_DOWNLOAD_LOCK = "download.lock"
+_USE_LOCK = "use.lock"
+_DEFAULT_MAX_MB = 2048
+_DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass
+class CachedIndex:
+    """A cached index.db pinned against eviction until release() is called."""
+
+    path: str
+    etag: str | None
+    downloaded: bool
+    _use_lock_fd: int | None = None
+
+    def release(self) -> None:
+        """Unpin the entry so it becomes eligible for eviction again."""
+        if self._use_lock_fd is None:
+            return
+        try:
+            fcntl.flock(self._use_lock_fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._use_lock_fd)
+            self._use_lock_fd = None
+
+
+class RagIndexCache:
+    """ETag-validated, size-bounded LRU cache of RAG index files."""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self._cache_dir = Path(cache_dir)
+        self._max_bytes = max_bytes
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def acquire(self, s3_client: Any, bucket: str, key: str) -> CachedIndex:
+        """Return a fresh local copy of s3://bucket/key, downloading if needed.
+
+        Raises ``botocore.exceptions.ClientError`` when the object does not
+        exist. Other S3 errors fall back to a stale cached copy if one exists.
+        """
+        entry_dir = self._entry_dir(key)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        index_path = entry_dir / _INDEX_FILE
+
+        use_fd = os.open(entry_dir / _USE_LOCK, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(use_fd, fcntl.LOCK_SH)
+            with _exclusive_lock(entry_dir / _DOWNLOAD_LOCK):
+                etag, downloaded = self._revalidate(
+                    s3_client, bucket, key, entry_dir, index_path
+                )
+        except BaseException:
+            fcntl.flock(use_fd, fcntl.LOCK_UN)
+            os.close(use_fd)
+            raise
+
+        # Refresh LRU position
+        os.utime(index_path)
+        cached = CachedIndex(
+            path=str(index_path),
+            etag=etag,
+            downloaded=downloaded,
+            _use_lock_fd=use_fd,
+        )
+        self.evict(keep=entry_dir)
+        return cached
+
+    def evict(self, keep: Path | None = None) -> None:
+        """Delete least-recently-used entries until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        for entry_dir in self._cache_dir.iterdir():
+            index_path = entry_dir / _INDEX_FILE
+            try:
+                stat = index_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_dir))
+            total += stat.st_size
+
+        for _mtime, size, entry_dir in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            if keep is not None and entry_dir == keep:
+                continue
+            if self._try_remove(entry_dir):
+                total -= size
+                LOGGER.info(
+                    "Evicted RAG index cache entry %s (%d bytes)", entry_dir, size
+                )
+
+    def _revalidate(
+        self,
+        s3_client: Any,
+        bucket: str,
+        key: str,
+        entry_dir: Path,
+        index_path: Path,
+    ) -> tuple[str | None, bool]:
+        """Reuse the cached copy if its ETag matches; otherwise download."""
+        meta = self._read_meta(entry_dir)
+        cached_etag = meta.get("etag") if index_path.exists() else None
+
+        try:
+            head = s3_client.head_object(Bucket=bucket, Key=key)
+        except (
+            botocore.exceptions.ClientError,
+            botocore.exceptions.BotoCoreError,
+        ) as exc:
+            # Network failures (BotoCoreError) carry no response
+            response = getattr(exc, "response", None) or {}
+            code = response.get("Error", {}).get("Code", "")
+            if code in ("404", "NoSuchKey") or cached_etag is None:
+                raise
+            LOGGER.warning(
+                "Could not revalidate cached RAG index s3://%s/%s (%s) — "
+                "using cached copy",
+                bucket,
+                key,
+                exc,
+            )
+            return cached_etag, False
+
+        etag = head.get("ETag")
+        if cached_etag is not None and cached_etag == etag:
+            LOGGER.info(
+                "RAG index cache hit for s3://%s/%s (etag=%s)", bucket, key, etag
+            )
+            return etag, False
+
+        LOGGER.info(
+            "RAG index cache %s for s3://%s/%s — downloading to %s",
+            "stale" if cached_etag else "miss",
+            bucket,
+            key,
+            index_path,
+        )
+        fd, tmp_path = tempfile.mkstemp(dir=entry_dir, suffix=".db.part")
+        os.close(fd)
+        try:
+            # download_file rejects IfMatch (not an allowed transfer argument),
+            # so the object is streamed from get_object instead.
+            params = {"Bucket": bucket, "Key": key}
+            if etag:
+                params["IfMatch"] = etag
+            body = s3_client.get_object(**params)["Body"]
+            try:
+                with open(tmp_path, "wb") as f:
+                    shutil.copyfileobj(body, f, _DOWNLOAD_CHUNK_BYTES)
+            finally:
+                body.close()
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._write_meta(entry_dir, {"etag": etag, "bucket": bucket, "key": key})
+        return etag, True
+
+    def _entry_dir(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return self._cache_dir / digest
+
+    @staticmethod
+    def _read_meta(entry_dir: Path) -> dict[str, Any]:
+        try:
+            return json.loads((entry_dir / _META_FILE).read_text("utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _write_meta(entry_dir: Path, meta: dict[str, Any]) -> None:
+        tmp_path = entry_dir / f"{_META_FILE}.part"
+        tmp_path.write_text(json.dumps(meta), "utf-8")
+        os.replace(tmp_path, entry_dir / _META_FILE)
+
+    @staticmethod
+    def _try_remove(entry_dir: Path) -> bool:
+        """Remove an entry's files unless another process is using it."""
+        use_fd = os.open(entry_dir / _USE_LOCK, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(use_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            for name in (_INDEX_FILE, _META_FILE):
+                try:
+                    (entry_dir / name).unlink()
+                except FileNotFoundError:
+                    pass
+            return True
+        finally:
+            os.close(use_fd)
+
+
+class _exclusive_lock:
+    """Blocking exclusive flock on a lock file, as a context manager."""
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._fd: int | None = None
+
+    def __enter__(self) -> None:
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+def create_rag_index_cache() -> RagIndexCache | None:
+    """Create the cache from TITVO_RAG_CACHE_DIR, or None when it is unset."""
+    cache_dir = os.getenv("TITVO_RAG_CACHE_DIR")
+    if not cache_dir:
+        return None
+    max_mb = env_int("TITVO_RAG_CACHE_MAX_MB", _DEFAULT_MAX_MB, minimum=1)
+    LOGGER.info("RAG index cache at %s (max %d MB)", cache_dir, max_mb)
+    return RagIndexCache(cache_dir, max_mb * 1024 * 1024)
@@ -0,0 +1,51 @@
+"""S3 backend for the expert result cache (production).
+
+Each entry is one JSON object at ``{prefix}{key[:2]}/{key}.json``. Expiry is
+left to a bucket lifecycle rule on the prefix.
+"""
+
+import json
+import logging
+from typing import Any
+
+import botocore.exceptions
+
+from code_analysis.domain.ports.expert_result_cache_port import IExpertResultCachePort
+
+LOGGER = logging.getLogger(__name__)
+
+
+class S3ExpertResultCache(IExpertResultCachePort):
+    def __init__(self, s3_client: Any, bucket_name: str, prefix: str = "expert-cache/"):
+        self._s3 = s3_client
+        self._bucket = bucket_name
+        self._prefix = prefix
+
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        try:
+            response = self._s3.get_object(
+                Bucket=self._bucket, Key=self._object_key(key)
+            )
+            return json.loads(response["Body"].read())
+        except botocore.exceptions.ClientError as exc:
+            code = exc.response.get("Error", {}).get("Code", "")
+            if code not in ("404", "NoSuchKey"):
+                LOGGER.warning("S3 error reading expert cache: %s", exc)
+            return None
+        except Exception:
+            LOGGER.warning("Expert cache read failed — treating as miss", exc_info=True)
+            return None
+
+    def put(self, key: str, issues: list[dict[str, Any]]) -> None:
+        try:
+            self._s3.put_object(
+                Bucket=self._bucket,
+                Key=self._object_key(key),
+                Body=json.dumps(issues, ensure_ascii=False).encode("utf-8"),
+                ContentType="application/json",
+            )
+        except Exception:
+            LOGGER.warning("Expert cache write failed", exc_info=True)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self._prefix}{key[:2]}/{key}.json"
@@ -7,7 +7,7 @@ using the same S3 path convention as the rag-indexer's S3ArtifactStoreAdapter.
 import logging
 import os
 import re
-from typing import Any
+from typing import Any, Optional
 
 import botocore.exceptions
 
@@ -63,18 +63,21 @@ class S3RagIndexStatusAdapter(IRagIndexStatusPort):
         return url
 
 
-def create_s3_rag_index_status_adapter() -> S3RagIndexStatusAdapter:
+def create_s3_rag_index_status_adapter(
+    s3_client: Optional[Any] = None,
+) -> S3RagIndexStatusAdapter:
     """Factory that reads bucket name from TITVO_RAG_INDEXER_BUCKET env var."""
-    import boto3
-
     bucket_name = os.getenv("TITVO_RAG_INDEXER_BUCKET")
     if not bucket_name:
         raise ValueError("TITVO_RAG_INDEXER_BUCKET is not set")
 
-    aws_endpoint = os.getenv("AWS_ENDPOINT")
-    if aws_endpoint:
-        s3_client = boto3.client("s3", endpoint_url=aws_endpoint)
-    else:
-        s3_client = boto3.client("s3")
+    if s3_client is None:
+        import boto3
+
+        aws_endpoint = os.getenv("AWS_ENDPOINT")
+        if aws_endpoint:
+            s3_client = boto3.client("s3", endpoint_url=aws_endpoint)
+        else:
+            s3_client = boto3.client("s3")
 
     return S3RagIndexStatusAdapter(s3_client=s3_client, bucket_name=bucket_name)
@@ -1,8 +1,18 @@
 """S3 + SQLite-vec adapter for RAG context retrieval.
 
-Downloads latest/index.db from S3 to a temporary file, loads sqlite-vec,
+Downloads latest/index.db from S3 to a temporary file (or reuses an
+ETag-validated copy from a persistent ``RagIndexCache``), loads sqlite-vec,
 and executes vector similarity search using the same embedding model as
-the rag-indexer.
+the rag-indexer. ``search_many`` embeds every query in one embeddings call.
+
+Each downloaded index gets one read-only connection (``mode=ro&immutable=1``)
+with sqlite-vec loaded once; every KNN lookup reuses it and the statement
+cache of the connection, so only the first query pays for opening the file
+and loading the extension. The connection is closed in ``close()``.
+
+``prepare()`` does the download, opens the connection and builds the
+embeddings client up front, so the workflow can run it in the background
+while MCP retrieval is still in progress.
 """
 
 import logging
@@ -10,17 +20,39 @@ import os
 import re
 import sqlite3
 import tempfile
-from typing import Any
+import urllib.parse
+from typing import TYPE_CHECKING, Any
 
 import botocore.exceptions
-from langchain_openai import OpenAIEmbeddings
 
 from code_analysis.domain.ports.rag_context_port import IRagContextPort
+from code_analysis.infra.adapters.rag_index_cache import CachedIndex, RagIndexCache
+from shared.infra import metrics
+
+if TYPE_CHECKING:
+    from langchain_openai import OpenAIEmbeddings
 
 LOGGER = logging.getLogger(__name__)
 
 _SUPPORTED_PROVIDERS = {"openai"}
 
+# Read-only tuning for the per-index connection: memory-map up to 256 MiB of
+# the file and keep up to 64 MiB of pages in the page cache (negative = KiB).
+_MMAP_SIZE_BYTES = 256 * 1024 * 1024
+_CACHE_SIZE_KIB = -64 * 1024
+
+# vec0 KNN queries require k = ? in WHERE (not just LIMIT ?)
+# when selecting auxiliary columns alongside the vector column.
+# Kept as a single constant so the connection's statement cache reuses the
+# prepared statement across queries.
+_KNN_SQL = """
+    SELECT file_path, chunk_text, distance
+    FROM chunks
+    WHERE embedding MATCH ?
+      AND k = ?
+    ORDER BY distance
+"""
+
 
 class S3SqliteRagContextAdapter(IRagContextPort):
     """Downloads index.db from S3 and searches via sqlite-vec.
@@ -36,6 +68,7 @@ class S3SqliteRagContextAdapter(IRagContextPort):
         embedding_provider: str | None,
         embedding_model: str | None,
         embedding_api_key: str | None,
+        index_cache: RagIndexCache | None = None,
     ):
         self._s3 = s3_client
         self._bucket = bucket_name
@@ -44,8 +77,12 @@ class S3SqliteRagContextAdapter(IRagContextPort):
         self._embedding_api_key = embedding_api_key
         self._repository_url: str | None = None
         self._branch: str | None = None
+        self._index_cache = index_cache
         self._db_path: str | None = None
-        self._embeddings: OpenAIEmbeddings | None = None
+        self._cached_index: CachedIndex | None = None
+        self._conn: sqlite3.Connection | None = None
+        self._conn_path: str | None = None
+        self._embeddings: "OpenAIEmbeddings | None" = None
 
     # ------------------------------------------------------------------
     # IRagContextPort
@@ -59,27 +96,58 @@ class S3SqliteRagContextAdapter(IRagContextPort):
         self._repository_url = repository_url
         self._branch = branch
 
+    def prepare(self) -> None:
+        """Download the index, open its connection and build the embeddings client."""
+        if not self._repository_url or not self._branch:
+            return
+        try:
+            db_path = self._ensure_db()
+            if db_path is not None:
+                import sqlite_vec  # lazy import: graceful if not installed
+
+                self._get_connection(db_path, sqlite_vec)
+            self._embeddings_client()
+        except Exception:
+            LOGGER.warning("RAG index prefetch failed", exc_info=True)
+            self._close_connection()
+
     def search(self, query: str, k: int) -> list[dict[str, Any]]:
         """Search for k most similar chunks. Returns [] on any error."""
+        return self.search_many([query], k)[0]
+
+    def search_many(self, queries: list[str], k: int) -> list[list[dict[str, Any]]]:
+        """Embed all queries in one request, then run one KNN lookup each.
+
+        Returns one (possibly empty) result list per query on any error.
+        """
+        empty: list[list[dict[str, Any]]] = [[] for _ in queries]
+        if not queries:
+            return empty
         if not self._repository_url or not self._branch:
             LOGGER.warning(
                 "RAG adapter not configured (call configure() first) — skipping"
             )
-            return []
+            return empty
         try:
             db_path = self._ensure_db()
             if db_path is None:
-                return []
-            embedding = self._embed(query)
-            if embedding is None:
-                return []
-            return self._query_db(db_path, embedding, k)
+                return empty
+            embeddings = self._embed_many(queries)
+            if embeddings is None:
+                return empty
+            return [self._query_db(db_path, embedding, k) for embedding in embeddings]
         except Exception:
             LOGGER.warning("RAG context search failed — returning empty", exc_info=True)
-            return []
+            return empty
 
     def close(self) -> None:
-        """Delete the temporary index.db file if it was downloaded."""
+        """Close the connection, then release or delete the index.db file."""
+        self._close_connection()
+        if self._cached_index is not None:
+            self._cached_index.release()
+            self._cached_index = None
+            self._db_path = None
+            return
         if self._db_path and os.path.exists(self._db_path):
             try:
                 os.unlink(self._db_path)
@@ -102,6 +170,13 @@ class S3SqliteRagContextAdapter(IRagContextPort):
         key = f"{repo_path}/branches/{self._branch}/latest/index.db"
 
         try:
+            if self._index_cache is not None:
+                self._cached_index = self._index_cache.acquire(
+                    self._s3, self._bucket, key
+                )
+                self._db_path = self._cached_index.path
+                return self._db_path
+
             tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
             tmp_path = tmp.name
             tmp.close()
@@ -128,8 +203,10 @@ class S3SqliteRagContextAdapter(IRagContextPort):
                 LOGGER.warning("S3 error downloading RAG index: %s", exc)
             return None
 
-    def _embed(self, text: str) -> list[float] | None:
-        """Generate an embedding vector for the query text."""
+    def _embeddings_client(self) -> "OpenAIEmbeddings | None":
+        """Return the embeddings client, creating it once (None if unusable)."""
+        if self._embeddings is not None:
+            return self._embeddings
         if (
             not self._embedding_provider
             or not self._embedding_model
@@ -147,14 +224,34 @@ class S3SqliteRagContextAdapter(IRagContextPort):
             )
             return None
 
+        from langchain_openai import OpenAIEmbeddings
+
+        self._embeddings = OpenAIEmbeddings(
+            model=self._embedding_model,
+            api_key=self._embedding_api_key,
+        )
+        return self._embeddings
+
+    def _embed_many(self, texts: list[str]) -> list[list[float]] | None:
+        """Generate embedding vectors for all texts in a single request."""
         try:
-            if self._embeddings is None:
-                self._embeddings = OpenAIEmbeddings(
-                    model=self._embedding_model,
-                    api_key=self._embedding_api_key,
+            embeddings = self._embeddings_client()
+            if embeddings is None:
+                return None
+            with metrics.timed_call(
+                metrics.EMBEDDINGS,
+                self._embedding_model,
+                size_bytes=sum(len(text) for text in texts),
+            ):
+                result = embeddings.embed_documents(texts)
+            if len(result) != len(texts):
+                LOGGER.warning(
+                    "Embedding count mismatch (%d for %d texts) — skipping RAG",
+                    len(result),
+                    len(texts),
                 )
-            result = self._embeddings.embed_documents([text])
-            return result[0] if result else None
+                return None
+            return result
         except Exception:
             LOGGER.warning(
                 "Embedding generation failed — skipping RAG enrichment", exc_info=True
@@ -174,35 +271,52 @@ class S3SqliteRagContextAdapter(IRagContextPort):
             )
             return []
 
-        conn = sqlite3.connect(db_path)
         try:
-            conn.enable_load_extension(True)
-            sqlite_vec.load(conn)
-            conn.enable_load_extension(False)
-
-            cursor = conn.cursor()
-            # vec0 KNN queries require k = ? in WHERE (not just LIMIT ?)
-            # when selecting auxiliary columns alongside the vector column.
-            cursor.execute(
-                """
-                SELECT file_path, chunk_text, distance
-                FROM chunks
-                WHERE embedding MATCH ?
-                  AND k = ?
-                ORDER BY distance
-                """,
-                (sqlite_vec.serialize_float32(embedding), k),
-            )
-            rows = cursor.fetchall()
+            conn = self._get_connection(db_path, sqlite_vec)
+            rows = conn.execute(
+                _KNN_SQL, (sqlite_vec.serialize_float32(embedding), k)
+            ).fetchall()
             return [
                 {"file_path": row[0], "chunk_text": row[1], "distance": row[2]}
                 for row in rows
             ]
         except Exception:
             LOGGER.warning("sqlite-vec query failed — returning empty", exc_info=True)
+            # Drop a possibly broken connection; the next query reopens it.
+            self._close_connection()
             return []
-        finally:
+
+    def _get_connection(self, db_path: str, sqlite_vec: Any) -> sqlite3.Connection:
+        """Return the read-only connection for db_path, opening it once."""
+        if self._conn is not None and self._conn_path == db_path:
+            return self._conn
+        self._close_connection()
+
+        uri = f"file:{urllib.parse.quote(db_path)}?mode=ro&immutable=1"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        try:
+            conn.execute(f"PRAGMA mmap_size = {_MMAP_SIZE_BYTES}")
+            conn.execute(f"PRAGMA cache_size = {_CACHE_SIZE_KIB}")
+            conn.enable_load_extension(True)
+            sqlite_vec.load(conn)
+            conn.enable_load_extension(False)
+        except Exception:
             conn.close()
+            raise
+        self._conn = conn
+        self._conn_path = db_path
+        return conn
+
+    def _close_connection(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.close()
+        except Exception:
+            LOGGER.warning("Could not close RAG index connection", exc_info=True)
+        finally:
+            self._conn = None
+            self._conn_path = None
 
     @staticmethod
     def _build_repo_path(repository_url: str) -> str:
@@ -0,0 +1,51 @@
+"""Local SQLite backend for the expert result cache (development)."""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from code_analysis.domain.ports.expert_result_cache_port import IExpertResultCachePort
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SqliteExpertResultCache(IExpertResultCachePort):
+    """Stores expert issues as JSON rows in a single SQLite file."""
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS expert_results ("
+            "key TEXT PRIMARY KEY, issues TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT issues FROM expert_results WHERE key = ?", (key,)
+                ).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception:
+            LOGGER.warning("Expert cache read failed — treating as miss", exc_info=True)
+            return None
+
+    def put(self, key: str, issues: list[dict[str, Any]]) -> None:
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO expert_results VALUES (?, ?, ?)",
+                    (key, json.dumps(issues, ensure_ascii=False), time.time()),
+                )
+                self._conn.commit()
+        except Exception:
+            LOGGER.warning("Expert cache write failed", exc_info=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
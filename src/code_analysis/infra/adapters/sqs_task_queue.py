@@ -0,0 +1,78 @@
+"""SQS-backed task queue for the scan worker.
+
+Message bodies are either a bare task ID or JSON with ``task_id`` (or
+``scan_id``). A task that fails is not deleted: SQS makes it visible again
+after the visibility timeout and the queue's redrive policy decides when it
+goes to the dead-letter queue.
+"""
+
+import json
+import logging
+from typing import Any
+
+from code_analysis.domain.ports.task_queue_port import ITaskQueuePort, QueuedTask
+
+LOGGER = logging.getLogger(__name__)
+
+_MAX_BATCH = 10  # SQS ReceiveMessage limit
+_MAX_WAIT_S = 20  # SQS long-polling limit
+
+
+class SqsTaskQueue(ITaskQueuePort):
+    def __init__(
+        self, sqs_client: Any, queue_url: str, visibility_timeout_s: int = 300
+    ):
+        self.sqs_client = sqs_client
+        self.queue_url = queue_url
+        self.visibility_timeout_s = visibility_timeout_s
+
+    def receive(self, max_tasks: int, wait_s: float) -> list[QueuedTask]:
+        response = self.sqs_client.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=max(1, min(max_tasks, _MAX_BATCH)),
+            WaitTimeSeconds=max(0, min(int(wait_s), _MAX_WAIT_S)),
+            VisibilityTimeout=self.visibility_timeout_s,
+        )
+        tasks = []
+        for message in response.get("Messages", []):
+            task_id = self._parse_task_id(message.get("Body", ""))
+            if not task_id:
+                LOGGER.error(
+                    "Discarding SQS message %s without a task id: %r",
+                    message.get("MessageId"),
+                    message.get("Body", "")[:200],
+                )
+                self.ack(QueuedTask("", message["ReceiptHandle"]))
+                continue
+            tasks.append(QueuedTask(task_id, message["ReceiptHandle"]))
+        return tasks
+
+    def ack(self, task: QueuedTask) -> None:
+        self.sqs_client.delete_message(
+            QueueUrl=self.queue_url, ReceiptHandle=task.receipt
+        )
+
+    def release(self, task: QueuedTask) -> None:
+        self.sqs_client.change_message_visibility(
+            QueueUrl=self.queue_url,
+            ReceiptHandle=task.receipt,
+            VisibilityTimeout=0,
+        )
+
+    def heartbeat(self, task: QueuedTask) -> None:
+        self.sqs_client.change_message_visibility(
+            QueueUrl=self.queue_url,
+            ReceiptHandle=task.receipt,
+            VisibilityTimeout=self.visibility_timeout_s,
+        )
+
+    @staticmethod
+    def _parse_task_id(body: str) -> str:
+        body = body.strip()
+        if body.startswith("{"):
+            try:
+                payload = json.loads(body)
+            except json.JSONDecodeError:
+                return ""
+            return str(payload.get("task_id") or payload.get("scan_id") or "")
+        return body
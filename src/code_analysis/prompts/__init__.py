@@ -42,6 +42,18 @@ class PromptRegistry:
             "findings_consolidation.md",
         )
 
+    @cache
+    def get_expert_shared_system_prompt(self) -> str:
+        """Load the system prompt shared by all experts (shared-first layout)."""
+        return resources.read_text("code_analysis.prompts", "expert_shared_system.md")
+
+    @cache
+    def get_experts_combined_system_prompt(self) -> str:
+        """Load the system prompt for all experts in one call (small commits)."""
+        return resources.read_text(
+            "code_analysis.prompts", "experts_combined_system.md"
+        )
+
     @cache
     def get_expert_prompt(self, expert_name: str) -> str:
         """Load an expert-specific prompt.
@@ -119,6 +131,16 @@ def get_findings_consolidation_prompt() -> str:
     return get_registry().get_findings_consolidation_prompt()
 
 
+def get_expert_shared_system_prompt() -> str:
+    """Load the system prompt shared by all experts."""
+    return get_registry().get_expert_shared_system_prompt()
+
+
+def get_experts_combined_system_prompt() -> str:
+    """Load the system prompt for the combined multi-expert call."""
+    return get_registry().get_experts_combined_system_prompt()
+
+
 def get_expert_prompt(expert_name: str) -> str:
     """Load an expert-specific prompt."""
     return get_registry().get_expert_prompt(expert_name)
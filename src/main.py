@@ -1,21 +1,23 @@
 import asyncio
+import atexit
 import json
 import logging
 import os
+import signal
+import time
 from logging.config import dictConfig
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 from urllib.error import URLError
 from urllib.request import urlopen
 
-import boto3
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langfuse import Langfuse
-from langfuse.langchain import CallbackHandler
-
 from code_analysis import prompts as prompt_registry
 from code_analysis.application.analyse_code_use_case import AnalyseCodeUseCase
+from code_analysis.application.scan_worker import ScanWorker
 from code_analysis.domain.notification_service import NotificationService
+from code_analysis.domain.ports.expert_result_cache_port import IExpertResultCachePort
+from code_analysis.domain.ports.task_queue_port import ITaskQueuePort
 from code_analysis.infra.adapters.dynamo_task_repository import DynamoTaskRepository
+from code_analysis.infra.adapters.in_memory_task_queue import InMemoryTaskQueue
 from code_analysis.infra.adapters.lambda_bitbucket_repository import (
     LambdaBitbucketRepository,
 )
@@ -30,27 +32,45 @@ from code_analysis.infra.adapters.langchain_agent_adapter import (
     LangchainAgentModelFactory,
 )
 from code_analysis.infra.adapters.langgraph.nodes.rag_retrieval_node import (
+    DEFAULT_RAG_MAX_WAIT_SEC,
     RagRetrievalNode,
 )
+from code_analysis.infra.adapters.langgraph.settings import WorkflowSettings
 from code_analysis.infra.adapters.langgraph_agent import LangGraphAgent
+from code_analysis.infra.adapters.rag_index_cache import create_rag_index_cache
+from code_analysis.infra.adapters.s3_expert_result_cache import S3ExpertResultCache
 from code_analysis.infra.adapters.s3_rag_index_status_adapter import (
     create_s3_rag_index_status_adapter,
 )
 from code_analysis.infra.adapters.s3_sqlite_rag_context_adapter import (
     S3SqliteRagContextAdapter,
 )
+from code_analysis.infra.adapters.sqlite_expert_result_cache import (
+    SqliteExpertResultCache,
+)
+from code_analysis.infra.adapters.sqs_task_queue import SqsTaskQueue
 from logging_config import config
 from rag_indexer_trigger.rag_indexer_batch_trigger import (
     create_rag_indexer_batch_trigger,
 )
 from shared.infra.adapters.aws_configuration_adapter import AwsConfigurationAdapter
 from shared.infra.adapters.aws_secrets_adapter import AwsSecretsAdapter
+from shared.infra.aws_clients import AwsClientRegistry
+from shared.infra.env import env_bool, env_float, env_int
+from shared.infra.metrics import EmfEmitter
+from shared.infra.polling import PollPolicy
 from shared.infra.services.encryption_service import EncryptionService
 
+if TYPE_CHECKING:
+    from langfuse.langchain import CallbackHandler
+
 dictConfig(config)
 
 LOGGER = logging.getLogger(__name__)
 
+AWS_CLIENTS = AwsClientRegistry.from_env()
+atexit.register(AWS_CLIENTS.log_stats)
+
 
 def _load_container_metadata() -> dict[str, Any]:
     """Load ECS container metadata when running under AWS Batch/ECS."""
@@ -85,10 +105,28 @@ def log_runtime_identity(task_id: str | None) -> None:
 
 
 def create_boto3_client(service_name: str) -> Any:
-    aws_endpoint = os.getenv("AWS_ENDPOINT")
-    if aws_endpoint is not None:
-        return boto3.client(service_name, endpoint_url=aws_endpoint)
-    return boto3.client(service_name)
+    """Shared, tuned client for ``service_name`` (see ``AwsClientRegistry``)."""
+    return AWS_CLIENTS.client(service_name)
+
+
+def create_expert_result_cache() -> Optional[IExpertResultCachePort]:
+    """Select the expert result cache backend from TITVO_EXPERT_CACHE."""
+    backend = os.getenv("TITVO_EXPERT_CACHE", "").strip().lower()
+    if backend in ("", "off", "none"):
+        return None
+    if backend == "sqlite":
+        path = os.getenv("TITVO_EXPERT_CACHE_PATH", "expert_cache.db")
+        LOGGER.info("Expert result cache: sqlite (%s)", path)
+        return SqliteExpertResultCache(path)
+    if backend == "s3":
+        bucket = os.getenv("TITVO_EXPERT_CACHE_BUCKET")
+        if not bucket:
+            LOGGER.warning("TITVO_EXPERT_CACHE_BUCKET is not set — cache disabled")
+            return None
+        LOGGER.info("Expert result cache: s3 (%s)", bucket)
+        return S3ExpertResultCache(create_boto3_client("s3"), bucket)
+    LOGGER.warning("Unknown TITVO_EXPERT_CACHE=%r — cache disabled", backend)
+    return None
 
 
 async def create_langgraph_agent(
@@ -96,10 +134,12 @@ async def create_langgraph_agent(
     ai_model: str,
     ai_api_key: str,
     mcp_server_url: str,
-    langfuse_handler: Optional[CallbackHandler],
+    langfuse_handler: Optional["CallbackHandler"],
     langfuse_metadata: Optional[dict[str, Any]],
     rag_node: Optional[RagRetrievalNode] = None,
     ai_base_url: Optional[str] = None,
+    workflow_settings: Optional[WorkflowSettings] = None,
+    expert_cache: Optional[IExpertResultCachePort] = None,
 ):
     """Create LangGraph agent with expert nodes."""
     LOGGER.info("Using LANGGRAPH agent mode (LangGraphAgent with expert nodes)")
@@ -114,6 +154,8 @@ async def create_langgraph_agent(
         ai_api_key=ai_api_key,
         ai_base_url=ai_base_url,
     )
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+
     tools_factory = AsyncMCPToolsFactory(
         mcp_client=MultiServerMCPClient(
             {
@@ -129,18 +171,38 @@ async def create_langgraph_agent(
         model_factory=model_factory,
         tools_factory=tools_factory,
         langfuse_callback_handler=langfuse_handler,
-        langfuse_metadata=langfuse_metadata,
+        langfuse_metadata=None,
         rag_node=rag_node,
+        workflow_settings=workflow_settings,
+        expert_cache=expert_cache,
     )
     return agent, content_template
 
 
-async def main():
-    task_id = os.getenv("TITVO_SCAN_TASK_ID")
-    log_runtime_identity(task_id)
-    LOGGER.debug("Starting the application with task id %s", task_id)
-    if task_id is None:
-        raise ValueError("TITVO_SCAN_TASK_ID is not set")
+# Every parameter main() reads from the configuration table, loaded in bulk
+_CONFIG_PARAMETERS = [
+    "mcp_server_url",
+    "ai_provider",
+    "ai_model",
+    "ai_api_key",
+    "ai_base_url",
+    "langfuse_public_key",
+    "langfuse_secret_key",
+    "langfuse_host",
+    "embedding_provider",
+    "embedding_model",
+    "embedding_api_key",
+]
+
+
+async def create_analyse_code_use_case(
+    concurrent_scans: bool = False,
+) -> AnalyseCodeUseCase:
+    """Wire the use case and everything it reuses across scans.
+
+    With ``concurrent_scans`` (worker mode) every scan gets its own RAG
+    adapter; the compiled workflow, models and clients stay shared.
+    """
     task_table_name = os.getenv("TITVO_DYNAMO_TASK_TABLE_NAME")
     LOGGER.debug("Task table name %s", task_table_name)
     if task_table_name is None:
@@ -180,6 +242,13 @@ async def main():
             ),
         ),
     )
+    config_start = time.perf_counter()
+    configuration_provider.get_values(_CONFIG_PARAMETERS)
+    LOGGER.info(
+        "Loaded %d configuration parameters in %.3fs",
+        len(_CONFIG_PARAMETERS),
+        time.perf_counter() - config_start,
+    )
     mcp_server_url = configuration_provider.get_value("mcp_server_url")
     LOGGER.debug("MCP server url %s", mcp_server_url)
     if mcp_server_url is None:
@@ -208,22 +277,22 @@ async def main():
     langfuse_public_key = configuration_provider.get_secret("langfuse_public_key")
     langfuse_secret_key = configuration_provider.get_secret("langfuse_secret_key")
     langfuse_host = configuration_provider.get_value("langfuse_host")
-    langfuse_callback_handler: Optional[CallbackHandler] = None
-    langfuse_metadata: Optional[dict[str, Any]] = None
+    langfuse_callback_handler: Optional["CallbackHandler"] = None
     if (
         langfuse_public_key is not None
         and langfuse_secret_key is not None
         and langfuse_host is not None
     ):
+        from langfuse import Langfuse
+        from langfuse.langchain import CallbackHandler
+
         Langfuse(
             public_key=langfuse_public_key,
             secret_key=langfuse_secret_key,
             host=langfuse_host,
         )
+        # The agent tags each scan's trace with its task id as the session
         langfuse_callback_handler = CallbackHandler()
-        langfuse_metadata = {
-            "langfuse_session_id": task_id,
-        }
 
     # RAG context enrichment setup
     rag_indexer_bucket = os.getenv("TITVO_RAG_INDEXER_BUCKET")
@@ -237,14 +306,27 @@ async def main():
         and embedding_model
         and embedding_api_key
     ):
-        rag_context_adapter = S3SqliteRagContextAdapter(
-            s3_client=create_boto3_client("s3"),
-            bucket_name=rag_indexer_bucket,
-            embedding_provider=embedding_provider,
-            embedding_model=embedding_model,
-            embedding_api_key=embedding_api_key,
+        index_cache = create_rag_index_cache()
+
+        def create_rag_context() -> S3SqliteRagContextAdapter:
+            return S3SqliteRagContextAdapter(
+                s3_client=create_boto3_client("s3"),
+                bucket_name=rag_indexer_bucket,
+                embedding_provider=embedding_provider,
+                embedding_model=embedding_model,
+                embedding_api_key=embedding_api_key,
+                index_cache=index_cache,
+            )
+
+        rag_max_wait_s = env_float(
+            "TITVO_RAG_MAX_WAIT_SEC", DEFAULT_RAG_MAX_WAIT_SEC, minimum=0.0
         )
-        rag_node = RagRetrievalNode(rag_context_adapter)
+        if concurrent_scans:
+            rag_node = RagRetrievalNode(
+                rag_context_factory=create_rag_context, max_wait_s=rag_max_wait_s
+            )
+        else:
+            rag_node = RagRetrievalNode(create_rag_context(), max_wait_s=rag_max_wait_s)
         LOGGER.info("RAG context enrichment enabled (bucket=%s)", rag_indexer_bucket)
     else:
         LOGGER.warning(
@@ -252,31 +334,42 @@ async def main():
             rag_indexer_bucket,
         )
 
+    workflow_settings = WorkflowSettings.from_env()
+    LOGGER.debug("Workflow settings %s", workflow_settings)
+
     agent, content_template = await create_langgraph_agent(
         ai_provider=ai_provider,
         ai_model=ai_model,
         ai_api_key=ai_api_key,
         mcp_server_url=mcp_server_url,
         langfuse_handler=langfuse_callback_handler,
-        langfuse_metadata=langfuse_metadata,
+        langfuse_metadata=None,
         rag_node=rag_node,
         ai_base_url=ai_base_url,
+        workflow_settings=workflow_settings,
+        expert_cache=create_expert_result_cache(),
     )
 
+    lambda_client = create_boto3_client("lambda")
     notification_service = NotificationService(
         bitbucket_repository=LambdaBitbucketRepository(
             function_name=bitbucket_repository_function_name,
+            lambda_client=lambda_client,
         ),
         github_repository=LambdaGitHubRepository(
             function_name=github_repository_function_name,
+            lambda_client=lambda_client,
         ),
         report_repository=LambdaReportRepository(
             function_name=report_repository_function_name,
+            lambda_client=lambda_client,
         ),
     )
 
-    rag_index_status = create_s3_rag_index_status_adapter()
-    rag_indexer_trigger = create_rag_indexer_batch_trigger()
+    rag_index_status = create_s3_rag_index_status_adapter(create_boto3_client("s3"))
+    rag_indexer_trigger = create_rag_indexer_batch_trigger(
+        batch_client=create_boto3_client("batch")
+    )
 
     analyse_code_use_case = AnalyseCodeUseCase(
         task_repository=task_repository,
@@ -285,9 +378,63 @@ async def main():
         notification_service=notification_service,
         rag_index_status=rag_index_status,
         rag_indexer_trigger=rag_indexer_trigger,
+        rag_poll_policy=PollPolicy.from_env("TITVO_RAG"),
+        task_time_budget_s=env_float("TITVO_TASK_TIME_BUDGET_SEC", 0.0) or None,
+        metrics_emitter=EmfEmitter.from_env(),
     )
+    return analyse_code_use_case
+
+
+def create_task_queue() -> ITaskQueuePort:
+    """Worker task source: SQS queue, or a local file of task IDs."""
+    queue_url = os.getenv("TITVO_WORKER_QUEUE_URL")
+    if queue_url:
+        return SqsTaskQueue(
+            create_boto3_client("sqs"),
+            queue_url,
+            visibility_timeout_s=env_int(
+                "TITVO_WORKER_VISIBILITY_TIMEOUT_SEC", 900, minimum=30
+            ),
+        )
+    task_file = os.getenv("TITVO_WORKER_TASK_FILE")
+    if task_file:
+        return InMemoryTaskQueue.from_file(task_file)
+    raise ValueError("TITVO_WORKER_QUEUE_URL or TITVO_WORKER_TASK_FILE must be set")
+
+
+async def main():
+    startup_start = time.perf_counter()
+    task_id = os.getenv("TITVO_SCAN_TASK_ID")
+    log_runtime_identity(task_id)
+    LOGGER.debug("Starting the application with task id %s", task_id)
+    if task_id is None:
+        raise ValueError("TITVO_SCAN_TASK_ID is not set")
+    analyse_code_use_case = await create_analyse_code_use_case()
+    LOGGER.info("Startup completed in %.3fs", time.perf_counter() - startup_start)
     await analyse_code_use_case.execute(task_id)
 
 
+async def run_worker():
+    """Process scan tasks from a queue until SIGTERM (or an empty task file)."""
+    startup_start = time.perf_counter()
+    log_runtime_identity(None)
+    queue = create_task_queue()
+    analyse_code_use_case = await create_analyse_code_use_case(concurrent_scans=True)
+    drain_timeout_s = env_float("TITVO_WORKER_DRAIN_TIMEOUT_SEC", 0.0, minimum=0.0)
+    worker = ScanWorker(
+        queue=queue,
+        execute=analyse_code_use_case.execute,
+        concurrency=env_int("TITVO_WORKER_CONCURRENCY", 2, minimum=1),
+        poll_wait_s=env_float("TITVO_WORKER_POLL_WAIT_SEC", 20.0, minimum=0.0),
+        drain_timeout_s=drain_timeout_s or None,
+        stop_when_empty=isinstance(queue, InMemoryTaskQueue),
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.request_stop)
+    LOGGER.info("Startup completed in %.3fs", time.perf_counter() - startup_start)
+    await worker.run()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run_worker() if env_bool("TITVO_WORKER_MODE", False) else main())
@@ -7,6 +7,9 @@ Supports two modes:
 The HTTP batch-runner API mirrors the TypeScript batch.service.ts implementation:
   POST /run-batch  — start a Docker container job
   POST /get-job-status — get the status of a job by jobId
+
+``wait_for_job`` polls a job with an adaptive ``PollPolicy`` and reports how
+long the caller waited versus how long the job itself ran.
 """
 
 import json
@@ -19,6 +22,8 @@ from typing import Dict, List, Optional
 
 import boto3
 
+from shared.infra.polling import PollPolicy, PollResult, poll_until
+
 LOGGER = logging.getLogger(__name__)
 
 _SUCCEEDED = "SUCCEEDED"
@@ -30,6 +35,16 @@ _RUNNING_STATUSES = {"SUBMITTED", "PENDING", "RUNNABLE", "STARTING", "RUNNING"}
 class JobStatusResponse:
     status: str
     is_failed: bool
+    # Epoch seconds reported by the batch backend, when available
+    started_at: Optional[float] = None
+    stopped_at: Optional[float] = None
+
+    @property
+    def duration_s(self) -> Optional[float]:
+        """How long the job ran, if the backend reported start/stop times."""
+        if self.started_at is None or self.stopped_at is None:
+            return None
+        return max(0.0, self.stopped_at - self.started_at)
 
     @property
     def is_terminal(self) -> bool:
@@ -86,6 +101,27 @@ class BatchService:
             return self._get_aws_batch_job_status(job_id)
         raise RuntimeError("Neither batch-runner nor AWS Batch client is configured")
 
+    async def wait_for_job(
+        self,
+        job_id: str,
+        policy: Optional[PollPolicy] = None,
+        deadline: Optional[float] = None,
+    ) -> PollResult[JobStatusResponse]:
+        """Poll until the job reaches a terminal status.
+
+        Raises ``shared.infra.polling.PollTimeoutError`` if the policy timeout
+        or ``deadline`` (``time.monotonic()`` based) passes first.
+        """
+        result = await poll_until(
+            lambda: self.get_job_status(job_id),
+            lambda status: status.is_terminal,
+            policy or PollPolicy(),
+            deadline=deadline,
+            description=f"Batch job {job_id}",
+        )
+        log_job_wait(job_id, result)
+        return result
+
     # --- HTTP (batch-runner) helpers ---
 
     def _submit_docker_job(
@@ -118,7 +154,12 @@ class BatchService:
         payload = json.dumps({"jobId": job_id}).encode()
         data = self._http_post(f"{self._runner_url}/get-job-status", payload)
         status: str = data.get("status", _FAILED)
-        return JobStatusResponse(status=status, is_failed=status == _FAILED)
+        return JobStatusResponse(
+            status=status,
+            is_failed=status == _FAILED,
+            started_at=_epoch_seconds(data.get("startedAt")),
+            stopped_at=_epoch_seconds(data.get("stoppedAt")),
+        )
 
     # --- AWS Batch helpers ---
 
@@ -150,8 +191,14 @@ class BatchService:
         jobs = response.get("jobs", [])
         if not jobs:
             raise RuntimeError(f"describe_jobs returned no results for jobId={job_id}")
-        status: str = jobs[0].get("status", _FAILED)
-        return JobStatusResponse(status=status, is_failed=status == _FAILED)
+        job = jobs[0]
+        status: str = job.get("status", _FAILED)
+        return JobStatusResponse(
+            status=status,
+            is_failed=status == _FAILED,
+            started_at=_epoch_seconds(job.get("startedAt")),
+            stopped_at=_epoch_seconds(job.get("stoppedAt")),
+        )
 
     # --- shared HTTP utility ---
 
@@ -171,9 +218,41 @@ class BatchService:
             ) from exc
 
 
+def log_job_wait(job_id: str, result: PollResult[JobStatusResponse]) -> None:
+    """Log how long we waited for a job versus how long it actually ran."""
+    duration = result.value.duration_s
+    if duration is None:
+        LOGGER.info(
+            "Batch job %s %s: waited %.1fs over %d checks",
+            job_id,
+            result.value.status,
+            result.waited_s,
+            result.attempts,
+        )
+        return
+    LOGGER.info(
+        "Batch job %s %s: waited %.1fs over %d checks, job ran %.1fs "
+        "(%.1fs spent queued or undetected)",
+        job_id,
+        result.value.status,
+        result.waited_s,
+        result.attempts,
+        duration,
+        max(0.0, result.waited_s - duration),
+    )
+
+
+def _epoch_seconds(value: object) -> Optional[float]:
+    """Convert a Batch epoch-milliseconds timestamp to seconds."""
+    if isinstance(value, (int, float)) and value > 0:
+        return value / 1000.0
+    return None
+
+
 def create_batch_service(
     aws_stage: Optional[str] = None,
     batch_runner_url: Optional[str] = None,
+    batch_client: Optional[object] = None,
 ) -> BatchService:
     """Factory that selects the appropriate BatchService implementation.
 
@@ -195,6 +274,8 @@ def create_batch_service(
         )
         return BatchService(batch_runner_url=runner_url)
 
+    if batch_client is not None:
+        return BatchService(batch_client=batch_client)
     aws_endpoint = os.getenv("AWS_ENDPOINT")
     if aws_endpoint:
         client = boto3.client("batch", endpoint_url=aws_endpoint)
@@ -3,8 +3,10 @@
 import logging
 import os
 import uuid
+from typing import Optional
 
 from rag_indexer_trigger.batch_service import BatchService, JobStatusResponse
+from shared.infra.polling import PollPolicy, PollResult
 
 LOGGER = logging.getLogger(__name__)
 
@@ -77,6 +79,15 @@ class RagIndexerBatchTrigger:
         """Delegate status check to the underlying BatchService."""
         return self._batch_service.get_job_status(job_id)
 
+    async def wait_for_job(
+        self,
+        job_id: str,
+        policy: Optional[PollPolicy] = None,
+        deadline: Optional[float] = None,
+    ) -> PollResult[JobStatusResponse]:
+        """Delegate adaptive polling to the underlying BatchService."""
+        return await self._batch_service.wait_for_job(job_id, policy, deadline)
+
     def _build_environment(
         self,
         repo_url: str,
@@ -109,8 +120,14 @@ class RagIndexerBatchTrigger:
         return env
 
 
-def create_rag_indexer_batch_trigger() -> RagIndexerBatchTrigger:
-    """Factory that reads configuration from environment variables."""
+def create_rag_indexer_batch_trigger(
+    batch_client: Optional[object] = None,
+) -> RagIndexerBatchTrigger:
+    """Factory that reads configuration from environment variables.
+
+    ``batch_client`` lets the caller share an already configured boto3 Batch
+    client; it is ignored on LocalStack, which uses the HTTP batch-runner.
+    """
     from rag_indexer_trigger.batch_service import create_batch_service
 
     aws_stage = os.getenv("AWS_STAGE", "")
@@ -138,7 +155,7 @@ def create_rag_indexer_batch_trigger() -> RagIndexerBatchTrigger:
     aws_endpoint = os.getenv("AWS_ENDPOINT", "")
     log_level = os.getenv("TITVO_LOG_LEVEL", "INFO")
 
-    batch_service = create_batch_service(aws_stage=aws_stage)
+    batch_service = create_batch_service(aws_stage=aws_stage, batch_client=batch_client)
 
     return RagIndexerBatchTrigger(
         batch_service=batch_service,
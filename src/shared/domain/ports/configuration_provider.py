@@ -9,3 +9,11 @@ class IConfigurationProvider(abc.ABC):
     @abc.abstractmethod
     def get_secret(self, name: str) -> str | None:
         pass
+
+    def get_values(self, names: list[str]) -> dict[str, str | None]:
+        """Load several values at once (None for missing names).
+
+        Adapters should override this with a bulk read and serve later
+        get_value/get_secret calls for the same names from memory.
+        """
+        return {name: self.get_value(name) for name in names}
@@ -1,8 +1,17 @@
+import logging
+import time
 from typing import Any
 
 from shared.domain.ports.configuration_provider import IConfigurationProvider
 from shared.domain.services.iencryption_service import IEncryptionService
 
+LOGGER = logging.getLogger(__name__)
+
+# BatchGetItem accepts at most 100 keys per request
+_BATCH_GET_MAX_KEYS = 100
+_BATCH_GET_MAX_RETRIES = 5
+_BATCH_GET_RETRY_BACKOFF_S = 0.05
+
 
 class AwsConfigurationAdapter(IConfigurationProvider):
     def __init__(
@@ -14,8 +23,12 @@ class AwsConfigurationAdapter(IConfigurationProvider):
         self.encryption_service = encryption_service
         self.dynamodb_client = dynamodb_client
         self.table_name = table_name
+        # Values loaded by get_values(); None records a missing parameter
+        self._values: dict[str, str | None] = {}
 
     def get_value(self, parameter_id: str) -> str:
+        if parameter_id in self._values:
+            return self._values[parameter_id]
         response = self.dynamodb_client.get_item(
             TableName=self.table_name, Key={"parameter_id": {"S": parameter_id}}
         )
@@ -28,3 +41,37 @@ class AwsConfigurationAdapter(IConfigurationProvider):
         if encrypted_value is None:
             return None
         return self.encryption_service.decrypt(encrypted_value)
+
+    def get_values(self, parameter_ids: list[str]) -> dict[str, str | None]:
+        """Load parameters with BatchGetItem and keep them for later lookups."""
+        pending = [p for p in dict.fromkeys(parameter_ids) if p not in self._values]
+        for start in range(0, len(pending), _BATCH_GET_MAX_KEYS):
+            chunk = pending[start : start + _BATCH_GET_MAX_KEYS]
+            found = self._batch_get(chunk)
+            for parameter_id in chunk:
+                self._values[parameter_id] = found.get(parameter_id)
+        return {p: self._values[p] for p in parameter_ids}
+
+    def _batch_get(self, parameter_ids: list[str]) -> dict[str, str]:
+        request_items: dict[str, Any] = {
+            self.table_name: {
+                "Keys": [{"parameter_id": {"S": p}} for p in parameter_ids],
+                # "value" is a DynamoDB reserved word
+                "ProjectionExpression": "parameter_id, #v",
+                "ExpressionAttributeNames": {"#v": "value"},
+            }
+        }
+        found: dict[str, str] = {}
+        for attempt in range(_BATCH_GET_MAX_RETRIES + 1):
+            response = self.dynamodb_client.batch_get_item(RequestItems=request_items)
+            for item in response.get("Responses", {}).get(self.table_name, []):
+                found[item["parameter_id"]["S"]] = item["value"]["S"]
+            request_items = response.get("UnprocessedKeys") or {}
+            if not request_items:
+                return found
+            if attempt < _BATCH_GET_MAX_RETRIES:
+                time.sleep(_BATCH_GET_RETRY_BACKOFF_S * 2**attempt)
+        raise RuntimeError(
+            f"BatchGetItem left unprocessed keys in {self.table_name} after "
+            f"{_BATCH_GET_MAX_RETRIES} retries"
+        )
@@ -0,0 +1,261 @@
+"""Process-wide registry of tuned, lazily created boto3 clients.
+
+Every adapter used to build its own client with the default ``botocore``
+config: separate cold connection pools per client, 60 s connect timeouts and
+legacy retries. ``AwsClientRegistry`` shares one ``boto3.Session`` and hands
+out a single client per service, created on first use with:
+
+- ``max_pool_connections`` sized for the concurrent calls the agent makes;
+- short connect / bounded read timeouts;
+- ``adaptive`` retry mode (client-side rate limiting on throttling);
+- TCP keepalive for connections that idle between scan phases.
+
+Each client is instrumented through botocore's event hooks; ``log_stats``
+reports per-service call counts and latency (registered at exit by
+``main``). Calls made while a scan is running are also recorded, per
+operation with bytes and retries, in the scan's ``ScanMetrics``.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from shared.infra import metrics
+from shared.infra.env import env_bool, env_float, env_int
+
+LOGGER = logging.getLogger(__name__)
+
+_RETRY_MODES = ("legacy", "standard", "adaptive")
+_STARTED_AT = "titvo_call_started_at"
+_BYTES_SENT = "titvo_call_bytes_sent"
+
+
+@dataclass(frozen=True)
+class AwsClientSettings:
+    """``botocore.config.Config`` knobs shared by every client.
+
+    Attributes:
+        max_pool_connections: HTTP connections kept per client.
+        connect_timeout_s: Timeout for establishing a connection.
+        read_timeout_s: Timeout waiting for a response (synchronous Lambda
+            invocations included).
+        max_attempts: Total attempts per call, first one included.
+        retry_mode: botocore retry mode (legacy, standard or adaptive).
+        tcp_keepalive: Enable TCP keepalive on pooled sockets.
+        endpoint_url: Override endpoint (LocalStack); ``None`` for AWS.
+    """
+
+    max_pool_connections: int = 32
+    connect_timeout_s: float = 5.0
+    read_timeout_s: float = 60.0
+    max_attempts: int = 5
+    retry_mode: str = "adaptive"
+    tcp_keepalive: bool = True
+    endpoint_url: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "AwsClientSettings":
+        """Build settings from ``TITVO_AWS_*`` variables and ``AWS_ENDPOINT``."""
+        defaults = cls()
+        retry_mode = os.getenv("TITVO_AWS_RETRY_MODE", defaults.retry_mode)
+        retry_mode = retry_mode.strip().lower()
+        if retry_mode not in _RETRY_MODES:
+            LOGGER.warning(
+                "Invalid TITVO_AWS_RETRY_MODE=%r — using default %s",
+                retry_mode,
+                defaults.retry_mode,
+            )
+            retry_mode = defaults.retry_mode
+        return cls(
+            max_pool_connections=env_int(
+                "TITVO_AWS_MAX_POOL_CONNECTIONS",
+                defaults.max_pool_connections,
+                minimum=1,
+            ),
+            connect_timeout_s=env_float(
+                "TITVO_AWS_CONNECT_TIMEOUT_SEC", defaults.connect_timeout_s, minimum=0.1
+            ),
+            read_timeout_s=env_float(
+                "TITVO_AWS_READ_TIMEOUT_SEC", defaults.read_timeout_s, minimum=0.1
+            ),
+            max_attempts=env_int(
+                "TITVO_AWS_MAX_ATTEMPTS", defaults.max_attempts, minimum=1
+            ),
+            retry_mode=retry_mode,
+            tcp_keepalive=env_bool("TITVO_AWS_TCP_KEEPALIVE", defaults.tcp_keepalive),
+            endpoint_url=os.getenv("AWS_ENDPOINT") or None,
+        )
+
+    def to_config(self) -> Any:
+        """Return the equivalent ``botocore.config.Config``."""
+        from botocore.config import Config
+
+        return Config(
+            max_pool_connections=self.max_pool_connections,
+            connect_timeout=self.connect_timeout_s,
+            read_timeout=self.read_timeout_s,
+            retries={"mode": self.retry_mode, "total_max_attempts": self.max_attempts},
+            tcp_keepalive=self.tcp_keepalive,
+        )
+
+
+@dataclass
+class ServiceCallStats:
+    """Calls made through one service client (retries count once)."""
+
+    calls: int = 0
+    errors: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    @property
+    def avg_s(self) -> float:
+        return self.total_s / self.calls if self.calls else 0.0
+
+
+class AwsClientRegistry:
+    """Shared ``boto3.Session`` handing out one tuned client per service.
+
+    Thread-safe: adapters call it from worker threads (``asyncio.to_thread``).
+    """
+
+    def __init__(
+        self,
+        settings: Optional[AwsClientSettings] = None,
+        session: Any = None,
+    ):
+        self.settings = settings or AwsClientSettings()
+        self._session = session
+        self._clients: dict[str, Any] = {}
+        self._stats: dict[str, ServiceCallStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AwsClientRegistry":
+        return cls(AwsClientSettings.from_env())
+
+    def client(self, service_name: str) -> Any:
+        """Return the shared client for ``service_name``, creating it once."""
+        client = self._clients.get(service_name)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(service_name)
+            if client is None:
+                client = self._create_client(service_name)
+                self._clients[service_name] = client
+        return client
+
+    def _create_client(self, service_name: str) -> Any:
+        started = time.perf_counter()
+        if self._session is None:
+            import boto3
+
+            self._session = boto3.session.Session()
+        kwargs: dict[str, Any] = {"config": self.settings.to_config()}
+        if self.settings.endpoint_url:
+            kwargs["endpoint_url"] = self.settings.endpoint_url
+        client = self._session.client(service_name, **kwargs)
+        self._instrument(client, service_name)
+        LOGGER.debug(
+            "Created %s client in %.3fs", service_name, time.perf_counter() - started
+        )
+        return client
+
+    def _instrument(self, client: Any, service_name: str) -> None:
+        events = client.meta.events
+        prefix = client.meta.service_model.service_id.hyphenize()
+
+        # Start timing at parameter build: before-call may be short-circuited
+        # by other handlers (stubs) that return a response.
+        def _start(context: dict, **_kwargs: Any) -> None:
+            context[_STARTED_AT] = time.perf_counter()
+
+        def _request_created(request: Any, **_kwargs: Any) -> None:
+            body = getattr(request, "body", None)
+            if isinstance(body, (bytes, str)):
+                request.context[_BYTES_SENT] = len(body)
+
+        def _after_call(
+            context: dict,
+            event_name: str,
+            http_response: Any = None,
+            parsed: Any = None,
+            **_kwargs: Any,
+        ) -> None:
+            status = getattr(http_response, "status_code", 200)
+            headers = getattr(http_response, "headers", None) or {}
+            response_meta = (parsed or {}).get("ResponseMetadata", {})
+            self._record(
+                service_name,
+                context,
+                failed=status >= 300,
+                operation=event_name.rsplit(".", 1)[-1],
+                bytes_received=int(headers.get("content-length") or 0),
+                retries=response_meta.get("RetryAttempts", 0),
+            )
+
+        def _after_call_error(context: dict, event_name: str, **_kwargs: Any):
+            self._record(
+                service_name,
+                context,
+                failed=True,
+                operation=event_name.rsplit(".", 1)[-1],
+            )
+
+        events.register(f"before-parameter-build.{prefix}", _start)
+        events.register(f"request-created.{prefix}", _request_created)
+        events.register(f"after-call.{prefix}", _after_call)
+        events.register(f"after-call-error.{prefix}", _after_call_error)
+
+    def _record(
+        self,
+        service_name: str,
+        context: dict,
+        failed: bool,
+        operation: str,
+        bytes_received: int = 0,
+        retries: int = 0,
+    ) -> None:
+        started = context.pop(_STARTED_AT, None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            stats = self._stats.setdefault(service_name, ServiceCallStats())
+            stats.calls += 1
+            stats.errors += int(failed)
+            stats.total_s += elapsed
+            stats.max_s = max(stats.max_s, elapsed)
+        metrics.record_call(
+            metrics.AWS,
+            f"{service_name}.{operation}",
+            elapsed,
+            ok=not failed,
+            size_bytes=context.pop(_BYTES_SENT, 0) + bytes_received,
+            retries=retries,
+        )
+
+    def stats(self) -> dict[str, ServiceCallStats]:
+        """Snapshot of per-service call statistics."""
+        with self._lock:
+            return {
+                name: ServiceCallStats(s.calls, s.errors, s.total_s, s.max_s)
+                for name, s in self._stats.items()
+            }
+
+    def log_stats(self) -> None:
+        """Log one line per service with call counts and latency."""
+        for name, stats in sorted(self.stats().items()):
+            LOGGER.info(
+                "AWS %s: calls=%d errors=%d total=%.3fs avg=%.3fs max=%.3fs",
+                name,
+                stats.calls,
+                stats.errors,
+                stats.total_s,
+                stats.avg_s,
+                stats.max_s,
+            )
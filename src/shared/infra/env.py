@@ -0,0 +1,63 @@
+"""Helpers for reading typed tuning knobs from environment variables.
+
+Invalid values fall back to the default (with a warning) instead of aborting
+startup: these variables only tune performance, never correctness.
+"""
+
+import logging
+import os
+
+LOGGER = logging.getLogger(__name__)
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"0", "false", "no", "off"}
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Return a boolean environment variable (1/true/yes/on, 0/false/no/off)."""
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    value = raw.strip().lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    LOGGER.warning("Invalid boolean for %s=%r — using default %s", name, raw, default)
+    return default
+
+
+def env_int(name: str, default: int, minimum: int | None = None) -> int:
+    """Return an integer environment variable, clamped to ``minimum`` if given."""
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        LOGGER.warning(
+            "Invalid integer for %s=%r — using default %d", name, raw, default
+        )
+        return default
+    if minimum is not None and value < minimum:
+        LOGGER.warning("%s=%d below minimum %d — clamping", name, value, minimum)
+        return minimum
+    return value
+
+
+def env_float(name: str, default: float, minimum: float | None = None) -> float:
+    """Return a float environment variable, clamped to ``minimum`` if given."""
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        LOGGER.warning(
+            "Invalid number for %s=%r — using default %s", name, raw, default
+        )
+        return default
+    if minimum is not None and value < minimum:
+        LOGGER.warning("%s=%s below minimum %s — clamping", name, value, minimum)
+        return minimum
+    return value
@@ -0,0 +1,281 @@
+"""Per-scan instrumentation emitted as CloudWatch Embedded Metric Format.
+
+A ``ScanMetrics`` collector is bound to the running scan through a context
+variable (``ScanMetrics.activate``), so every layer can record into it
+without threading it through call signatures:
+
+- graph nodes, LLM calls and MCP tool calls through the workflow's callback
+  handler;
+- AWS calls (S3, DynamoDB, Lambda, Batch, ...) through the botocore hooks of
+  ``AwsClientRegistry``, including worker threads started with
+  ``asyncio.to_thread`` (they copy the context);
+- embeddings requests from the RAG adapter.
+
+Each record has a kind (``node``, ``llm``, ``mcp_tool``, ``aws``,
+``embeddings``), a name, its duration and outcome, and optionally bytes,
+token usage and retries. ``totals()`` summarizes the scan for
+``expert_metadata``; ``EmfEmitter`` writes one EMF JSON line per (kind,
+name) to stdout, with every duration as a value so CloudWatch can compute
+percentiles per phase.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional, TextIO
+
+from shared.infra.env import env_bool
+
+LOGGER = logging.getLogger(__name__)
+
+NODE = "node"
+LLM = "llm"
+MCP_TOOL = "mcp_tool"
+AWS = "aws"
+EMBEDDINGS = "embeddings"
+
+DEFAULT_NAMESPACE = "Titvo/AgentGateway"
+
+# CloudWatch accepts at most 100 values per metric in one EMF document
+_EMF_MAX_VALUES = 100
+
+_CURRENT: ContextVar[Optional["ScanMetrics"]] = ContextVar(
+    "titvo_scan_metrics", default=None
+)
+
+
+@dataclass
+class CallStats:
+    """Aggregated records for one (kind, name)."""
+
+    count: int = 0
+    errors: int = 0
+    retries: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    size_bytes: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    durations_s: list[float] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "count": self.count,
+            "errors": self.errors,
+            "total_s": round(self.total_s, 4),
+            "max_s": round(self.max_s, 4),
+        }
+        for key in (
+            "retries",
+            "size_bytes",
+            "input_tokens",
+            "output_tokens",
+            "cached_tokens",
+        ):
+            value = getattr(self, key)
+            if value:
+                data[key] = value
+        return data
+
+
+class ScanMetrics:
+    """Thread-safe collector of one scan's node and external-call records."""
+
+    def __init__(self, task_id: Optional[str] = None):
+        self.task_id = task_id
+        self._started = time.monotonic()
+        self._calls: dict[tuple[str, str], CallStats] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["ScanMetrics"]:
+        """Make this collector the current one for the enclosed code."""
+        token = _CURRENT.set(self)
+        try:
+            yield self
+        finally:
+            _CURRENT.reset(token)
+
+    def record(
+        self,
+        kind: str,
+        name: str,
+        duration_s: float,
+        *,
+        ok: bool = True,
+        size_bytes: int = 0,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cached_tokens: int = 0,
+        retries: int = 0,
+    ) -> None:
+        with self._lock:
+            stats = self._calls.setdefault((kind, name), CallStats())
+            stats.count += 1
+            stats.errors += int(not ok)
+            stats.retries += retries
+            stats.total_s += duration_s
+            stats.max_s = max(stats.max_s, duration_s)
+            stats.size_bytes += size_bytes
+            stats.input_tokens += input_tokens
+            stats.output_tokens += output_tokens
+            stats.cached_tokens += cached_tokens
+            stats.durations_s.append(duration_s)
+
+    def snapshot(self) -> dict[tuple[str, str], CallStats]:
+        """Copy of the per-(kind, name) statistics."""
+        with self._lock:
+            return {
+                key: CallStats(
+                    stats.count,
+                    stats.errors,
+                    stats.retries,
+                    stats.total_s,
+                    stats.max_s,
+                    stats.size_bytes,
+                    stats.input_tokens,
+                    stats.output_tokens,
+                    stats.cached_tokens,
+                    list(stats.durations_s),
+                )
+                for key, stats in self._calls.items()
+            }
+
+    def totals(self) -> dict[str, Any]:
+        """Scan-level summary: per-kind totals and per-(kind, name) detail."""
+        calls: dict[str, dict[str, Any]] = {}
+        totals: dict[str, CallStats] = {}
+        for (kind, name), stats in sorted(self.snapshot().items()):
+            calls.setdefault(kind, {})[name] = stats.to_dict()
+            total = totals.setdefault(kind, CallStats())
+            total.count += stats.count
+            total.errors += stats.errors
+            total.retries += stats.retries
+            total.total_s += stats.total_s
+            total.max_s = max(total.max_s, stats.max_s)
+            total.size_bytes += stats.size_bytes
+            total.input_tokens += stats.input_tokens
+            total.output_tokens += stats.output_tokens
+            total.cached_tokens += stats.cached_tokens
+        return {
+            "wall_s": round(time.monotonic() - self._started, 3),
+            "totals": {kind: stats.to_dict() for kind, stats in totals.items()},
+            "calls": calls,
+        }
+
+
+def current_scan_metrics() -> Optional[ScanMetrics]:
+    """Collector of the scan running in this context, if any."""
+    return _CURRENT.get()
+
+
+def record_call(kind: str, name: str, duration_s: float, **fields: Any) -> None:
+    """Record into the current scan's collector; no-op outside a scan."""
+    metrics = _CURRENT.get()
+    if metrics is not None:
+        metrics.record(kind, name, duration_s, **fields)
+
+
+@contextlib.contextmanager
+def timed_call(kind: str, name: str, **fields: Any) -> Iterator[None]:
+    """Time the enclosed block and record it, failed if it raises."""
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record_call(kind, name, time.perf_counter() - started, ok=ok, **fields)
+
+
+class EmfEmitter:
+    """Writes a scan's records to a stream as EMF JSON lines.
+
+    Args:
+        namespace: CloudWatch namespace of the metrics.
+        stream: Output stream (default: ``sys.stdout`` at emit time).
+    """
+
+    def __init__(
+        self, namespace: str = DEFAULT_NAMESPACE, stream: Optional[TextIO] = None
+    ):
+        self.namespace = namespace
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["EmfEmitter"]:
+        """Emitter configured by ``TITVO_METRICS_*``; None when disabled."""
+        if not env_bool("TITVO_METRICS_EMF", True):
+            return None
+        return cls(os.getenv("TITVO_METRICS_NAMESPACE") or DEFAULT_NAMESPACE)
+
+    def documents(self, metrics: ScanMetrics) -> list[dict[str, Any]]:
+        """EMF documents for ``metrics``: one per (kind, name) and 100 values."""
+        timestamp = int(time.time() * 1000)
+        documents = []
+        for (kind, name), stats in sorted(metrics.snapshot().items()):
+            durations_ms = [round(d * 1000, 3) for d in stats.durations_s]
+            for start in range(0, len(durations_ms), _EMF_MAX_VALUES):
+                values: dict[str, Any] = {
+                    "Duration": durations_ms[start : start + _EMF_MAX_VALUES]
+                }
+                units = {"Duration": "Milliseconds"}
+                if start == 0:
+                    # Counters once per (kind, name), not once per chunk
+                    values["Errors"] = stats.errors
+                    units["Errors"] = "Count"
+                    for metric, value, unit in (
+                        ("Retries", stats.retries, "Count"),
+                        ("Bytes", stats.size_bytes, "Bytes"),
+                        ("InputTokens", stats.input_tokens, "Count"),
+                        ("OutputTokens", stats.output_tokens, "Count"),
+                        ("CachedInputTokens", stats.cached_tokens, "Count"),
+                    ):
+                        if value:
+                            values[metric] = value
+                            units[metric] = unit
+                document: dict[str, Any] = {
+                    "_aws": {
+                        "Timestamp": timestamp,
+                        "CloudWatchMetrics": [
+                            {
+                                "Namespace": self.namespace,
+                                "Dimensions": [["Kind", "Name"]],
+                                "Metrics": [
+                                    {"Name": metric, "Unit": unit}
+                                    for metric, unit in units.items()
+                                ],
+                            }
+                        ],
+                    },
+                    "Kind": kind,
+                    "Name": name,
+                    **values,
+                }
+                if metrics.task_id:
+                    document["TaskId"] = metrics.task_id
+                documents.append(document)
+        return documents
+
+    def emit(self, metrics: ScanMetrics) -> None:
+        """Write the documents; never raises (metrics must not fail a scan)."""
+        try:
+            lines = "".join(
+                json.dumps(document, separators=(",", ":")) + "\n"
+                for document in self.documents(metrics)
+            )
+            stream = self._stream or sys.stdout
+            with self._lock:
+                stream.write(lines)
+                stream.flush()
+        except Exception:
+            LOGGER.warning("Could not emit scan metrics", exc_info=True)
@@ -0,0 +1,143 @@
+"""Adaptive, deadline-aware polling for long-running external jobs.
+
+``poll_until`` checks quickly once, then backs off exponentially (with
+jitter, up to a cap) until the result is done or an overall deadline passes.
+Sleeps are shortened so the last check lands on the deadline instead of
+overshooting it.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from shared.infra.env import env_float
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PollPolicy:
+    """Backoff schedule for ``poll_until``.
+
+    Attributes:
+        first_delay_s: Delay before the first check.
+        initial_interval_s: Delay between the first and second check.
+        multiplier: Growth factor applied to the interval after each check.
+        max_interval_s: Upper bound for the interval (before jitter).
+        jitter: Random +/- fraction applied to each interval.
+        timeout_s: Overall time budget for the whole wait.
+    """
+
+    first_delay_s: float = 2.0
+    initial_interval_s: float = 5.0
+    multiplier: float = 1.5
+    max_interval_s: float = 30.0
+    jitter: float = 0.2
+    timeout_s: float = 600.0
+
+    def interval(self, attempt: int, rng: Callable[[], float] = random.random) -> float:
+        """Delay before check number ``attempt`` (1-based), jitter included."""
+        if attempt <= 1:
+            return self.first_delay_s
+        base = min(
+            self.initial_interval_s * self.multiplier ** (attempt - 2),
+            self.max_interval_s,
+        )
+        return max(0.0, base * (1 + self.jitter * (2 * rng() - 1)))
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "PollPolicy":
+        """Build a policy from ``{prefix}_POLL_*`` / ``{prefix}_WAIT_TIMEOUT_SEC``."""
+        defaults = cls()
+        return cls(
+            first_delay_s=env_float(
+                f"{prefix}_POLL_FIRST_DELAY_SEC", defaults.first_delay_s, minimum=0.0
+            ),
+            initial_interval_s=env_float(
+                f"{prefix}_POLL_INTERVAL_SEC", defaults.initial_interval_s, minimum=0.1
+            ),
+            max_interval_s=env_float(
+                f"{prefix}_POLL_MAX_INTERVAL_SEC", defaults.max_interval_s, minimum=0.1
+            ),
+            timeout_s=env_float(
+                f"{prefix}_WAIT_TIMEOUT_SEC", defaults.timeout_s, minimum=1.0
+            ),
+        )
+
+
+@dataclass
+class PollResult(Generic[T]):
+    """Terminal value returned by ``poll_until`` plus wait statistics."""
+
+    value: T
+    attempts: int
+    waited_s: float
+
+
+class PollTimeoutError(TimeoutError):
+    """Raised when the deadline passes before the polled result is done."""
+
+    def __init__(self, message: str, attempts: int, waited_s: float, last: object):
+        super().__init__(message)
+        self.attempts = attempts
+        self.waited_s = waited_s
+        self.last = last
+
+
+async def poll_until(
+    check: Callable[[], T],
+    is_done: Callable[[T], bool],
+    policy: PollPolicy,
+    deadline: float | None = None,
+    description: str = "job",
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], Awaitable[None]] | None = None,
+    rng: Callable[[], float] = random.random,
+) -> PollResult[T]:
+    """Call ``check`` (in a worker thread) until ``is_done`` returns True.
+
+    Args:
+        check: Blocking status call, e.g. ``get_job_status(job_id)``.
+        is_done: Whether a check result is terminal (success or failure).
+        policy: Backoff schedule and overall timeout.
+        deadline: Optional absolute ``clock()`` time that further bounds the
+            wait (e.g. the end of the task's time budget).
+        description: Used in log and error messages.
+
+    Raises:
+        PollTimeoutError: The deadline passed before the result was done.
+    """
+    sleep = sleep or asyncio.sleep
+    start = clock()
+    end = start + policy.timeout_s
+    if deadline is not None:
+        end = min(end, deadline)
+
+    attempt = 0
+    last: T | None = None
+    while True:
+        attempt += 1
+        remaining = end - clock()
+        delay = min(policy.interval(attempt, rng), max(0.0, remaining))
+        if delay > 0:
+            await sleep(delay)
+        last = await asyncio.to_thread(check)
+        waited = clock() - start
+        if is_done(last):
+            return PollResult(value=last, attempts=attempt, waited_s=waited)
+        LOGGER.debug(
+            "%s not done after %d checks (%.1fs)", description, attempt, waited
+        )
+        if clock() >= end:
+            raise PollTimeoutError(
+                f"{description} not done after {waited:.0f}s ({attempt} checks)",
+                attempts=attempt,
+                waited_s=waited,
+                last=last,
+            )
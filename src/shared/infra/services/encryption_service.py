@@ -1,3 +1,4 @@
+import threading
 from base64 import b64decode, b64encode
 
 from Crypto.Cipher import AES
@@ -8,23 +9,28 @@ from shared.domain.services.iencryption_service import IEncryptionService
 
 
 class EncryptionService(IEncryptionService):
+    """AES encryption with a key fetched once from the secrets provider."""
+
     def __init__(self, secrets_provider: ISecretsProvider):
         self.secrets_provider = secrets_provider
+        self._key: bytes | None = None
+        self._key_lock = threading.Lock()
 
     def encrypt(self, value: str) -> str:
-        secret = self.secrets_provider.get_secret()
-        if secret is None:
-            raise ValueError("Encryption key not found")
-        key = b64decode(secret)
-        cipher = AES.new(key, AES.MODE_ECB)
+        cipher = AES.new(self._get_key(), AES.MODE_ECB)
         encrypted_data = cipher.encrypt(pad(value.encode("utf-8"), AES.block_size))
         return b64encode(encrypted_data).decode("utf-8")
 
     def decrypt(self, value: str) -> str:
-        secret = self.secrets_provider.get_secret()
-        if secret is None:
-            raise ValueError("Encryption key not found")
-        key = b64decode(secret)
-        cipher = AES.new(key, AES.MODE_ECB)
+        cipher = AES.new(self._get_key(), AES.MODE_ECB)
         decrypted_data = unpad(cipher.decrypt(b64decode(value)), AES.block_size)
         return decrypted_data.decode("utf-8")
+
+    def _get_key(self) -> bytes:
+        with self._key_lock:
+            if self._key is None:
+                secret = self.secrets_provider.get_secret()
+                if secret is None:
+                    raise ValueError("Encryption key not found")
+                self._key = b64decode(secret)
+            return self._key
@@ -1,16 +1,34 @@
 """Tests for AnalyseCodeUseCase scan mode and RAG freshness behavior."""
 
-from unittest.mock import MagicMock
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from code_analysis.application.analyse_code_use_case import AnalyseCodeUseCase
+from rag_indexer_trigger.batch_service import BatchService
+from shared.infra.metrics import AWS, record_call
+from shared.infra.polling import PollPolicy
 
 
 class _Status:
     status = "SUCCEEDED"
     is_succeeded = True
     is_failed = False
+    is_terminal = True
+    duration_s = None
+
+
+def _rag_trigger() -> MagicMock:
+    """Trigger mock polled through BatchService.wait_for_job."""
+    trigger = MagicMock()
+    service = BatchService()
+    service.get_job_status = trigger.get_job_status
+    trigger.wait_for_job = service.wait_for_job
+    return trigger
 
 
 def _make_use_case(rag_status, rag_trigger):
@@ -28,7 +46,7 @@ def _make_use_case(rag_status, rag_trigger):
 async def test_commit_mode_uses_branch_index_only():
     rag_status = MagicMock()
     rag_status.is_indexed.return_value = True
-    rag_trigger = MagicMock()
+    rag_trigger = _rag_trigger()
     use_case = _make_use_case(rag_status, rag_trigger)
 
     await use_case._ensure_rag_index(
@@ -46,7 +64,7 @@ async def test_full_mode_skips_indexing_when_commit_is_fresh():
     rag_status = MagicMock()
     rag_status.is_indexed.return_value = True
     rag_status.is_commit_indexed.return_value = True
-    rag_trigger = MagicMock()
+    rag_trigger = _rag_trigger()
     use_case = _make_use_case(rag_status, rag_trigger)
 
     await use_case._ensure_rag_index(
@@ -64,14 +82,12 @@ async def test_full_mode_waits_for_delta_when_commit_is_stale(monkeypatch):
     async def _no_sleep(_seconds):
         return None
 
-    monkeypatch.setattr(
-        "code_analysis.application.analyse_code_use_case.asyncio.sleep", _no_sleep
-    )
+    monkeypatch.setattr("shared.infra.polling.asyncio.sleep", _no_sleep)
 
     rag_status = MagicMock()
     rag_status.is_indexed.return_value = True
     rag_status.is_commit_indexed.return_value = False
-    rag_trigger = MagicMock()
+    rag_trigger = _rag_trigger()
     rag_trigger.trigger_delta.return_value = "delta-job-1"
     rag_trigger.get_job_status.return_value = _Status()
     use_case = _make_use_case(rag_status, rag_trigger)
@@ -84,3 +100,281 @@ async def test_full_mode_waits_for_delta_when_commit_is_stale(monkeypatch):
         "https://github.com/org/repo", "main", "abc123"
     )
     rag_trigger.get_job_status.assert_called_once_with("delta-job-1")
+
+
+class _Running:
+    status = "RUNNING"
+    is_succeeded = False
+    is_failed = False
+    is_terminal = False
+    duration_s = None
+
+
+@pytest.mark.asyncio
+async def test_branch_index_wait_raises_when_job_fails():
+    rag_status = MagicMock()
+    rag_status.is_indexed.return_value = False
+    rag_trigger = _rag_trigger()
+    rag_trigger.trigger_full.return_value = "full-job-1"
+    failed = _Running()
+    failed.status = "FAILED"
+    failed.is_failed = True
+    failed.is_terminal = True
+    rag_trigger.get_job_status.return_value = failed
+    use_case = _make_use_case(rag_status, rag_trigger)
+    use_case.rag_poll_policy = PollPolicy(first_delay_s=0)
+
+    with pytest.raises(RuntimeError, match="full-job-1 failed"):
+        await use_case._ensure_rag_index(
+            "https://github.com/org/repo", "main", "abc123", "commit"
+        )
+
+
+@pytest.mark.asyncio
+async def test_branch_index_wait_stops_at_task_deadline():
+    rag_status = MagicMock()
+    rag_status.is_indexed.return_value = False
+    rag_trigger = _rag_trigger()
+    rag_trigger.trigger_full.return_value = "full-job-1"
+    rag_trigger.get_job_status.return_value = _Running()
+    use_case = _make_use_case(rag_status, rag_trigger)
+    use_case.rag_poll_policy = PollPolicy(
+        first_delay_s=0, initial_interval_s=0.01, timeout_s=60
+    )
+
+    with pytest.raises(TimeoutError, match="RAG indexing timed out"):
+        await use_case._ensure_rag_index(
+            "https://github.com/org/repo",
+            "main",
+            "abc123",
+            "commit",
+            deadline=time.monotonic() + 0.05,
+        )
+    assert rag_trigger.get_job_status.call_count >= 2
+
+
+def _task():
+    task = MagicMock()
+    task.branch = "main"
+    task.args = {"scan_mode": "commit"}
+    task.repository_url = "https://github.com/org/repo"
+    task.commit_hash = "abc1234"
+    task.source.value = "github"
+    return task
+
+
+@pytest.mark.asyncio
+async def test_execute_does_not_block_on_index_and_survives_failure():
+    rag_status = MagicMock()
+    rag_status.is_indexed.return_value = False
+    rag_trigger = _rag_trigger()
+    rag_trigger.trigger_full.side_effect = RuntimeError("indexer down")
+    use_case = _make_use_case(rag_status, rag_trigger)
+    task = _task()
+    use_case.task_repository.get_task.return_value = task
+    use_case.notification_service.send_notifications_async = AsyncMock(return_value={})
+    seen = {}
+
+    async def _invoke(message):
+        ready = message.metadata["rag_index_ready"]
+        seen["ready_pending"] = not ready.done()
+        return MagicMock(
+            content='{"status": "COMPLETED", "issues": [], "scaned_files": 1}'
+        )
+
+    use_case.agent.invoke = _invoke
+
+    await use_case.execute("task-1")
+
+    assert seen["ready_pending"] is True
+    task.mark_completed.assert_called_once()
+    task.mark_failed.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_execute_overlaps_delta_trigger_with_notifications():
+    rag_status = MagicMock()
+    rag_status.is_indexed.return_value = True
+    rag_status.is_commit_indexed.return_value = False
+    rag_trigger = _rag_trigger()
+    use_case = _make_use_case(rag_status, rag_trigger)
+    task = _task()
+    use_case.task_repository.get_task.return_value = task
+    use_case.agent.invoke = AsyncMock(
+        return_value=MagicMock(
+            content='{"status": "WARNING", "issues": [], "scaned_files": 1}'
+        )
+    )
+    delta_started = threading.Event()
+    overlapped = {}
+
+    def _trigger_delta(*_args):
+        delta_started.set()
+        time.sleep(0.05)
+        return "delta-job-1"
+
+    async def _notify(_result_dto):
+        overlapped["notify"] = await asyncio.to_thread(delta_started.wait, 1)
+        return {"report_url": "https://reports.example/report.html"}
+
+    rag_trigger.trigger_delta.side_effect = _trigger_delta
+    use_case.notification_service.send_notifications_async = _notify
+
+    await use_case.execute("task-1")
+
+    assert overlapped["notify"] is True
+    rag_trigger.trigger_delta.assert_called_once()
+    result = task.mark_completed.call_args.args[0]
+    assert result["report_url"] == "https://reports.example/report.html"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("scan_mode", "branch_indexed"), [("commit", False), ("full", True)]
+)
+async def test_execute_skips_delta_trigger_while_indexing_job_runs(
+    scan_mode, branch_indexed
+):
+    rag_status = MagicMock()
+    rag_status.is_indexed.return_value = branch_indexed
+    rag_status.is_commit_indexed.return_value = False
+    rag_trigger = _rag_trigger()
+    rag_trigger.trigger_full.return_value = "full-job-1"
+    rag_trigger.trigger_delta.return_value = "delta-job-1"
+    rag_trigger.get_job_status.return_value = _Running()
+    use_case = _make_use_case(rag_status, rag_trigger)
+    task = _task()
+    task.args = {"scan_mode": scan_mode}
+    use_case.task_repository.get_task.return_value = task
+    use_case.notification_service.send_notifications_async = AsyncMock(return_value={})
+    submitted = asyncio.Event()
+    rag_trigger.trigger_full.side_effect = lambda *_: (submitted.set(), "full-job-1")[1]
+    rag_trigger.trigger_delta.side_effect = lambda *_: (
+        submitted.set(),
+        "delta-job-1",
+    )[1]
+
+    async def _invoke(message):
+        await asyncio.wait_for(submitted.wait(), 1)
+        return MagicMock(
+            content='{"status": "COMPLETED", "issues": [], "scaned_files": 1}'
+        )
+
+    use_case.agent.invoke = _invoke
+
+    await use_case.execute("task-1")
+
+    submitted_jobs = rag_trigger.trigger_full.call_count
+    submitted_jobs += rag_trigger.trigger_delta.call_count
+    assert submitted_jobs == 1
+    task.mark_completed.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_execute_triggers_delta_after_indexing_job_failed():
+    rag_status = MagicMock()
+    rag_status.is_indexed.return_value = False
+    rag_status.is_commit_indexed.return_value = False
+    rag_trigger = _rag_trigger()
+    rag_trigger.trigger_full.return_value = "full-job-1"
+    failed = _Running()
+    failed.status = "FAILED"
+    failed.is_failed = True
+    failed.is_terminal = True
+    rag_trigger.get_job_status.return_value = failed
+    use_case = _make_use_case(rag_status, rag_trigger)
+    use_case.rag_poll_policy = PollPolicy(first_delay_s=0)
+    use_case.task_repository.get_task.return_value = _task()
+    use_case.notification_service.send_notifications_async = AsyncMock(return_value={})
+
+    async def _invoke(message):
+        await asyncio.wait([message.metadata["rag_index_ready"]])
+        return MagicMock(
+            content='{"status": "COMPLETED", "issues": [], "scaned_files": 1}'
+        )
+
+    use_case.agent.invoke = _invoke
+
+    await use_case.execute("task-1")
+
+    rag_trigger.trigger_delta.assert_called_once_with(
+        "https://github.com/org/repo", "main", "abc1234"
+    )
+
+
+@pytest.mark.asyncio
+async def test_index_checks_and_submissions_run_off_the_event_loop():
+    loop_thread = threading.current_thread()
+    threads = []
+    rag_status = MagicMock()
+    rag_status.is_indexed.side_effect = lambda *_: threads.append(
+        threading.current_thread()
+    )
+    rag_status.is_commit_indexed.side_effect = lambda *_: threads.append(
+        threading.current_thread()
+    )
+    rag_trigger = _rag_trigger()
+    rag_trigger.trigger_full.side_effect = lambda *_: (
+        threads.append(threading.current_thread()) or "full-job-1"
+    )
+    rag_trigger.trigger_delta.side_effect = lambda *_: (
+        threads.append(threading.current_thread()) or "delta-job-1"
+    )
+    rag_trigger.get_job_status.return_value = _Status()
+    use_case = _make_use_case(rag_status, rag_trigger)
+    use_case.rag_poll_policy = PollPolicy(first_delay_s=0)
+
+    await use_case._ensure_rag_index(
+        "https://github.com/org/repo", "main", "abc123", "full"
+    )
+
+    assert len(threads) == 4
+    assert loop_thread not in threads
+
+
+@pytest.mark.asyncio
+async def test_execute_emits_scan_metrics_even_when_the_agent_fails():
+    rag_status = MagicMock()
+    rag_status.is_indexed.return_value = True
+    use_case = _make_use_case(rag_status, _rag_trigger())
+    use_case.metrics_emitter = MagicMock()
+    use_case.task_repository.get_task.return_value = _task()
+
+    async def _invoke(message):
+        record_call(AWS, "s3.GetObject", 0.01)
+        raise RuntimeError("model down")
+
+    use_case.agent.invoke = _invoke
+
+    with pytest.raises(RuntimeError):
+        await use_case.execute("task-1")
+
+    (scan_metrics,) = use_case.metrics_emitter.emit.call_args.args
+    assert scan_metrics.task_id == "task-1"
+    assert scan_metrics.totals()["calls"]["aws"]["s3.GetObject"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_execute_persists_usage_outside_the_report_fields():
+    rag_status = MagicMock()
+    rag_status.is_indexed.return_value = True
+    rag_status.is_commit_indexed.return_value = True
+    use_case = _make_use_case(rag_status, _rag_trigger())
+    task = _task()
+    use_case.task_repository.get_task.return_value = task
+    use_case.notification_service.send_notifications_async = AsyncMock(return_value={})
+    usage = {"model": "gpt-4.1", "total": {"calls": 7, "cost_usd": 0.12}}
+    use_case.agent.invoke = AsyncMock(
+        return_value=MagicMock(
+            content=json.dumps(
+                {"status": "COMPLETED", "issues": [], "scaned_files": 1, "usage": usage}
+            )
+        )
+    )
+
+    await use_case.execute("task-1")
+
+    notify = use_case.notification_service.send_notifications_async
+    (result_dto,) = notify.call_args.args
+    assert result_dto.status == "COMPLETED"
+    assert task.mark_completed.call_args.args[0]["usage"] == usage
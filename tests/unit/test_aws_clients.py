@@ -0,0 +1,95 @@
+"""Tests for the shared AWS client registry."""
+
+import threading
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from shared.infra.aws_clients import AwsClientRegistry, AwsClientSettings
+
+
+def _registry(**settings) -> AwsClientRegistry:
+    session = boto3.session.Session(
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        region_name="us-east-1",
+    )
+    return AwsClientRegistry(AwsClientSettings(**settings), session=session)
+
+
+class TestAwsClientSettings:
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TITVO_AWS_MAX_POOL_CONNECTIONS", "64")
+        monkeypatch.setenv("TITVO_AWS_CONNECT_TIMEOUT_SEC", "2.5")
+        monkeypatch.setenv("TITVO_AWS_RETRY_MODE", "Standard")
+        monkeypatch.setenv("TITVO_AWS_TCP_KEEPALIVE", "false")
+        monkeypatch.setenv("AWS_ENDPOINT", "http://localstack:4566")
+
+        settings = AwsClientSettings.from_env()
+
+        assert settings.max_pool_connections == 64
+        assert settings.connect_timeout_s == 2.5
+        assert settings.retry_mode == "standard"
+        assert settings.tcp_keepalive is False
+        assert settings.endpoint_url == "http://localstack:4566"
+
+    def test_invalid_retry_mode_falls_back(self, monkeypatch):
+        monkeypatch.setenv("TITVO_AWS_RETRY_MODE", "aggressive")
+
+        assert AwsClientSettings.from_env().retry_mode == "adaptive"
+
+
+class TestAwsClientRegistry:
+    def test_client_created_once_with_tuned_config(self):
+        registry = _registry(max_pool_connections=7, connect_timeout_s=1.5)
+
+        client = registry.client("s3")
+
+        assert registry.client("s3") is client
+        config = client.meta.config
+        assert config.max_pool_connections == 7
+        assert config.connect_timeout == 1.5
+        assert config.retries["mode"] == "adaptive"
+        assert config.tcp_keepalive is True
+
+    def test_concurrent_first_use_shares_one_client(self):
+        registry = _registry()
+        clients = []
+        barrier = threading.Barrier(8)
+
+        def _get():
+            barrier.wait()
+            clients.append(registry.client("dynamodb"))
+
+        threads = [threading.Thread(target=_get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(c) for c in clients}) == 1
+
+    def test_endpoint_override(self):
+        registry = _registry(endpoint_url="http://localstack:4566")
+
+        assert registry.client("lambda").meta.endpoint_url == "http://localstack:4566"
+
+    def test_records_calls_per_service(self, caplog):
+        registry = _registry()
+        s3 = registry.client("s3")
+        with Stubber(s3) as stubber:
+            stubber.add_response("list_buckets", {"Buckets": []})
+            stubber.add_client_error("head_object", "404", http_status_code=404)
+            s3.list_buckets()
+            with pytest.raises(s3.exceptions.ClientError):
+                s3.head_object(Bucket="b", Key="k")
+
+        stats = registry.stats()["s3"]
+        assert stats.calls == 2
+        assert stats.errors == 1
+        assert stats.max_s >= stats.avg_s > 0
+
+        with caplog.at_level("INFO", logger="shared.infra.aws_clients"):
+            registry.log_stats()
+        assert "AWS s3: calls=2 errors=1" in caplog.text
@@ -0,0 +1,87 @@
+"""Tests for bulk configuration loading and key caching."""
+
+from base64 import b64encode
+from unittest.mock import MagicMock
+
+from shared.infra.adapters.aws_configuration_adapter import AwsConfigurationAdapter
+from shared.infra.services.encryption_service import EncryptionService
+
+
+def _item(name: str, value: str) -> dict:
+    return {"parameter_id": {"S": name}, "value": {"S": value}}
+
+
+def _encryption() -> tuple[EncryptionService, MagicMock]:
+    secrets = MagicMock()
+    secrets.get_secret.return_value = b64encode(b"0" * 32).decode()
+    return EncryptionService(secrets), secrets
+
+
+class TestGetValues:
+    def test_loads_all_values_in_one_batch_and_serves_from_memory(self):
+        dynamodb = MagicMock()
+        encryption, _ = _encryption()
+        dynamodb.batch_get_item.return_value = {
+            "Responses": {
+                "config": [
+                    _item("ai_model", "gpt"),
+                    _item("ai_api_key", encryption.encrypt("sk-1")),
+                ]
+            }
+        }
+        adapter = AwsConfigurationAdapter(dynamodb, "config", encryption)
+
+        values = adapter.get_values(["ai_model", "ai_api_key", "missing"])
+
+        assert values["ai_model"] == "gpt"
+        assert values["missing"] is None
+        assert adapter.get_value("ai_model") == "gpt"
+        assert adapter.get_value("missing") is None
+        assert adapter.get_secret("ai_api_key") == "sk-1"
+        dynamodb.batch_get_item.assert_called_once()
+        dynamodb.get_item.assert_not_called()
+
+    def test_retries_unprocessed_keys(self, monkeypatch):
+        monkeypatch.setattr(
+            "shared.infra.adapters.aws_configuration_adapter.time.sleep",
+            lambda _s: None,
+        )
+        dynamodb = MagicMock()
+        unprocessed = {"config": {"Keys": [{"parameter_id": {"S": "b"}}]}}
+        dynamodb.batch_get_item.side_effect = [
+            {
+                "Responses": {"config": [_item("a", "1")]},
+                "UnprocessedKeys": unprocessed,
+            },
+            {"Responses": {"config": [_item("b", "2")]}, "UnprocessedKeys": {}},
+        ]
+        adapter = AwsConfigurationAdapter(dynamodb, "config", _encryption()[0])
+
+        assert adapter.get_values(["a", "b"]) == {"a": "1", "b": "2"}
+        assert dynamodb.batch_get_item.call_args_list[1].kwargs == {
+            "RequestItems": unprocessed
+        }
+
+    def test_chunks_requests_to_100_keys(self):
+        dynamodb = MagicMock()
+        dynamodb.batch_get_item.return_value = {"Responses": {"config": []}}
+        adapter = AwsConfigurationAdapter(dynamodb, "config", _encryption()[0])
+
+        adapter.get_values([f"p{i}" for i in range(150)])
+
+        sizes = [
+            len(c.kwargs["RequestItems"]["config"]["Keys"])
+            for c in dynamodb.batch_get_item.call_args_list
+        ]
+        assert sizes == [100, 50]
+
+
+class TestEncryptionServiceKeyCache:
+    def test_fetches_key_once(self):
+        encryption, secrets = _encryption()
+
+        token = encryption.encrypt("a")
+        assert encryption.decrypt(token) == "a"
+        assert encryption.decrypt(encryption.encrypt("b")) == "b"
+
+        secrets.get_secret.assert_called_once()
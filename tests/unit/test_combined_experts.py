@@ -0,0 +1,253 @@
+"""Tests for the single-call multi-expert mode used on small commits."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from code_analysis.infra.adapters.langgraph.nodes.combined_experts_node import (
+    COMBINED_EXPERTS_NAME,
+    CombinedExpertsNode,
+)
+from code_analysis.infra.adapters.langgraph.nodes.expert_nodes import (
+    create_expert_nodes,
+)
+from code_analysis.infra.adapters.langgraph.nodes.file_routing_node import (
+    FileRoutingNode,
+)
+from code_analysis.infra.adapters.langgraph.settings import WorkflowSettings
+from code_analysis.infra.adapters.langgraph.workflow import LangGraphWorkflowBuilder
+
+
+def _issue(title: str, path: str = "src/app.py") -> dict:
+    return {
+        "title": title,
+        "description": "d",
+        "severity": "HIGH",
+        "category": "c",
+        "path": path,
+        "line": 1,
+        "summary": "s",
+        "code": "eval(x)",
+        "recommendation": "r",
+    }
+
+
+class _ExpertsModel:
+    """Answers the combined prompt per section and each expert with one issue."""
+
+    model_name = "gpt-4.1"
+
+    def __init__(self, combined_answer=None):
+        self.combined_answer = combined_answer
+        self.combined_calls: list[str] = []
+        self.expert_calls: list[str] = []
+
+    async def ainvoke(self, messages):
+        if len(messages) == 1:
+            # Findings consolidation keeps the original findings
+            return AIMessage(content="not json")
+        system = messages[0].content
+        if "=== EXPERT: <name> ===" in system:
+            human = messages[1].content
+            self.combined_calls.append(human)
+            answer = self.combined_answer
+            if answer is None:
+                names = [
+                    line.removeprefix("=== EXPERT: ").removesuffix(" ===")
+                    for line in human.splitlines()
+                    if line.startswith("=== EXPERT: ")
+                ]
+                answer = json.dumps(
+                    {"experts": {n: {"issues": [_issue(n)]} for n in names}}
+                )
+            return AIMessage(
+                content=answer,
+                usage_metadata={
+                    "input_tokens": 9000,
+                    "output_tokens": 300,
+                    "total_tokens": 9300,
+                },
+            )
+        self.expert_calls.append(system)
+        return AIMessage(content=json.dumps({"issues": [_issue("single")]}))
+
+
+def _files(*paths: str, content: str = "eval(x)") -> list[dict]:
+    return [{"path": path, "content": content} for path in paths]
+
+
+async def _routed_state(experts, files: list[dict]) -> dict:
+    state = {"files": files, "issues": [], "rag_chunks": []}
+    state.update(await FileRoutingNode(experts)(state))
+    return state
+
+
+class TestCombinedExpertsNode:
+    @pytest.mark.asyncio
+    async def test_one_call_returns_issues_per_expert(self):
+        model = _ExpertsModel()
+        experts = create_expert_nodes(model)
+        node = CombinedExpertsNode(model, experts)
+        state = await _routed_state(experts, _files("src/api/routes.py", "src/app.py"))
+
+        result = await node(state)
+
+        assert len(model.combined_calls) == 1
+        assert model.expert_calls == []
+        assert sorted(i.title for i in result["issues"]) == sorted(
+            e.expert_name for e in experts
+        )
+        metadata = result["expert_metadata"]
+        assert metadata[COMBINED_EXPERTS_NAME]["usage"]["input_tokens"] == 9000
+        assert metadata["owasp_api"] == {
+            "files_analyzed": 1,
+            "issues_found": 1,
+            "combined": True,
+        }
+        assert metadata["prompt_hardening"]["files_analyzed"] == 2
+        # Files are sent once; each section lists the files it is routed
+        prompt = model.combined_calls[0]
+        assert prompt.count("=== FILE: src/app.py ===") == 1
+        assert "=== EXPERT: owasp_api ===\nFiles: src/api/routes.py\n" in prompt
+
+    @pytest.mark.asyncio
+    async def test_missing_sections_fall_back_to_those_experts(self):
+        answer = json.dumps(
+            {
+                "experts": {
+                    name: {"issues": []}
+                    for name in (
+                        "prompt_hardening",
+                        "owasp_api",
+                        "owasp_web",
+                        "owasp_mobile",
+                        "devsecops",
+                    )
+                }
+            }
+        )
+        model = _ExpertsModel(answer)
+        experts = create_expert_nodes(model)
+        node = CombinedExpertsNode(model, experts)
+
+        result = await node(await _routed_state(experts, _files("src/app.py")))
+
+        assert len(model.expert_calls) == 1
+        assert [i.title for i in result["issues"]] == ["single"]
+        metadata = result["expert_metadata"]
+        assert metadata[COMBINED_EXPERTS_NAME]["fallback"] == ["code_vulnerabilities"]
+        assert "combined" not in metadata["code_vulnerabilities"]
+        assert metadata["owasp_web"]["issues_found"] == 0
+
+    @pytest.mark.asyncio
+    async def test_invalid_answer_runs_every_expert(self):
+        model = _ExpertsModel("not json")
+        experts = create_expert_nodes(model)
+        node = CombinedExpertsNode(model, experts, fallback_concurrency=3)
+
+        result = await node(await _routed_state(experts, _files("src/app.py")))
+
+        assert len(model.expert_calls) == 6
+        assert len(result["issues"]) == 6
+        assert len(result["expert_metadata"][COMBINED_EXPERTS_NAME]["fallback"]) == 6
+
+    @pytest.mark.asyncio
+    async def test_fits_only_small_commits(self):
+        model = _ExpertsModel()
+        experts = create_expert_nodes(model)
+        node = CombinedExpertsNode(model, experts, max_context_tokens=500)
+
+        small = await _routed_state(experts, _files("src/app.py"))
+        large = await _routed_state(
+            experts, _files("src/app.py", content="x = 1\n" * 400)
+        )
+
+        assert node.fits(small)
+        assert not node.fits(large)
+        assert not node.fits({"files": [], "routing": {}})
+        assert not CombinedExpertsNode(model, experts, max_context_tokens=0).fits(small)
+
+
+def _mcp_client(paths: list[str], content: str = "eval(x)") -> MagicMock:
+    git_tool = MagicMock()
+    git_tool.name = "mcp.tool.git.commit-files"
+    git_tool.ainvoke = AsyncMock(return_value={"jobId": "job-1"})
+    poll_tool = MagicMock()
+    poll_tool.name = "mcp.tool.git.commit-files.poll"
+    poll_tool.ainvoke = AsyncMock(
+        return_value={"status": "SUCCESS", "filesPaths": paths}
+    )
+    files_tool = MagicMock()
+    files_tool.name = "mcp.tool.files"
+    files_tool.ainvoke = AsyncMock(return_value={"content": content})
+    client = MagicMock()
+    client.get_tools = AsyncMock(return_value=[git_tool, poll_tool, files_tool])
+    return client
+
+
+def _initial_state() -> dict:
+    return {
+        "task_id": "task-1",
+        "repository_url": "https://github.com/org/repo",
+        "branch": "main",
+        "commit_hash": "abc123",
+        "extra_args": {},
+        "files": [],
+        "scaned_files": 0,
+        "issues": [],
+        "expert_errors": [],
+    }
+
+
+class TestCombinedWorkflow:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("parallel", [True, False])
+    async def test_small_commit_uses_one_expert_call(self, parallel):
+        model = _ExpertsModel()
+
+        workflow = LangGraphWorkflowBuilder(
+            _mcp_client(["src/app.py"]),
+            model,
+            settings=WorkflowSettings(parallel_experts=parallel),
+        ).build()
+        result = await workflow.ainvoke(_initial_state())
+
+        assert len(model.combined_calls) == 1
+        assert model.expert_calls == []
+        assert len(result["final_output"]["issues"]) == 6
+        usage = result["final_output"]["usage"]
+        assert set(usage["experts"]) == {COMBINED_EXPERTS_NAME}
+        assert usage["experts"][COMBINED_EXPERTS_NAME]["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_large_commit_fans_out_to_every_expert(self):
+        model = _ExpertsModel()
+
+        workflow = LangGraphWorkflowBuilder(
+            _mcp_client(["src/app.py"], content="x = 1\n" * 400),
+            model,
+            settings=WorkflowSettings(combined_max_tokens=500),
+        ).build()
+        result = await workflow.ainvoke(_initial_state())
+
+        assert model.combined_calls == []
+        assert len(model.expert_calls) == 6
+        assert COMBINED_EXPERTS_NAME not in result["expert_metadata"]
+
+    def test_disabled_mode_keeps_the_plain_graph(self):
+        workflow = LangGraphWorkflowBuilder(
+            _mcp_client(["src/app.py"]),
+            _ExpertsModel(),
+            settings=WorkflowSettings(combined_max_tokens=0),
+        ).build()
+
+        assert COMBINED_EXPERTS_NAME not in workflow.get_graph().nodes
+
+
+class TestCombinedSetting:
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TITVO_COMBINED_MAX_TOKENS", "0")
+
+        assert WorkflowSettings.from_env().combined_max_tokens == 0
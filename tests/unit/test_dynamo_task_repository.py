@@ -0,0 +1,156 @@
+"""Tests for dirty-tracking partial updates in DynamoTaskRepository."""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import botocore.exceptions
+import pytest
+from dynamodb_json import json_util as dynamo_json
+
+from code_analysis.domain.entities.task_entity import Task, TaskSource, TaskStatus
+from code_analysis.domain.ports.task_repository import TaskStatusConflictError
+from code_analysis.infra.adapters.dynamo_task_repository import (
+    DynamoTaskRepository,
+    marshal_attribute,
+)
+
+_ITEM = {
+    "scan_id": {"S": "task-1"},
+    "scan_result": {"M": {}},
+    "args": {"M": {"github_repo_name": {"S": "org/repo"}}},
+    "repository_id": {"S": "hint"},
+    "scaned_files": {"N": "0"},
+    "created_at": {"S": "2026-01-01T10:00:00"},
+    "updated_at": {"S": "2026-01-01T10:00:00"},
+    "status": {"S": "PENDING"},
+    "source": {"S": "github"},
+    "branch": {"S": "main"},
+}
+
+
+def _repository() -> tuple[DynamoTaskRepository, MagicMock]:
+    client = MagicMock()
+    client.get_item.return_value = {"Item": _ITEM}
+    return DynamoTaskRepository(client, "tasks"), client
+
+
+class TestMarshalAttribute:
+    def test_matches_dynamodb_json_round_trip(self):
+        value = {
+            "status": "WARNING",
+            "scaned_files": 3,
+            "ratio": 0.25,
+            "cost": Decimal("1.5"),
+            "ok": True,
+            "missing": None,
+            "issues": [{"line": 1, "tags": ("a", "b")}],
+            "when": datetime(2026, 1, 2, 3, 4, 5, 6),
+            "": "",
+        }
+
+        marshalled = marshal_attribute(value)
+
+        expected = json.loads(dynamo_json.dumps(value))
+        assert dynamo_json.loads(marshalled["M"]) == dynamo_json.loads(expected)
+
+    def test_rejects_unserializable_values(self):
+        with pytest.raises(TypeError):
+            marshal_attribute({"value": object()})
+
+
+class TestTaskDirtyTracking:
+    def test_loaded_task_is_clean(self):
+        repository, _ = _repository()
+
+        task = repository.get_task("task-1")
+
+        assert task.dirty_fields == frozenset()
+        assert task.persisted_status == TaskStatus.PENDING
+
+    def test_mark_completed_tracks_changed_fields(self):
+        repository, _ = _repository()
+        task = repository.get_task("task-1")
+
+        task.mark_completed({"status": "COMPLETED"}, 3)
+
+        assert task.dirty_fields == {"status", "result", "scaned_files", "updated_at"}
+
+
+class TestUpdateTask:
+    def test_writes_only_changed_attributes_with_status_condition(self):
+        repository, client = _repository()
+        task = repository.get_task("task-1")
+
+        task.mark_in_progress()
+        repository.update_task(task)
+
+        kwargs = client.update_item.call_args.kwargs
+        assert kwargs["UpdateExpression"] == (
+            "set #updated_at = :updated_at, #status = :status"
+        )
+        assert kwargs["ExpressionAttributeValues"][":status"] == {"S": "IN_PROGRESS"}
+        assert kwargs["ExpressionAttributeValues"][":expected_status"] == {
+            "S": "PENDING"
+        }
+        assert "#status = :expected_status" in kwargs["ConditionExpression"]
+        assert task.dirty_fields == frozenset()
+        assert task.persisted_status == TaskStatus.IN_PROGRESS
+
+    def test_result_marshalled_without_string_round_trip(self):
+        repository, client = _repository()
+        task = repository.get_task("task-1")
+        task.mark_in_progress()
+        repository.update_task(task)
+
+        task.mark_completed({"status": "COMPLETED", "scaned_files": 2}, 2)
+        repository.update_task(task)
+
+        values = client.update_item.call_args.kwargs["ExpressionAttributeValues"]
+        assert values[":scan_result"] == {
+            "M": {"status": {"S": "COMPLETED"}, "scaned_files": {"N": "2"}}
+        }
+        assert values[":scaned_files"] == {"N": "2"}
+        assert values[":expected_status"] == {"S": "IN_PROGRESS"}
+        assert ":args" not in values
+
+    def test_unchanged_task_skips_write(self):
+        repository, client = _repository()
+
+        repository.update_task(repository.get_task("task-1"))
+
+        client.update_item.assert_not_called()
+
+    def test_concurrent_status_change_raises_conflict(self):
+        repository, client = _repository()
+        client.update_item.side_effect = botocore.exceptions.ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem"
+        )
+        task = repository.get_task("task-1")
+        task.mark_in_progress()
+
+        with pytest.raises(TaskStatusConflictError, match="no longer PENDING"):
+            repository.update_task(task)
+        assert "status" in task.dirty_fields
+
+    def test_change_without_status_is_unconditional(self):
+        repository, client = _repository()
+        task = Task(
+            id="task-2",
+            result={},
+            args={},
+            hint_id="hint",
+            scaned_files=0,
+            created_at=datetime(2026, 1, 1),
+            updated_at=datetime(2026, 1, 1),
+            status=TaskStatus.PENDING,
+            source=TaskSource.CLI,
+        )
+
+        task.hint_id = "other"
+        repository.update_task(task)
+
+        kwargs = client.update_item.call_args.kwargs
+        assert kwargs["UpdateExpression"] == "set #hint_id = :hint_id"
+        assert "ConditionExpression" not in kwargs
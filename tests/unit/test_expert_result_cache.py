@@ -0,0 +1,101 @@
+"""Tests for the content-addressed expert result cache."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from code_analysis.domain.ports.expert_result_cache_port import expert_cache_key
+from code_analysis.infra.adapters.langgraph.nodes.expert_nodes import (
+    PromptHardeningNode,
+)
+from code_analysis.infra.adapters.sqlite_expert_result_cache import (
+    SqliteExpertResultCache,
+)
+
+_ISSUE_JSON = (
+    '{"issues":[{"title":"Eval","description":"d","severity":"HIGH",'
+    '"category":"RCE","path":"src/app.py","line":3,"summary":"s",'
+    '"code":"eval(x)","recommendation":"r","cwe":"CWE-95"}]}'
+)
+
+
+def _state(content: str = "eval(x)") -> dict:
+    return {"files": [{"path": "src/app.py", "content": content}], "issues": []}
+
+
+def _model(content: str = _ISSUE_JSON) -> MagicMock:
+    model = MagicMock()
+    model.model_name = "gpt-test"
+    model.ainvoke = AsyncMock(return_value=MagicMock(content=content))
+    return model
+
+
+class TestExpertCacheKey:
+    def test_key_changes_with_each_component(self):
+        base = expert_cache_key("owasp_web", "prompt", "gpt-test", "files")
+
+        assert base == expert_cache_key("owasp_web", "prompt", "gpt-test", "files")
+        assert base != expert_cache_key("owasp_api", "prompt", "gpt-test", "files")
+        assert base != expert_cache_key("owasp_web", "prompt v2", "gpt-test", "files")
+        assert base != expert_cache_key("owasp_web", "prompt", "gpt-other", "files")
+        assert base != expert_cache_key("owasp_web", "prompt", "gpt-test", "files2")
+
+
+class TestSqliteExpertResultCache:
+    def test_round_trip(self, tmp_path):
+        cache = SqliteExpertResultCache(str(tmp_path / "cache.db"))
+
+        assert cache.get("k") is None
+        cache.put("k", [{"title": "A"}])
+        cache.put("empty", [])
+
+        assert cache.get("k") == [{"title": "A"}]
+        assert cache.get("empty") == []
+
+
+class TestExpertNodeCaching:
+    @pytest.mark.asyncio
+    async def test_second_run_hits_cache_and_skips_model(self, tmp_path):
+        cache = SqliteExpertResultCache(str(tmp_path / "cache.db"))
+        model = _model()
+        node = PromptHardeningNode(model, cache)
+
+        first = await node(_state())
+        second = await node(_state())
+
+        model.ainvoke.assert_awaited_once()
+        assert first["expert_metadata"]["prompt_hardening"]["cache_misses"] == 1
+        meta = second["expert_metadata"]["prompt_hardening"]
+        assert (meta["cache_hits"], meta["cache_misses"]) == (1, 0)
+        assert second["issues"] == first["issues"]
+        assert second["issues"][0].metadata == {"cwe": "CWE-95"}
+
+    @pytest.mark.asyncio
+    async def test_changed_file_content_misses(self, tmp_path):
+        cache = SqliteExpertResultCache(str(tmp_path / "cache.db"))
+        model = _model()
+        node = PromptHardeningNode(model, cache)
+
+        await node(_state("eval(x)"))
+        await node(_state("eval(y)"))
+
+        assert model.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unparseable_response_is_not_cached(self, tmp_path):
+        cache = SqliteExpertResultCache(str(tmp_path / "cache.db"))
+        model = _model("not json")
+        node = PromptHardeningNode(model, cache)
+
+        await node(_state())
+        await node(_state())
+
+        assert model.ainvoke.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_without_cache_metadata_has_no_counters(self):
+        node = PromptHardeningNode(_model())
+
+        result = await node(_state())
+
+        assert "cache_hits" not in result["expert_metadata"]["prompt_hardening"]
@@ -0,0 +1,219 @@
+"""Tests for map-reduce sharding of large commits across expert calls."""
+
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from code_analysis.infra.adapters.langgraph.call_limiter import (
+    ModelCallLimiter,
+    model_call_scope,
+)
+from code_analysis.infra.adapters.langgraph.nodes._sharding import (
+    ShardPolicy,
+    plan_shards,
+)
+from code_analysis.infra.adapters.langgraph.nodes.expert_nodes import (
+    PromptHardeningNode,
+)
+from code_analysis.infra.adapters.langgraph.token_budget import (
+    ModelProfile,
+    PromptBudget,
+)
+from code_analysis.prompts import get_expert_prompt
+
+
+class _WordCounter:
+    """Deterministic stand-in for tiktoken: one token per whitespace word."""
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def _cost(f: dict[str, str]) -> int:
+    return len(f["content"].split()) + 2
+
+
+def _file(path: str, words: int) -> dict[str, str]:
+    return {"path": path, "content": "tok\n" * words}
+
+
+def _issue(path: str) -> dict:
+    return {
+        "title": f"Issue in {path}",
+        "description": "d",
+        "severity": "HIGH",
+        "path": path,
+        "line": 1,
+    }
+
+
+class _ShardModel:
+    """Answers each prompt with one issue per file it was shown."""
+
+    model_name = "gpt-test"
+
+    def __init__(self, fail_on: str | None = None):
+        self.prompts: list[str] = []
+        self.fail_on = fail_on
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, messages):
+        content = messages[1].content
+        self.prompts.append(content)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.fail_on and f"=== FILE: {self.fail_on}" in content:
+                raise RuntimeError("rate limited")
+        finally:
+            self.in_flight -= 1
+        paths = [
+            line[len("=== FILE: ") : -len(" ===")]
+            for line in content.splitlines()
+            if line.startswith("=== FILE: ")
+        ]
+        return MagicMock(content=json.dumps({"issues": [_issue(p) for p in paths]}))
+
+
+def _node(
+    model,
+    files_tokens: int,
+    policy: ShardPolicy,
+    call_limiter: ModelCallLimiter | None = None,
+) -> PromptHardeningNode:
+    """Node whose files budget is ``files_tokens`` after the system prompt."""
+    system_tokens = _WordCounter().count(get_expert_prompt("prompt_hardening"))
+    budget = PromptBudget(
+        profile=ModelProfile(
+            context_window=system_tokens + files_tokens + 100, output_reserve=100
+        ),
+        rag_share=0.0,
+        counter=_WordCounter(),
+    )
+    return PromptHardeningNode(
+        model, budget=budget, sharding=policy, call_limiter=call_limiter
+    )
+
+
+class TestPlanShards:
+    def test_single_shard_when_files_fit(self):
+        files = [_file("a.py", 10), _file("b.py", 10)]
+        assert plan_shards(files, _cost, 100, max_shards=8) == [files]
+
+    def test_packs_in_order_within_budget(self):
+        files = [_file(f"f{i}.py", 30) for i in range(5)]
+
+        shards = plan_shards(files, _cost, 70, max_shards=8)
+
+        assert [[f["path"] for f in shard] for shard in shards] == [
+            ["f0.py", "f1.py"],
+            ["f2.py", "f3.py"],
+            ["f4.py"],
+        ]
+        assert all(sum(_cost(f) for f in shard) <= 70 for shard in shards)
+
+    def test_oversized_file_split_into_line_ranges(self):
+        big = {"path": "big.py", "content": "".join(f"l{i}\n" for i in range(100))}
+
+        shards = plan_shards([big], _cost, 40, max_shards=8)
+
+        pieces = [piece for shard in shards for piece in shard]
+        assert len(pieces) > 1
+        assert "".join(p["content"] for p in pieces) == big["content"]
+        assert pieces[0]["lines"].startswith("1-")
+        assert pieces[-1]["lines"].endswith("-100")
+        assert all(_cost(p) <= 40 for p in pieces)
+
+    def test_shard_count_capped(self):
+        files = [_file(f"f{i}.py", 30) for i in range(10)]
+
+        shards = plan_shards(files, _cost, 40, max_shards=3)
+
+        assert len(shards) == 3
+        assert sum(len(shard) for shard in shards) == 10
+
+    def test_disabled_sharding_keeps_one_shard(self):
+        files = [_file(f"f{i}.py", 30) for i in range(10)]
+        assert len(plan_shards(files, _cost, 40, max_shards=1)) == 1
+
+
+class TestShardedExpert:
+    @pytest.mark.asyncio
+    async def test_large_commit_analysed_without_truncation(self):
+        model = _ShardModel()
+        node = _node(model, 700, ShardPolicy(max_shards=8, concurrency=2))
+        files = [_file(f"src/f{i}.py", 150) for i in range(12)]
+
+        result = await node({"files": files, "issues": []})
+
+        assert len(model.prompts) > 1
+        assert model.max_in_flight <= 2
+        assert not any("file truncated" in prompt for prompt in model.prompts)
+        assert sorted(issue.path for issue in result["issues"]) == sorted(
+            f["path"] for f in files
+        )
+        meta = result["expert_metadata"]["prompt_hardening"]
+        assert meta["shards"] == len(model.prompts)
+        assert meta["issues_found"] == 12
+
+    @pytest.mark.asyncio
+    async def test_failed_shard_keeps_other_issues(self):
+        model = _ShardModel(fail_on="src/f0.py")
+        node = _node(model, 700, ShardPolicy(max_shards=8, concurrency=4))
+        files = [_file(f"src/f{i}.py", 150) for i in range(12)]
+
+        result = await node({"files": files, "issues": []})
+
+        paths = {issue.path for issue in result["issues"]}
+        assert "src/f0.py" not in paths
+        assert "src/f11.py" in paths
+        assert "shards failed" in result["expert_errors"][0]
+        assert result["expert_metadata"]["prompt_hardening"]["failed_shards"] == 1
+
+    @pytest.mark.asyncio
+    async def test_small_commit_uses_single_call(self):
+        model = _ShardModel()
+        node = _node(model, 700, ShardPolicy())
+
+        result = await node({"files": [_file("src/a.py", 20)], "issues": []})
+
+        assert len(model.prompts) == 1
+        assert "shards" not in result["expert_metadata"]["prompt_hardening"]
+
+
+class TestModelCallLimiter:
+    @pytest.mark.asyncio
+    async def test_limit_is_shared_by_the_experts_shards(self):
+        model = _ShardModel()
+        limiter = ModelCallLimiter(3)
+        nodes = [
+            _node(model, 700, ShardPolicy(max_shards=8, concurrency=4), limiter)
+            for _ in range(2)
+        ]
+        files = [_file(f"src/f{i}.py", 150) for i in range(12)]
+
+        await asyncio.gather(*(node({"files": files, "issues": []}) for node in nodes))
+
+        # 3 shards per expert, up to 4 at once each: 6 calls capped at 3
+        assert len(model.prompts) == 6
+        assert model.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_each_scope_gets_its_own_slots(self):
+        model = _ShardModel()
+        node = _node(
+            model, 700, ShardPolicy(max_shards=8, concurrency=4), ModelCallLimiter(1)
+        )
+        files = [_file(f"src/f{i}.py", 150) for i in range(12)]
+
+        async def scan():
+            with model_call_scope():
+                await node({"files": files, "issues": []})
+
+        await asyncio.gather(scan(), scan())
+
+        assert model.max_in_flight == 2
@@ -0,0 +1,122 @@
+"""Tests for file → expert routing and shared formatted blocks."""
+
+import fnmatch
+from unittest.mock import MagicMock
+
+import pytest
+
+from code_analysis.infra.adapters.langgraph.nodes.base_expert_node import (
+    FormattedBlockCache,
+)
+from code_analysis.infra.adapters.langgraph.nodes.expert_nodes import (
+    OwaspApiNode,
+    create_expert_nodes,
+)
+from code_analysis.infra.adapters.langgraph.nodes.file_routing_node import (
+    FileRoutingNode,
+)
+from code_analysis.infra.adapters.langgraph.workflow import LangGraphWorkflowBuilder
+
+_PATHS = [
+    "src/routes/Users.py",
+    "api/endpoints.py",
+    "Dockerfile",
+    ".github/workflows/ci.yml",
+    "android/app/src/main/AndroidManifest.xml",
+    "ios/App/Info.plist",
+    "web/templates/index.html",
+    "src/utils/strings.py",
+    "terraform/main.tf",
+    "README.md",
+]
+
+
+def _files(paths: list[str]) -> list[dict[str, str]]:
+    return [{"path": path, "content": f"# {path}\n"} for path in paths]
+
+
+class TestCompiledPatterns:
+    @pytest.mark.parametrize(
+        "expert", create_expert_nodes(None), ids=lambda e: e.expert_name
+    )
+    def test_matches_fnmatch_semantics(self, expert):
+        patterns = [p.lower() for p in expert.get_file_patterns()]
+        for path in _PATHS:
+            expected = not patterns or any(
+                fnmatch.fnmatch(path.lower(), p) for p in patterns
+            )
+            assert expert.should_analyze_file(path) == expected, path
+
+
+class TestFileRoutingNode:
+    @pytest.mark.asyncio
+    async def test_builds_routing_for_every_expert(self):
+        experts = create_expert_nodes(None)
+        state = {"files": _files(_PATHS)}
+
+        result = await FileRoutingNode(experts)(state)
+
+        routing = result["routing"]
+        assert set(routing) == {e.expert_name for e in experts}
+        assert routing["prompt_hardening"] == list(range(len(_PATHS)))
+        assert routing["owasp_api"] == [0, 1]
+        for expert in experts:
+            assert expert._filter_files(state["files"], routing) == [
+                state["files"][i] for i in routing[expert.expert_name]
+            ]
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_all_files_when_nothing_matches(self):
+        paths = ["README.md", "docs/guide.md"]
+
+        result = await FileRoutingNode([OwaspApiNode(None)])({"files": _files(paths)})
+
+        assert result["routing"]["owasp_api"] == [0, 1]
+
+    def test_expert_uses_precomputed_routing(self):
+        files = _files(_PATHS)
+
+        assert OwaspApiNode(None)._filter_files(files, {"owasp_api": [7]}) == [files[7]]
+
+
+class TestFormattedBlockCache:
+    def test_formats_once_per_file_set_and_budget(self):
+        cache = FormattedBlockCache()
+        files = _files(["a.py", "b.py"])
+        format_files = MagicMock(return_value="block")
+
+        assert cache.get_or_format(files, None, format_files) == "block"
+        assert cache.get_or_format(list(files), None, format_files) == "block"
+        cache.get_or_format(files, 100, format_files)
+        cache.get_or_format(_files(["a.py"]), None, format_files)
+
+        assert format_files.call_count == 3
+
+    def test_evicts_least_recently_used(self):
+        cache = FormattedBlockCache(maxsize=1)
+        format_files = MagicMock(return_value="block")
+
+        cache.get_or_format(_files(["a.py"]), None, format_files)
+        cache.get_or_format(_files(["b.py"]), None, format_files)
+        cache.get_or_format(_files(["a.py"]), None, format_files)
+
+        assert format_files.call_count == 3
+
+    def test_experts_share_blocks_for_same_files(self):
+        experts = create_expert_nodes(None)
+        files = _files(["src/app.py"])
+
+        blocks = {id(e._formatted_files(files, 10_000)) for e in experts}
+
+        assert len(blocks) == 1
+
+
+class TestWorkflowRouting:
+    def test_route_files_runs_between_retrieval_and_experts(self):
+        workflow = LangGraphWorkflowBuilder(MagicMock(), MagicMock()).build()
+
+        edge_pairs = {(e.source, e.target) for e in workflow.get_graph().edges}
+
+        assert ("mcp_retrieve", "route_files") in edge_pairs
+        assert ("route_files", "expert_owasp_api") in edge_pairs
+        assert ("mcp_retrieve", "expert_owasp_api") not in edge_pairs
@@ -0,0 +1,77 @@
+"""Cold-start import budget for the agent entrypoint.
+
+Each check imports ``main`` in a fresh interpreter. Provider SDKs, Langfuse,
+the MCP adapters and sqlite-vec must stay out of that import: they are loaded
+on first use. ``TITVO_IMPORT_BUDGET_MS`` overrides the time budget (2000 ms)
+on slow runners.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+DEFAULT_BUDGET_MS = 2000
+ATTEMPTS = 3
+
+DEFERRED_MODULES = (
+    "langchain.agents",
+    "langchain_anthropic",
+    "langchain_google_genai",
+    "langchain_mcp_adapters",
+    "langchain_openai",
+    "langfuse",
+    "sqlite_vec",
+)
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    )
+
+
+def _main_import_ms() -> float:
+    """Cumulative ``import main`` time reported by ``-X importtime``."""
+    stderr = _run_python("-X", "importtime", "-c", "import main").stderr
+    match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| main$", stderr, re.M)
+    assert match, stderr[-2000:]
+    return int(match.group(1)) / 1000
+
+
+def test_main_does_not_import_deferred_modules():
+    script = (
+        "import sys, main\n"
+        f"for name in {DEFERRED_MODULES!r}:\n"
+        "    if name in sys.modules:\n"
+        "        print(name)\n"
+    )
+
+    loaded = _run_python("-c", script).stdout.split()
+
+    assert loaded == []
+
+
+@pytest.mark.skipif(
+    os.getenv("TITVO_IMPORT_BUDGET_MS") == "0", reason="import budget disabled"
+)
+def test_main_import_time_within_budget():
+    budget_ms = float(os.getenv("TITVO_IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS))
+
+    # Best of a few runs: the first one may pay for a cold page cache
+    best_ms = min(_main_import_ms() for _ in range(ATTEMPTS))
+
+    assert best_ms <= budget_ms, (
+        f"import main took {best_ms:.0f} ms (budget {budget_ms:.0f} ms)"
+    )
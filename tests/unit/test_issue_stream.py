@@ -0,0 +1,160 @@
+"""Tests for streamed expert responses and incremental issue parsing."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from code_analysis.infra.adapters.langgraph.nodes._issue_stream import (
+    IssueStreamParser,
+)
+from code_analysis.infra.adapters.langgraph.nodes.expert_nodes import (
+    PromptHardeningNode,
+)
+from code_analysis.infra.adapters.sqlite_expert_result_cache import (
+    SqliteExpertResultCache,
+)
+
+
+def _issue(n: int) -> dict:
+    return {
+        "title": f"Issue {n}",
+        "description": 'uses "quotes" and {braces} and \\ backslashes',
+        "severity": "HIGH",
+        "category": "RCE",
+        "path": "src/app.py",
+        "line": n,
+        "summary": "s",
+        "code": "if (x) { eval(y); }",
+        "recommendation": "r",
+    }
+
+
+def _response(count: int) -> str:
+    return "```json\n" + json.dumps({"issues": [_issue(n) for n in range(count)]})
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class _StreamingModel:
+    model_name = "gpt-test"
+
+    def __init__(self, chunks: list, error: Exception | None = None):
+        self._chunks = chunks
+        self._error = error
+
+    async def astream(self, messages):
+        for chunk in self._chunks:
+            yield MagicMock(content=chunk)
+        if self._error is not None:
+            raise self._error
+
+
+def _state() -> dict:
+    return {"files": [{"path": "src/app.py", "content": "eval(x)"}], "issues": []}
+
+
+class TestIssueStreamParser:
+    @pytest.mark.parametrize("size", [1, 7, 64, 10_000])
+    def test_emits_every_issue_regardless_of_chunking(self, size):
+        parser = IssueStreamParser()
+
+        issues = [
+            issue
+            for chunk in _chunks(_response(5), size)
+            for issue in parser.feed(chunk)
+        ]
+
+        assert issues == [_issue(n) for n in range(5)]
+        assert parser.done
+
+    def test_emits_issue_as_soon_as_it_closes(self):
+        parser = IssueStreamParser()
+        first = json.dumps(_issue(0))
+
+        assert parser.feed('{"issues": [' + first[:-1]) == []
+        assert parser.feed("}") == [_issue(0)]
+        assert not parser.done
+
+    def test_cut_off_stream_keeps_complete_issues(self):
+        parser = IssueStreamParser()
+        text = _response(3)
+
+        issues = parser.feed(text[: text.rindex("{") + 20])
+
+        assert issues == [_issue(0), _issue(1)]
+        assert not parser.done
+
+    def test_ignores_text_after_array(self):
+        parser = IssueStreamParser()
+
+        parser.feed('{"issues": []}')
+
+        assert parser.done
+        assert parser.feed('{"title": "late"}') == []
+
+
+class TestStreamingExpert:
+    @pytest.mark.asyncio
+    async def test_complete_stream_parses_all_issues(self):
+        model = _StreamingModel(_chunks(_response(3) + "\n```", 16))
+        node = PromptHardeningNode(model, streaming=True)
+
+        result = await node(_state())
+
+        assert [issue.line for issue in result["issues"]] == [0, 1, 2]
+        meta = result["expert_metadata"]["prompt_hardening"]
+        assert meta["time_to_first_issue_s"] is not None
+        assert "partial_response" not in meta
+
+    @pytest.mark.asyncio
+    async def test_response_cut_off_keeps_received_issues_uncached(self, tmp_path):
+        text = _response(3)
+        model = _StreamingModel(_chunks(text[: text.rindex("{") + 20], 16))
+        cache = SqliteExpertResultCache(str(tmp_path / "cache.db"))
+        node = PromptHardeningNode(model, cache, streaming=True)
+
+        result = await node(_state())
+
+        assert [issue.line for issue in result["issues"]] == [0, 1]
+        meta = result["expert_metadata"]["prompt_hardening"]
+        assert meta["partial_response"] is True
+        assert meta["cache_misses"] == 1
+        second = await node(_state())
+        assert second["expert_metadata"]["prompt_hardening"]["cache_misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_error_after_issues_keeps_them(self):
+        text = _response(3)
+        model = _StreamingModel(
+            _chunks(text[: text.rindex("{")], 16), error=ConnectionError("reset")
+        )
+        node = PromptHardeningNode(model, streaming=True)
+
+        result = await node(_state())
+
+        assert len(result["issues"]) == 2
+        assert "expert_errors" not in result
+
+    @pytest.mark.asyncio
+    async def test_stream_error_before_any_issue_is_an_expert_error(self):
+        model = _StreamingModel(['{"iss'], error=ConnectionError("reset"))
+        node = PromptHardeningNode(model, streaming=True)
+
+        result = await node(_state())
+
+        assert result["issues"] == []
+        assert result["expert_errors"] == ["prompt_hardening: reset"]
+
+    @pytest.mark.asyncio
+    async def test_list_content_blocks(self):
+        blocks = [
+            [{"type": "text", "text": chunk}] for chunk in _chunks(_response(2), 9)
+        ]
+        node = PromptHardeningNode(_StreamingModel(blocks), streaming=True)
+
+        result = await node(_state())
+
+        assert len(result["issues"]) == 2
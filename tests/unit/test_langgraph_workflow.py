@@ -1,5 +1,6 @@
 """Tests for LangGraph workflow builder."""
 
+import asyncio
 import logging
 from unittest.mock import AsyncMock, MagicMock
 
@@ -15,6 +16,7 @@ from code_analysis.infra.adapters.langgraph.nodes.merge_findings_node import (
 from code_analysis.infra.adapters.langgraph.nodes.rag_retrieval_node import (
     RagRetrievalNode,
 )
+from code_analysis.infra.adapters.langgraph.settings import WorkflowSettings
 from code_analysis.infra.adapters.langgraph.state import AgentState
 from code_analysis.infra.adapters.langgraph.workflow import LangGraphWorkflowBuilder
 
@@ -220,6 +222,64 @@ class TestMCPRetrievalNode:
         assert result["mcp_error"] == "No files could be read from commit"
         assert result["scaned_files"] == 0
 
+    @pytest.mark.asyncio
+    async def test_concurrent_fetch_is_bounded_and_sorted_by_path(self):
+        """Reads run concurrently up to the cap and come back sorted by path."""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def _read(args):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"content": f"content of {args['path']}"}
+
+        files_tool = MagicMock()
+        files_tool.ainvoke = AsyncMock(side_effect=_read)
+        node = MCPRetrievalNode(MagicMock(), fetch_concurrency=3)
+        paths = [f"sha/src/f{i:02d}.py" for i in reversed(range(10))]
+
+        files, metadata = await node._fetch_files(files_tool, paths, "sha")
+
+        assert max_in_flight == 3
+        assert [f["path"] for f in files] == sorted(p[4:] for p in paths)
+        assert files[0]["content"] == "content of sha/src/f00.py"
+        assert metadata["files_read"] == 10
+        assert set(metadata["fetch_latency_s"]) == set(paths)
+
+    @pytest.mark.asyncio
+    async def test_fetch_retries_timeouts_then_gives_up(self, monkeypatch):
+        """A hung read is retried; a read that keeps failing is reported."""
+        monkeypatch.setattr(
+            "code_analysis.infra.adapters.langgraph.nodes.mcp_retrieval_node."
+            "FETCH_RETRY_BACKOFF_SEC",
+            0,
+        )
+        attempts: dict[str, int] = {}
+
+        async def _read(args):
+            path = args["path"]
+            attempts[path] = attempts.get(path, 0) + 1
+            if path == "slow.py" and attempts[path] == 1:
+                await asyncio.sleep(1)
+            if path == "broken.py":
+                raise RuntimeError("boom")
+            return {"content": path}
+
+        files_tool = MagicMock()
+        files_tool.ainvoke = AsyncMock(side_effect=_read)
+        node = MCPRetrievalNode(MagicMock(), fetch_timeout_sec=0.05, fetch_retries=2)
+
+        files, metadata = await node._fetch_files(
+            files_tool, ["slow.py", "broken.py"], None
+        )
+
+        assert files == [{"path": "slow.py", "content": "slow.py"}]
+        assert attempts == {"slow.py": 2, "broken.py": 3}
+        assert metadata["files_failed"] == ["broken.py"]
+
 
 class TestMergeFindingsNode:
     """Tests for merge findings node."""
@@ -228,7 +288,8 @@ class TestMergeFindingsNode:
     def node(self):
         return MergeFindingsNode()
 
-    def test_zero_scaned_files_returns_failed(self, node):
+    @pytest.mark.asyncio
+    async def test_zero_scaned_files_returns_failed(self, node):
         """Sin archivos escaneados el análisis debe fallar."""
         state: AgentState = {
             "task_id": "test",
@@ -239,11 +300,12 @@ class TestMergeFindingsNode:
             "scaned_files": 0,
             "issues": [],
         }
-        result = node(state)
+        result = await node(state)
         assert result["status"] == "FAILED"
         assert result["final_output"]["error"] == "No files scanned"
 
-    def test_mcp_error_returns_failed(self, node):
+    @pytest.mark.asyncio
+    async def test_mcp_error_returns_failed(self, node):
         """Error de recuperación MCP debe propagarse como FAILED."""
         state: AgentState = {
             "task_id": "test",
@@ -255,11 +317,12 @@ class TestMergeFindingsNode:
             "mcp_error": "No files in commit",
             "issues": [],
         }
-        result = node(state)
+        result = await node(state)
         assert result["status"] == "FAILED"
         assert result["final_output"]["error"] == "No files in commit"
 
-    def test_empty_issues_with_scaned_files_returns_completed(self, node):
+    @pytest.mark.asyncio
+    async def test_empty_issues_with_scaned_files_returns_completed(self, node):
         """Sin issues pero con archivos escaneados debe ser COMPLETED."""
         state: AgentState = {
             "task_id": "test",
@@ -270,10 +333,11 @@ class TestMergeFindingsNode:
             "scaned_files": 1,
             "issues": [],
         }
-        result = node(state)
+        result = await node(state)
         assert result["status"] == "COMPLETED"
 
-    def test_critical_issues_returns_failed(self, node):
+    @pytest.mark.asyncio
+    async def test_critical_issues_returns_failed(self, node):
         """Critical issues should return FAILED status."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
@@ -297,10 +361,11 @@ class TestMergeFindingsNode:
             "scaned_files": 5,
             "issues": [issue],
         }
-        result = node(state)
+        result = await node(state)
         assert result["status"] == "FAILED"
 
-    def test_medium_issues_returns_warning(self, node):
+    @pytest.mark.asyncio
+    async def test_medium_issues_returns_warning(self, node):
         """Medium issues should return WARNING status."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
@@ -324,10 +389,11 @@ class TestMergeFindingsNode:
             "scaned_files": 3,
             "issues": [issue],
         }
-        result = node(state)
+        result = await node(state)
         assert result["status"] == "WARNING"
 
-    def test_without_model_preserves_duplicate_findings(self, node):
+    @pytest.mark.asyncio
+    async def test_without_model_preserves_duplicate_findings(self, node):
         """Without consolidation model, duplicate-looking issues are preserved."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
@@ -363,12 +429,13 @@ class TestMergeFindingsNode:
             "scaned_files": 5,
             "issues": [issue1, issue2],
         }
-        result = node(state)
+        result = await node(state)
 
         final_output = result.get("final_output", {})
         assert len(final_output.get("issues", [])) == 2
 
-    def test_without_model_preserves_all_findings(self, node):
+    @pytest.mark.asyncio
+    async def test_without_model_preserves_all_findings(self, node):
         """Fallback should not choose between duplicate-looking issues."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
@@ -404,7 +471,7 @@ class TestMergeFindingsNode:
             "issues": [issue_without_code, issue_with_code],
         }
 
-        result = node(state)
+        result = await node(state)
 
         final_output = result.get("final_output", {})
         issues = final_output.get("issues", [])
@@ -412,12 +479,14 @@ class TestMergeFindingsNode:
         assert issues[0]["title"] == issue_without_code.title
         assert issues[1]["title"] == issue_with_code.title
 
-    def test_findings_consolidation_groups_duplicate_findings(self):
+    @pytest.mark.asyncio
+    async def test_findings_consolidation_groups_duplicate_findings(self):
         """Consolidation should return final merged issues from the model."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
         model = MagicMock()
-        model.invoke.return_value = MagicMock(
+        model.ainvoke = AsyncMock()
+        model.ainvoke.return_value = MagicMock(
             content=(
                 '{"issues":[{"title":"URL externa sin validación",'
                 '"description":"Se navega a una URL externa sin allowlist.",'
@@ -462,24 +531,26 @@ class TestMergeFindingsNode:
             "issues": [issue1, issue2],
         }
 
-        result = node(state)
+        result = await node(state)
 
         issues = result["final_output"]["issues"]
         assert len(issues) == 1
         assert issues[0]["title"] == "URL externa sin validación"
-        prompt = model.invoke.call_args.args[0][0].content
+        prompt = model.ainvoke.call_args.args[0][0].content
         assert "# Consolidación de Hallazgos de Seguridad" in prompt
         assert "long description should not be sent" in prompt
         assert "long recommendation should not be sent" in prompt
         assert "duplicate_groups" not in prompt
         assert '"issues"' in prompt
 
-    def test_findings_consolidation_parses_fenced_json(self):
+    @pytest.mark.asyncio
+    async def test_findings_consolidation_parses_fenced_json(self):
         """Markdown-fenced JSON should be accepted without repair."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
         model = MagicMock()
-        model.invoke.return_value = MagicMock(
+        model.ainvoke = AsyncMock()
+        model.ainvoke.return_value = MagicMock(
             content=(
                 '```json\n{"issues":[{"title":"Finding A",'
                 '"description":"A","severity":"MEDIUM","category":"A",'
@@ -521,18 +592,20 @@ class TestMergeFindingsNode:
             "issues": [issue1, issue2],
         }
 
-        result = node(state)
+        result = await node(state)
 
         assert len(result["final_output"]["issues"]) == 1
         assert result["final_output"]["issues"][0]["title"] == "Finding A"
-        assert model.invoke.call_count == 1
+        assert model.ainvoke.call_count == 1
 
-    def test_findings_consolidation_parses_structured_content_block(self):
+    @pytest.mark.asyncio
+    async def test_findings_consolidation_parses_structured_content_block(self):
         """Structured chat blocks may already contain a text object."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
         model = MagicMock()
-        model.invoke.return_value = MagicMock(
+        model.ainvoke = AsyncMock()
+        model.ainvoke.return_value = MagicMock(
             content=[
                 {
                     "type": "text",
@@ -590,14 +663,15 @@ class TestMergeFindingsNode:
             "issues": [issue1, issue2],
         }
 
-        result = node(state)
+        result = await node(state)
 
         issues = result["final_output"]["issues"]
         assert len(issues) == 1
         assert issues[0]["title"] == "Finding A"
-        assert model.invoke.call_count == 1
+        assert model.ainvoke.call_count == 1
 
-    def test_findings_consolidation_repairs_python_style_dict(self):
+    @pytest.mark.asyncio
+    async def test_findings_consolidation_repairs_python_style_dict(self):
         """Invalid Python-style dict responses should be repaired by the model."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
@@ -608,7 +682,8 @@ class TestMergeFindingsNode:
             '"code":"foo();","recommendation":"Fix A"}]}'
         )
         model = MagicMock()
-        model.invoke.side_effect = [
+        model.ainvoke = AsyncMock()
+        model.ainvoke.side_effect = [
             MagicMock(
                 content=(
                     "{'issues':[{'title':'Finding A','description':'A',"
@@ -653,24 +728,26 @@ class TestMergeFindingsNode:
             "issues": [issue1, issue2],
         }
 
-        result = node(state)
+        result = await node(state)
 
         issues = result["final_output"]["issues"]
         assert len(issues) == 1
         assert issues[0]["title"] == "Finding A"
-        assert model.invoke.call_count == 2
-        repair_prompt = model.invoke.call_args_list[1].args[0][0].content
+        assert model.ainvoke.call_count == 2
+        repair_prompt = model.ainvoke.call_args_list[1].args[0][0].content
         assert "JSON estricto" in repair_prompt
         assert "No cambies el contenido semántico" in repair_prompt
 
-    def test_findings_consolidation_parse_warning_logs_redacted_preview(
+    @pytest.mark.asyncio
+    async def test_findings_consolidation_parse_warning_logs_redacted_preview(
         self, caplog
     ):
         """Parse failures should show response shape without raw code snippets."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
         model = MagicMock()
-        model.invoke.side_effect = [
+        model.ainvoke = AsyncMock()
+        model.ainvoke.side_effect = [
             MagicMock(
                 content=[
                     {
@@ -723,7 +800,7 @@ class TestMergeFindingsNode:
         }
 
         with caplog.at_level(logging.WARNING):
-            result = node(state)
+            result = await node(state)
 
         assert len(result["final_output"]["issues"]) == 2
         assert "response_shape=list" in caplog.text
@@ -731,12 +808,14 @@ class TestMergeFindingsNode:
         assert "redacted" in caplog.text
         assert "secretTokenStore();" not in caplog.text
 
-    def test_findings_consolidation_invalid_json_falls_back(self):
+    @pytest.mark.asyncio
+    async def test_findings_consolidation_invalid_json_falls_back(self):
         """Invalid model and repair responses should keep original findings."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
         model = MagicMock()
-        model.invoke.side_effect = [
+        model.ainvoke = AsyncMock()
+        model.ainvoke.side_effect = [
             MagicMock(content="not json"),
             MagicMock(content="still not json"),
         ]
@@ -774,17 +853,19 @@ class TestMergeFindingsNode:
             "issues": [issue1, issue2],
         }
 
-        result = node(state)
+        result = await node(state)
 
         assert len(result["final_output"]["issues"]) == 2
-        assert model.invoke.call_count == 2
+        assert model.ainvoke.call_count == 2
 
-    def test_findings_consolidation_keeps_model_severity(self):
+    @pytest.mark.asyncio
+    async def test_findings_consolidation_keeps_model_severity(self):
         """Consolidation should use the model's final issue severity."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
         model = MagicMock()
-        model.invoke.return_value = MagicMock(
+        model.ainvoke = AsyncMock()
+        model.ainvoke.return_value = MagicMock(
             content=(
                 '{"issues":[{"title":"Finding consolidado",'
                 '"description":"Riesgo consolidado.","severity":"HIGH",'
@@ -828,19 +909,21 @@ class TestMergeFindingsNode:
             "issues": [low_with_more_code, high_with_less_code],
         }
 
-        result = node(state)
+        result = await node(state)
 
         issues = result["final_output"]["issues"]
         assert len(issues) == 1
         assert issues[0]["title"] == "Finding consolidado"
         assert issues[0]["severity"] == "HIGH"
 
-    def test_findings_consolidation_combines_local_storage_feedback(self):
+    @pytest.mark.asyncio
+    async def test_findings_consolidation_combines_local_storage_feedback(self):
         """Equivalent localStorage token findings should become one enriched issue."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
         model = MagicMock()
-        model.invoke.return_value = MagicMock(
+        model.ainvoke = AsyncMock()
+        model.ainvoke.return_value = MagicMock(
             content=(
                 '{"issues":[{"title":"Tokens OAuth en localStorage (web)",'
                 '"description":"Los expertos web y mobile detectaron que los '
@@ -890,7 +973,7 @@ class TestMergeFindingsNode:
             "issues": [web_issue, mobile_issue],
         }
 
-        result = node(state)
+        result = await node(state)
 
         issues = result["final_output"]["issues"]
         assert len(issues) == 1
@@ -900,13 +983,15 @@ class TestMergeFindingsNode:
         assert "HttpOnly" in issues[0]["recommendation"]
         assert "CSP" in issues[0]["recommendation"]
 
-    def test_findings_consolidation_uses_valid_model_output_as_is(self):
+    @pytest.mark.asyncio
+    async def test_findings_consolidation_uses_valid_model_output_as_is(self):
         """Valid model output should not be changed by deterministic cleanup."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
         duplicate_code = "window.localStorage.setItem(KEYS.ACCESS, tokens.accessToken);"
         model = MagicMock()
-        model.invoke.return_value = MagicMock(
+        model.ainvoke = AsyncMock()
+        model.ainvoke.return_value = MagicMock(
             content=(
                 '{"issues":['
                 '{"title":"Almacenamiento de tokens en localStorage",'
@@ -960,7 +1045,7 @@ class TestMergeFindingsNode:
             "issues": [issue1, issue2],
         }
 
-        result = node(state)
+        result = await node(state)
 
         issues = result["final_output"]["issues"]
         assert len(issues) == 2
@@ -968,12 +1053,14 @@ class TestMergeFindingsNode:
         assert issues[0]["line"] == 16
         assert issues[0]["code"] == duplicate_code
 
-    def test_merge_node_returns_final_output_and_consolidated_issues(self):
+    @pytest.mark.asyncio
+    async def test_merge_node_returns_final_output_and_consolidated_issues(self):
         """Merge node should return both final_output and consolidated issues."""
         from code_analysis.domain.entities.expert_result import ExpertIssue
 
         model = MagicMock()
-        model.invoke.return_value = MagicMock(
+        model.ainvoke = AsyncMock()
+        model.ainvoke.return_value = MagicMock(
             content=(
                 '{"issues":[{"title":"Consolidated A",'
                 '"description":"A","severity":"HIGH","category":"A",'
@@ -1015,7 +1102,7 @@ class TestMergeFindingsNode:
             "issues": [issue1, issue2],
         }
 
-        result = node(state)
+        result = await node(state)
 
         assert "final_output" in result
         assert "issues" in result
@@ -1025,6 +1112,67 @@ class TestMergeFindingsNode:
         assert len(result["issues"]) == 1
         assert result["issues"][0].title == "Consolidated A"
 
+    @staticmethod
+    def _duplicate_issues_state() -> AgentState:
+        from code_analysis.domain.entities.expert_result import ExpertIssue
+
+        issue = ExpertIssue(
+            title="Finding A",
+            description="A",
+            severity="MEDIUM",
+            category="A",
+            path="src/app.ts",
+            line=5,
+            summary="A",
+            code="foo();",
+            recommendation="Fix A",
+        )
+        return {
+            "task_id": "test",
+            "repository_url": "",
+            "commit_hash": "",
+            "extra_args": {},
+            "files": [],
+            "scaned_files": 1,
+            "issues": [issue, issue],
+        }
+
+    @pytest.mark.asyncio
+    async def test_consolidation_timeout_keeps_original_findings(self):
+        """A consolidation call exceeding the timeout falls back to raw findings."""
+
+        async def _slow(_messages):
+            await asyncio.sleep(1)
+
+        model = MagicMock()
+        model.ainvoke = AsyncMock(side_effect=_slow)
+        node = MergeFindingsNode(model, timeout_sec=0.01)
+
+        result = await node(self._duplicate_issues_state())
+
+        assert result["final_output"]["status"] == "WARNING"
+        assert len(result["issues"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_consolidation_is_cancellable_and_does_not_block_loop(self):
+        """Other tasks keep running during consolidation, and cancel propagates."""
+        started = asyncio.Event()
+
+        async def _hang(_messages):
+            started.set()
+            await asyncio.Event().wait()
+
+        model = MagicMock()
+        model.ainvoke = AsyncMock(side_effect=_hang)
+        node = MergeFindingsNode(model, timeout_sec=None)
+
+        task = asyncio.create_task(node(self._duplicate_issues_state()))
+        await asyncio.wait_for(started.wait(), timeout=1)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
 
 class TestAgentState:
     """Tests for AgentState TypedDict."""
@@ -1129,11 +1277,58 @@ class TestLangGraphWorkflowWithRag:
         assert "rag_retrieve" not in nodes, f"'rag_retrieve' should not be in {nodes}"
         assert "expert_owasp_mobile" in nodes
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(("parallel", "expected_max"), [(True, 3), (False, 1)])
+    async def test_shard_calls_respect_the_expert_concurrency(
+        self, parallel, expected_max
+    ):
+        """Shards of every expert share one cap: 3 in parallel, 1 sequential."""
+        in_flight = max_in_flight = calls = 0
+
+        async def _ainvoke(messages):
+            nonlocal in_flight, max_in_flight, calls
+            if len(messages) == 1:
+                return MagicMock(content="not json")
+            calls += 1
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return MagicMock(content='{"issues": []}')
+
+        model = MagicMock()
+        model.model_name = "gpt-4.1"
+        model.ainvoke = AsyncMock(side_effect=_ainvoke)
+        client = _mcp_client_with_files([f"src/f{i}.py" for i in range(8)])
+        files_tool = client.get_tools.return_value[2]
+        files_tool.ainvoke.return_value = {"content": "value = compute(x)\n" * 400}
+
+        workflow = LangGraphWorkflowBuilder(
+            client,
+            model,
+            settings=WorkflowSettings(
+                parallel_experts=parallel,
+                expert_max_concurrency=3,
+                prompt_max_tokens=12000,
+                combined_max_tokens=0,
+            ),
+        ).build()
+        result = await workflow.ainvoke(_initial_state())
+
+        assert calls > 6
+        assert max_in_flight == expected_max
+        assert result["expert_errors"] == []
+
     def test_workflow_chains_owasp_mobile_between_web_and_devsecops(
         self, mock_mcp_client, mock_model
     ):
-        """OWASP Mobile should run after web and before DevSecOps."""
-        builder = LangGraphWorkflowBuilder(mock_mcp_client, mock_model, rag_node=None)
+        """In sequential mode OWASP Mobile runs after web and before DevSecOps."""
+        builder = LangGraphWorkflowBuilder(
+            mock_mcp_client,
+            mock_model,
+            rag_node=None,
+            settings=WorkflowSettings(parallel_experts=False),
+        )
         workflow = builder.build()
 
         edges = workflow.get_graph().edges
@@ -1141,3 +1336,114 @@ class TestLangGraphWorkflowWithRag:
 
         assert ("expert_owasp_web", "expert_owasp_mobile") in edge_pairs
         assert ("expert_owasp_mobile", "expert_devsecops") in edge_pairs
+
+    def test_parallel_mode_fans_out_from_rag_and_joins_at_merge(
+        self, mock_mcp_client, mock_model, mock_rag_port
+    ):
+        """Parallel mode: every expert branches from rag_retrieve into merge."""
+        builder = LangGraphWorkflowBuilder(
+            mock_mcp_client, mock_model, rag_node=RagRetrievalNode(mock_rag_port)
+        )
+        workflow = builder.build()
+
+        edge_pairs = {(e.source, e.target) for e in workflow.get_graph().edges}
+        experts = [n for n in workflow.get_graph().nodes if n.startswith("expert_")]
+
+        assert len(experts) == 6
+        for expert in experts:
+            assert ("rag_retrieve", expert) in edge_pairs
+            assert (expert, "merge") in edge_pairs
+        assert ("expert_owasp_web", "expert_owasp_mobile") not in edge_pairs
+
+    def test_parallel_mode_applies_max_concurrency(self, mock_mcp_client, mock_model):
+        builder = LangGraphWorkflowBuilder(
+            mock_mcp_client,
+            mock_model,
+            settings=WorkflowSettings(expert_max_concurrency=2),
+        )
+        workflow = builder.build()
+
+        assert workflow.config["max_concurrency"] == 2
+
+
+def _mcp_client_with_files(paths: list[str]) -> MagicMock:
+    git_tool = MagicMock()
+    git_tool.name = "mcp.tool.git.commit-files"
+    git_tool.ainvoke = AsyncMock(return_value={"jobId": "job-1"})
+    poll_tool = MagicMock()
+    poll_tool.name = "mcp.tool.git.commit-files.poll"
+    poll_tool.ainvoke = AsyncMock(
+        return_value={"status": "SUCCESS", "filesPaths": paths}
+    )
+    files_tool = MagicMock()
+    files_tool.name = "mcp.tool.files"
+    files_tool.ainvoke = AsyncMock(return_value={"content": "eval(x)"})
+    client = MagicMock()
+    client.get_tools = AsyncMock(return_value=[git_tool, poll_tool, files_tool])
+    return client
+
+
+def _initial_state() -> AgentState:
+    return {
+        "task_id": "task-1",
+        "repository_url": "https://github.com/org/repo",
+        "branch": "main",
+        "commit_hash": "abc123",
+        "extra_args": {},
+        "files": [],
+        "scaned_files": 0,
+        "issues": [],
+        "expert_errors": [],
+    }
+
+
+class TestLangGraphWorkflowExecution:
+    """Run the compiled graph end to end with mocked MCP and model."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("parallel", [True, False])
+    async def test_expert_results_accumulate(self, parallel):
+        """Issues, errors and metadata from every expert must survive the join."""
+        issue_json = (
+            '{"issues":[{"title":"Eval","description":"d","severity":"LOW",'
+            '"category":"RCE","path":"src/app.py","line":1,"summary":"s",'
+            '"code":"eval(x)","recommendation":"r"}]}'
+        )
+        calls = 0
+
+        async def _ainvoke(messages):
+            nonlocal calls
+            if len(messages) == 1:
+                # Consolidation keeps the original findings on bad model output
+                return MagicMock(content="not json")
+            calls += 1
+            if "OWASP Mobile" in messages[0].content:
+                raise RuntimeError("rate limited")
+            return MagicMock(content=issue_json)
+
+        model = MagicMock()
+        model.ainvoke = AsyncMock(side_effect=_ainvoke)
+
+        workflow = LangGraphWorkflowBuilder(
+            _mcp_client_with_files(["src/app.py"]),
+            model,
+            # One call per expert, not the combined small-commit call
+            settings=WorkflowSettings(
+                parallel_experts=parallel, combined_max_tokens=0
+            ),
+        ).build()
+        result = await workflow.ainvoke(_initial_state())
+
+        assert calls == 6
+        assert len(result["issues"]) == 5
+        assert len(result["final_output"]["issues"]) == 5
+        assert result["expert_errors"] == ["owasp_mobile: rate limited"]
+        assert set(result["expert_metadata"]) == {
+            "mcp_retrieve",
+            "prompt_hardening",
+            "owasp_api",
+            "owasp_web",
+            "owasp_mobile",
+            "devsecops",
+            "code_vulnerabilities",
+        }
@@ -0,0 +1,175 @@
+"""Tests for per-expert token usage and cost accounting."""
+
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from code_analysis.domain.entities.expert_result import ExpertIssue
+from code_analysis.infra.adapters.langgraph.llm_usage import (
+    ModelPrice,
+    PriceTable,
+    TokenUsage,
+    price_overrides_from_env,
+)
+from code_analysis.infra.adapters.langgraph.nodes.expert_nodes import (
+    PromptHardeningNode,
+)
+from code_analysis.infra.adapters.langgraph.nodes.merge_findings_node import (
+    MergeFindingsNode,
+)
+
+
+def _usage(input_tokens: int, output_tokens: int, cache_read: int = 0) -> dict:
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "input_token_details": {"cache_read": cache_read},
+    }
+
+
+def _issue(line: int) -> dict:
+    return {
+        "title": f"Issue {line}",
+        "description": "d",
+        "severity": "HIGH",
+        "path": "src/app.py",
+        "line": line,
+    }
+
+
+class _UsageModel:
+    model_name = "gpt-4.1"
+
+    def __init__(self, usage: dict, issues: int = 1):
+        self._usage = usage
+        self._issues = issues
+
+    async def ainvoke(self, messages):
+        issues = [_issue(n) for n in range(self._issues)]
+        return AIMessage(
+            content=json.dumps({"issues": issues}), usage_metadata=self._usage
+        )
+
+    async def astream(self, messages):
+        issues = [_issue(n) for n in range(self._issues)]
+        yield AIMessageChunk(content=json.dumps({"issues": issues}))
+        # Providers report usage on the final chunk
+        yield AIMessageChunk(content="", usage_metadata=self._usage)
+
+
+def _state() -> dict:
+    return {"files": [{"path": "src/app.py", "content": "eval(x)"}], "issues": []}
+
+
+class TestTokenUsage:
+    def test_from_message_reads_cache_details(self):
+        usage = TokenUsage.from_message(
+            AIMessage(content="", usage_metadata=_usage(1000, 200, cache_read=600))
+        )
+
+        assert usage == TokenUsage(
+            calls=1, input_tokens=1000, output_tokens=200, cached_tokens=600
+        )
+
+    def test_missing_usage_counts_the_call_only(self):
+        assert TokenUsage.from_message(object()) == TokenUsage(calls=1)
+
+
+class TestPriceTable:
+    def test_cost_bills_cached_input_at_cached_price(self):
+        table = PriceTable([("model-x", ModelPrice(2.0, 8.0, cached_input=0.5))])
+        usage = TokenUsage(
+            calls=1,
+            input_tokens=1_000_000,
+            output_tokens=500_000,
+            cached_tokens=400_000,
+        )
+
+        # 600k uncached * 2 + 400k cached * 0.5 + 500k output * 8
+        assert table.cost("model-x", usage) == pytest.approx(1.2 + 0.2 + 4.0)
+
+    def test_matches_prefix_without_routing_provider(self):
+        table = PriceTable()
+
+        assert table.price("openai/gpt-4.1-mini-2025-04-14") == ModelPrice(
+            0.40, 1.60, cached_input=0.10
+        )
+        assert table.cost("unknown-model", TokenUsage(input_tokens=10)) is None
+
+    def test_overrides_take_precedence(self, monkeypatch):
+        monkeypatch.setenv(
+            "TITVO_LLM_PRICES", '{"gpt-4.1": {"input": 1.0, "output": 2.0}}'
+        )
+
+        table = PriceTable(price_overrides_from_env())
+
+        assert table.price("gpt-4.1") == ModelPrice(1.0, 2.0)
+
+    def test_invalid_overrides_are_ignored(self, monkeypatch):
+        monkeypatch.setenv("TITVO_LLM_PRICES", '{"gpt-4.1": {"inputs": 1.0}}')
+
+        assert price_overrides_from_env() == ()
+
+    def test_report_totals_experts_and_consolidation(self):
+        table = PriceTable([("model-x", ModelPrice(1.0, 1.0))])
+
+        report = table.report(
+            "model-x",
+            {"owasp_web": TokenUsage(1, 300_000, 100_000)},
+            TokenUsage(1, 500_000, 100_000),
+        )
+
+        assert report["experts"]["owasp_web"]["cost_usd"] == 0.4
+        assert report["experts"]["owasp_web"]["cached_ratio"] == 0.0
+        assert report["total"]["calls"] == 2
+        assert report["total"]["input_tokens"] == 800_000
+        assert report["total"]["cost_usd"] == 1.0
+
+
+class TestExpertUsage:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("streaming", [False, True])
+    async def test_expert_metadata_reports_provider_usage(self, streaming):
+        node = PromptHardeningNode(
+            _UsageModel(_usage(1200, 80, cache_read=1000)), streaming=streaming
+        )
+
+        result = await node(_state())
+
+        assert result["expert_metadata"]["prompt_hardening"]["usage"] == {
+            "calls": 1,
+            "input_tokens": 1200,
+            "output_tokens": 80,
+            "cached_tokens": 1000,
+            "cache_write_tokens": 0,
+        }
+
+
+class TestMergeUsage:
+    @pytest.mark.asyncio
+    async def test_final_output_includes_expert_and_consolidation_usage(self):
+        node = MergeFindingsNode(
+            _UsageModel(_usage(500, 100)),
+            prices=PriceTable([("gpt-4.1", ModelPrice(2.0, 8.0))]),
+            model_id="gpt-4.1",
+        )
+        state = {
+            "issues": [ExpertIssue.from_dict(_issue(0)) for _ in range(2)],
+            "scaned_files": 1,
+            "expert_metadata": {
+                "mcp_retrieve": {"files": 1},
+                "owasp_web": {"usage": TokenUsage(1, 1000, 200).to_dict()},
+            },
+        }
+
+        result = await node(state)
+
+        usage = result["final_output"]["usage"]
+        assert usage["model"] == "gpt-4.1"
+        assert set(usage["experts"]) == {"owasp_web"}
+        assert usage["experts"]["owasp_web"]["cost_usd"] == pytest.approx(0.0036)
+        assert usage["consolidation"]["input_tokens"] == 500
+        assert usage["total"]["calls"] == 2
+        assert usage["total"]["cost_usd"] == pytest.approx(0.0036 + 0.0018)
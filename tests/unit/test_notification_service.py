@@ -13,6 +13,9 @@ from code_analysis.domain.notification_service import NotificationService
 from code_analysis.infra.adapters.lambda_bitbucket_repository import (
     LambdaBitbucketRepository,
 )
+from code_analysis.infra.adapters.lambda_report_repository import (
+    LambdaReportRepository,
+)
 
 
 def _result_dto(scan_mode: str = "full") -> ResultDto:
@@ -149,3 +152,88 @@ def test_lambda_bitbucket_repository_raises_error_payload(monkeypatch):
                 annotations=[],
             )
         )
+
+
+def _github_service(
+    report_repository: MagicMock,
+) -> tuple[NotificationService, MagicMock]:
+    github_repository = MagicMock()
+    github_repository.create_github_issue.return_value = {
+        "htmlURL": "https://github.example/issues/1"
+    }
+    service = NotificationService(
+        bitbucket_repository=MagicMock(),
+        github_repository=github_repository,
+        report_repository=report_repository,
+    )
+    return service, github_repository
+
+
+def _github_result_dto() -> ResultDto:
+    result_dto = _result_dto()
+    result_dto.source = TaskSource.GITHUB.value
+    return result_dto
+
+
+@pytest.mark.asyncio
+async def test_async_github_issue_created_after_report():
+    report_repository = MagicMock()
+    report_repository.create_report.return_value = {
+        "reportURL": "https://reports.example/report.html"
+    }
+    service, github_repository = _github_service(report_repository)
+    calls = MagicMock()
+    calls.attach_mock(report_repository.create_report, "create_report")
+    calls.attach_mock(github_repository.create_github_issue, "create_github_issue")
+
+    result = await service.send_notifications_async(_github_result_dto())
+
+    assert result == {
+        "report_url": "https://reports.example/report.html",
+        "html_url": "https://github.example/issues/1",
+    }
+    assert [name for name, _, _ in calls.mock_calls] == [
+        "create_report",
+        "create_github_issue",
+    ]
+    github_dto = github_repository.create_github_issue.call_args.args[0]
+    assert github_dto.issues[0].path == "src/app.ts"
+
+
+@pytest.mark.asyncio
+async def test_async_github_failed_report_creates_no_issue():
+    report_repository = MagicMock()
+    report_repository.create_report.side_effect = RuntimeError("report failed")
+    service, github_repository = _github_service(report_repository)
+
+    with pytest.raises(RuntimeError, match="report failed"):
+        await service.send_notifications_async(_github_result_dto())
+
+    github_repository.create_github_issue.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_async_bitbucket_matches_sync_results():
+    bitbucket_repository = MagicMock()
+    bitbucket_repository.create_code_insights_report.return_value = {
+        "codeInsightsURL": "https://bitbucket.example/insights"
+    }
+    service = _service(bitbucket_repository)
+
+    result = await service.send_notifications_async(_result_dto())
+
+    assert result == service.send_notifications(_result_dto())
+    dto = bitbucket_repository.create_code_insights_report.call_args.args[0]
+    assert dto.reportURL == "https://reports.example/report.html"
+
+
+def test_lambda_repositories_reuse_shared_client(monkeypatch):
+    monkeypatch.setattr(
+        "code_analysis.infra.adapters.lambda_report_repository.boto3.client",
+        MagicMock(side_effect=AssertionError("client should be shared")),
+    )
+    lambda_client = MagicMock()
+
+    repository = LambdaReportRepository("report", lambda_client=lambda_client)
+
+    assert repository.lambda_client is lambda_client
@@ -0,0 +1,109 @@
+"""Tests for the adaptive polling helper and BatchService.wait_for_job."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from rag_indexer_trigger.batch_service import BatchService
+from shared.infra.polling import PollPolicy, PollTimeoutError, poll_until
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestPollPolicy:
+    def test_backs_off_exponentially_up_to_cap(self):
+        policy = PollPolicy(
+            first_delay_s=1, initial_interval_s=4, multiplier=2, max_interval_s=10
+        )
+        no_jitter = [policy.interval(n, rng=lambda: 0.5) for n in range(1, 6)]
+
+        assert no_jitter == [1, 4, 8, 10, 10]
+
+    def test_jitter_stays_within_bounds(self):
+        policy = PollPolicy(initial_interval_s=10, jitter=0.2)
+
+        assert policy.interval(2, rng=lambda: 0.0) == pytest.approx(8)
+        assert policy.interval(2, rng=lambda: 1.0) == pytest.approx(12)
+
+
+class TestPollUntil:
+    @pytest.mark.asyncio
+    async def test_fast_first_check_then_backoff(self):
+        clock = _FakeClock()
+        statuses = iter(["RUNNING", "RUNNING", "SUCCEEDED"])
+        policy = PollPolicy(first_delay_s=1, initial_interval_s=4, jitter=0)
+
+        result = await poll_until(
+            lambda: next(statuses),
+            lambda status: status == "SUCCEEDED",
+            policy,
+            clock=clock,
+            sleep=clock.sleep,
+        )
+
+        assert result.value == "SUCCEEDED"
+        assert result.attempts == 3
+        assert clock.sleeps == [1, 4, 6]
+        assert result.waited_s == 11
+
+    @pytest.mark.asyncio
+    async def test_last_check_lands_on_deadline(self):
+        clock = _FakeClock()
+        policy = PollPolicy(
+            first_delay_s=1, initial_interval_s=30, jitter=0, timeout_s=600
+        )
+
+        with pytest.raises(PollTimeoutError) as exc_info:
+            await poll_until(
+                lambda: "RUNNING",
+                lambda status: status == "SUCCEEDED",
+                policy,
+                deadline=20.0,
+                clock=clock,
+                sleep=clock.sleep,
+            )
+
+        assert clock.sleeps == [1, 19]
+        assert exc_info.value.attempts == 2
+        assert exc_info.value.waited_s == 20
+        assert exc_info.value.last == "RUNNING"
+
+
+class TestBatchServiceWaitForJob:
+    @pytest.mark.asyncio
+    async def test_reports_job_duration_from_batch_timestamps(self, monkeypatch):
+        async def _no_sleep(_seconds):
+            return None
+
+        monkeypatch.setattr("shared.infra.polling.asyncio.sleep", _no_sleep)
+        client = MagicMock()
+        client.describe_jobs.side_effect = [
+            {"jobs": [{"status": "RUNNING", "startedAt": 1_000_000}]},
+            {
+                "jobs": [
+                    {
+                        "status": "SUCCEEDED",
+                        "startedAt": 1_000_000,
+                        "stoppedAt": 1_012_500,
+                    }
+                ]
+            },
+        ]
+        service = BatchService(batch_client=client)
+
+        result = await service.wait_for_job("job-1")
+
+        assert result.value.is_succeeded
+        assert result.attempts == 2
+        assert result.value.duration_s == pytest.approx(12.5)
@@ -0,0 +1,101 @@
+"""Tests for the prompt-cache friendly (shared-first) expert message layout."""
+
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from code_analysis.infra.adapters.langgraph.nodes.base_expert_node import (
+    PROMPT_LAYOUT_SHARED_FIRST,
+)
+from code_analysis.infra.adapters.langgraph.nodes.expert_nodes import (
+    CodeVulnerabilitiesNode,
+    PromptHardeningNode,
+)
+from code_analysis.infra.adapters.langgraph.settings import WorkflowSettings
+from code_analysis.prompts import get_expert_prompt, get_expert_shared_system_prompt
+
+
+class _RecordingModel:
+    def __init__(self, model_name: str = "gpt-4.1"):
+        self.model_name = model_name
+        self.messages: list[list] = []
+
+    async def ainvoke(self, messages):
+        self.messages.append(messages)
+        return AIMessage(content=json.dumps({"issues": []}))
+
+
+def _state() -> dict:
+    return {
+        "files": [
+            {"path": "src/z.py", "content": "eval(x)"},
+            {"path": "src/a.py", "content": "exec(y)"},
+        ],
+        "issues": [],
+        "rag_chunks": [{"file_path": "src/b.py", "chunk_text": "def b(): ..."}],
+    }
+
+
+class TestSharedFirstLayout:
+    @pytest.mark.asyncio
+    async def test_experts_share_the_prefix_and_send_instructions_last(self):
+        model = _RecordingModel()
+        for node_class in (PromptHardeningNode, CodeVulnerabilitiesNode):
+            node = node_class(model, prompt_layout=PROMPT_LAYOUT_SHARED_FIRST)
+            await node(_state())
+
+        first, second = model.messages
+        assert first[0] == second[0]
+        assert first[0] == SystemMessage(content=get_expert_shared_system_prompt())
+        shared, instructions = first[1].content
+        assert shared == second[1].content[0]
+        assert "cache_control" not in shared
+        # Deterministic file order, RAG context inside the shared block
+        assert shared["text"].index("src/a.py") < shared["text"].index("src/z.py")
+        assert "=== RAG CONTEXT" in shared["text"]
+        assert instructions["text"].endswith(get_expert_prompt("prompt_hardening"))
+        other_instructions = second[1].content[1]["text"]
+        assert other_instructions.endswith(get_expert_prompt("code_vulnerabilities"))
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "model_name", ["claude-sonnet-4-5", "anthropic/claude-haiku-4-5"]
+    )
+    async def test_anthropic_models_get_a_cache_breakpoint(self, model_name):
+        model = _RecordingModel(model_name)
+        node = PromptHardeningNode(model, prompt_layout=PROMPT_LAYOUT_SHARED_FIRST)
+
+        await node(_state())
+
+        shared, instructions = model.messages[0][1].content
+        assert shared["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in instructions
+
+    @pytest.mark.asyncio
+    async def test_expert_first_layout_is_the_default(self):
+        model = _RecordingModel("claude-sonnet-4-5")
+        node = PromptHardeningNode(model)
+
+        await node(_state())
+
+        system, human = model.messages[0]
+        assert system == SystemMessage(content=get_expert_prompt("prompt_hardening"))
+        assert isinstance(human, HumanMessage)
+        assert isinstance(human.content, str)
+
+    def test_unknown_layout_is_rejected(self):
+        with pytest.raises(ValueError):
+            PromptHardeningNode(_RecordingModel(), prompt_layout="system_last")
+
+
+class TestPromptLayoutSetting:
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TITVO_PROMPT_LAYOUT", "Shared_First")
+
+        assert WorkflowSettings.from_env().prompt_layout == "shared_first"
+
+    def test_invalid_value_falls_back(self, monkeypatch):
+        monkeypatch.setenv("TITVO_PROMPT_LAYOUT", "cache_everything")
+
+        assert WorkflowSettings.from_env().prompt_layout == "expert_first"
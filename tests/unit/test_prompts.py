@@ -50,6 +50,18 @@ class TestPromptRegistry:
         assert "Consolidación" in prompt
         assert "problema raíz" in prompt
 
+    def test_expert_shared_system_prompt_loads(self):
+        """Shared expert system prompt should point to the instructions block."""
+        prompt = prompts.get_expert_shared_system_prompt()
+        assert "Titvo" in prompt
+        assert "=== EXPERT INSTRUCTIONS ===" in prompt
+
+    def test_experts_combined_system_prompt_loads(self):
+        """Combined expert system prompt should define the per-expert JSON."""
+        prompt = prompts.get_experts_combined_system_prompt()
+        assert "=== EXPERT: <name> ===" in prompt
+        assert '"experts"' in prompt
+
     def test_all_expert_prompts_load(self):
         """All expert prompts should load successfully."""
         expert_names = prompts.list_experts()
@@ -0,0 +1,219 @@
+"""Tests for RagIndexCache."""
+
+import os
+import threading
+import time
+from io import BytesIO
+from typing import Any
+from unittest.mock import MagicMock
+
+import boto3
+import botocore.exceptions
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+from code_analysis.infra.adapters.rag_index_cache import RagIndexCache
+from code_analysis.infra.adapters.s3_sqlite_rag_context_adapter import (
+    S3SqliteRagContextAdapter,
+)
+
+
+def _s3(etag: str = '"v1"', payload: bytes = b"index") -> MagicMock:
+    s3 = MagicMock()
+    s3.head_object.return_value = {"ETag": etag}
+    s3.get_object.side_effect = lambda **_: {"Body": BytesIO(payload)}
+    return s3
+
+
+def _stubbed_s3() -> tuple[Any, Stubber]:
+    """Real S3 client whose requests are validated against the API model."""
+    s3 = boto3.client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    )
+    return s3, Stubber(s3)
+
+
+def _stub_download(stubber: Stubber, key: str, etag: str, payload: bytes) -> None:
+    stubber.add_response(
+        "head_object", {"ETag": etag}, {"Bucket": "bucket", "Key": key}
+    )
+    stubber.add_response(
+        "get_object",
+        {"ETag": etag, "Body": StreamingBody(BytesIO(payload), len(payload))},
+        {"Bucket": "bucket", "Key": key, "IfMatch": etag},
+    )
+
+
+def _client_error(code: str) -> botocore.exceptions.ClientError:
+    return botocore.exceptions.ClientError({"Error": {"Code": code}}, "HeadObject")
+
+
+class TestRagIndexCache:
+    def test_downloads_on_miss_and_reuses_on_matching_etag(self, tmp_path):
+        cache = RagIndexCache(str(tmp_path), max_bytes=1024)
+        s3 = _s3()
+
+        first = cache.acquire(s3, "bucket", "repo/branches/main/latest/index.db")
+        first.release()
+        second = cache.acquire(s3, "bucket", "repo/branches/main/latest/index.db")
+        second.release()
+
+        assert first.downloaded is True
+        assert second.downloaded is False
+        assert first.path == second.path
+        assert s3.get_object.call_count == 1
+
+    def test_downloads_through_a_real_s3_client(self, tmp_path):
+        cache = RagIndexCache(str(tmp_path), max_bytes=1024)
+        s3, stubber = _stubbed_s3()
+        _stub_download(stubber, "key", '"v1"', b"old")
+        stubber.add_response(
+            "head_object", {"ETag": '"v1"'}, {"Bucket": "bucket", "Key": "key"}
+        )
+        _stub_download(stubber, "key", '"v2"', b"new")
+
+        with stubber:
+            missed = cache.acquire(s3, "bucket", "key")
+            missed.release()
+            hit = cache.acquire(s3, "bucket", "key")
+            hit.release()
+            stale = cache.acquire(s3, "bucket", "key")
+            stale.release()
+
+        stubber.assert_no_pending_responses()
+        assert (missed.downloaded, hit.downloaded, stale.downloaded) == (
+            True,
+            False,
+            True,
+        )
+        with open(stale.path, "rb") as f:
+            assert f.read() == b"new"
+
+    def test_redownloads_when_etag_changes(self, tmp_path):
+        cache = RagIndexCache(str(tmp_path), max_bytes=1024)
+        cache.acquire(_s3('"v1"', b"old"), "bucket", "key").release()
+
+        cached = cache.acquire(_s3('"v2"', b"new"), "bucket", "key")
+        cached.release()
+
+        assert cached.downloaded is True
+        assert cached.etag == '"v2"'
+        with open(cached.path, "rb") as f:
+            assert f.read() == b"new"
+
+    def test_missing_object_raises(self, tmp_path):
+        cache = RagIndexCache(str(tmp_path), max_bytes=1024)
+        s3 = _s3()
+        s3.head_object.side_effect = _client_error("404")
+
+        with pytest.raises(botocore.exceptions.ClientError):
+            cache.acquire(s3, "bucket", "key")
+
+    def test_serves_stale_copy_when_revalidation_fails(self, tmp_path):
+        cache = RagIndexCache(str(tmp_path), max_bytes=1024)
+        cache.acquire(_s3(), "bucket", "key").release()
+        s3 = _s3()
+        s3.head_object.side_effect = _client_error("SlowDown")
+
+        cached = cache.acquire(s3, "bucket", "key")
+        cached.release()
+
+        assert cached.downloaded is False
+        s3.get_object.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            botocore.exceptions.EndpointConnectionError(endpoint_url="https://s3"),
+            botocore.exceptions.ReadTimeoutError(endpoint_url="https://s3"),
+        ],
+    )
+    def test_serves_stale_copy_when_s3_is_unreachable(self, tmp_path, error):
+        cache = RagIndexCache(str(tmp_path), max_bytes=1024)
+        cache.acquire(_s3(), "bucket", "key").release()
+        s3 = _s3()
+        s3.head_object.side_effect = error
+
+        cached = cache.acquire(s3, "bucket", "key")
+        cached.release()
+
+        assert cached.downloaded is False
+        assert cached.etag == '"v1"'
+        s3.get_object.assert_not_called()
+
+    def test_connection_error_without_cached_copy_raises(self, tmp_path):
+        cache = RagIndexCache(str(tmp_path), max_bytes=1024)
+        s3 = _s3()
+        s3.head_object.side_effect = botocore.exceptions.EndpointConnectionError(
+            endpoint_url="https://s3"
+        )
+
+        with pytest.raises(botocore.exceptions.EndpointConnectionError):
+            cache.acquire(s3, "bucket", "key")
+
+    def test_evicts_least_recently_used_unpinned_entries(self, tmp_path):
+        cache = RagIndexCache(str(tmp_path), max_bytes=25)
+        s3 = _s3(payload=b"x" * 10)
+        oldest = cache.acquire(s3, "bucket", "a")
+        oldest.release()
+        pinned = cache.acquire(s3, "bucket", "b")  # still in use
+        os.utime(pinned.path, (0, 0))  # least recently used, but pinned
+        cache.acquire(s3, "bucket", "c").release()
+
+        newest = cache.acquire(s3, "bucket", "d")
+        newest.release()
+        pinned.release()
+
+        assert not os.path.exists(oldest.path)
+        assert os.path.exists(pinned.path)
+        assert os.path.exists(newest.path)
+
+    def test_concurrent_acquires_download_once(self, tmp_path):
+        cache = RagIndexCache(str(tmp_path), max_bytes=1024)
+        s3 = _s3()
+        download = s3.get_object.side_effect
+
+        def slow_download(**kwargs):
+            time.sleep(0.1)
+            return download(**kwargs)
+
+        s3.get_object.side_effect = slow_download
+        results = []
+
+        def worker():
+            cached = cache.acquire(s3, "bucket", "key")
+            results.append(cached)
+            cached.release()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert s3.get_object.call_count == 1
+        assert sum(cached.downloaded for cached in results) == 1
+
+
+class TestAdapterWithCache:
+    def test_close_keeps_cached_index(self, tmp_path):
+        adapter = S3SqliteRagContextAdapter(
+            s3_client=_s3(),
+            bucket_name="bucket",
+            embedding_provider="openai",
+            embedding_model="text-embedding-3-small",
+            embedding_api_key="sk-test",
+            index_cache=RagIndexCache(str(tmp_path), max_bytes=1024),
+        )
+        adapter.configure("https://github.com/org/repo.git", "main")
+
+        db_path = adapter._ensure_db()
+        adapter.close()
+
+        assert db_path is not None
+        assert db_path.startswith(str(tmp_path))
+        assert os.path.exists(db_path)
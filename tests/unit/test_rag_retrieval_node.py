@@ -1,5 +1,7 @@
 """Tests for RagRetrievalNode."""
 
+import asyncio
+import threading
 from unittest.mock import MagicMock
 
 import pytest
@@ -164,3 +166,243 @@ class TestRagRetrievalNode:
         result = await node(state)
 
         assert len(result["rag_chunks"]) <= 30
+
+    @pytest.mark.asyncio
+    async def test_queries_all_files_in_one_batch(self):
+        """All file queries should go through a single search_many call."""
+
+        class _BatchPort(MockRagContextPort):
+            def __init__(self):
+                super().__init__()
+                self.batches: list[list[str]] = []
+
+            def search_many(self, queries, k):
+                self.batches.append(queries)
+                return [
+                    [
+                        {"file_path": f"q{i}", "chunk_text": f"q{i}-r{r}"}
+                        for r in range(k)
+                    ]
+                    for i in range(len(queries))
+                ]
+
+        port = _BatchPort()
+        node = RagRetrievalNode(port)
+        files = [{"path": f"src/f{i}.py", "content": "x = 1"} for i in range(12)]
+
+        result = await node(_make_state(files=files))
+
+        assert len(port.batches) == 1
+        assert len(port.batches[0]) == 12
+        texts = [c["chunk_text"] for c in result["rag_chunks"]]
+        # Best match of every file comes before any second-ranked match
+        assert texts[:12] == [f"q{i}-r0" for i in range(12)]
+        assert texts[12] == "q0-r1"
+
+    @pytest.mark.asyncio
+    async def test_search_runs_off_the_event_loop(self, chunks):
+        """The blocking embedding and KNN lookups run in a worker thread."""
+
+        class _ThreadPort(MockRagContextPort):
+            def search_many(self, queries, k):
+                self.search_thread = threading.current_thread()
+                return super().search_many(queries, k)
+
+        port = _ThreadPort(search_results=chunks)
+        node = RagRetrievalNode(port)
+        files = [{"path": "src/app.py", "content": "import os"}]
+
+        result = await node(_make_state(files=files))
+
+        assert result["rag_chunks"]
+        assert port.search_thread is not threading.current_thread()
+
+
+class _PrefetchingPort(MockRagContextPort):
+    def __init__(self, search_results=None):
+        super().__init__(search_results=search_results)
+        self.events = []
+
+    def configure(self, repository_url: str, branch: str) -> None:
+        super().configure(repository_url, branch)
+        self.events.append("configure")
+
+    def prepare(self) -> None:
+        self.events.append("prepare")
+
+    def search(self, query: str, k: int):
+        self.events.append("search")
+        return super().search(query, k)
+
+    def close(self) -> None:
+        self.events.append("close")
+
+
+class TestRagPrefetch:
+    @pytest.mark.asyncio
+    async def test_node_awaits_prefetch_before_searching(self):
+        port = _PrefetchingPort(
+            search_results=[{"file_path": "a.py", "chunk_text": "x", "distance": 0.1}]
+        )
+        node = RagRetrievalNode(port)
+
+        node.prefetch("https://github.com/org/repo", "main")
+        result = await node(
+            _make_state(files=[{"path": "src/main.py", "content": "import a"}])
+        )
+        await node.release()
+
+        assert len(result["rag_chunks"]) == 1
+        assert port.events[:2] == ["configure", "prepare"]
+        assert port.events.index("search") > port.events.index("prepare")
+        assert port.events.count("close") == 1
+
+    @pytest.mark.asyncio
+    async def test_release_closes_unconsumed_prefetch(self):
+        port = _PrefetchingPort()
+        node = RagRetrievalNode(port)
+
+        node.prefetch("https://github.com/org/repo", "main")
+        await node.release()
+
+        assert port.events == ["configure", "prepare", "close"]
+
+    @pytest.mark.asyncio
+    async def test_prefetch_failure_falls_back_to_search(self):
+        port = _PrefetchingPort(
+            search_results=[{"file_path": "a.py", "chunk_text": "x", "distance": 0.1}]
+        )
+        port.prepare = MagicMock(side_effect=RuntimeError("s3 down"))
+        node = RagRetrievalNode(port)
+
+        node.prefetch("https://github.com/org/repo", "main")
+        result = await node(
+            _make_state(files=[{"path": "src/main.py", "content": "import a"}])
+        )
+
+        assert len(result["rag_chunks"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_prefetch_requires_repository_and_branch(self):
+        port = _PrefetchingPort()
+        node = RagRetrievalNode(port)
+
+        node.prefetch("", "main")
+        await node.release()
+
+        assert port.events == []
+
+    @pytest.mark.asyncio
+    async def test_prefetch_for_another_target_is_discarded(self):
+        port = _PrefetchingPort(
+            search_results=[{"file_path": "a.py", "chunk_text": "x", "distance": 0.1}]
+        )
+        node = RagRetrievalNode(port, max_wait_s=5)
+        never_ready = asyncio.get_running_loop().create_future()
+
+        node.prefetch("https://github.com/org/other", "dev", ready=never_ready)
+        result = await asyncio.wait_for(
+            node(_make_state(files=[{"path": "src/main.py", "content": "import a"}])),
+            1,
+        )
+        await node.release()
+
+        assert len(result["rag_chunks"]) == 1
+        assert "prepare" not in port.events
+        assert port.configured_url == "https://github.com/org/repo"
+        assert port.configured_branch == "main"
+        assert not never_ready.cancelled()
+
+
+class TestRagIndexWait:
+    @pytest.mark.asyncio
+    async def test_waits_for_index_before_preparing(self):
+        port = _PrefetchingPort(
+            search_results=[{"file_path": "a.py", "chunk_text": "x", "distance": 0.1}]
+        )
+        node = RagRetrievalNode(port)
+        ready = asyncio.get_running_loop().create_future()
+
+        node.prefetch("https://github.com/org/repo", "main", ready=ready)
+        await asyncio.sleep(0)
+        assert port.events == []
+        ready.set_result(None)
+        result = await node(
+            _make_state(files=[{"path": "src/main.py", "content": "import a"}])
+        )
+        await node.release()
+
+        assert len(result["rag_chunks"]) == 1
+        assert port.events[:2] == ["configure", "prepare"]
+
+    @pytest.mark.asyncio
+    async def test_failed_index_skips_search(self):
+        port = _PrefetchingPort()
+        node = RagRetrievalNode(port)
+        ready = asyncio.get_running_loop().create_future()
+        ready.set_exception(RuntimeError("indexing failed"))
+
+        node.prefetch("https://github.com/org/repo", "main", ready=ready)
+        result = await node(
+            _make_state(files=[{"path": "src/main.py", "content": "import a"}])
+        )
+        await node.release()
+
+        assert result == {"rag_chunks": []}
+        assert "search" not in port.events
+
+    @pytest.mark.asyncio
+    async def test_slow_index_bounded_by_max_wait(self):
+        port = _PrefetchingPort()
+        node = RagRetrievalNode(port, max_wait_s=0.05)
+        ready = asyncio.get_running_loop().create_future()
+
+        node.prefetch("https://github.com/org/repo", "main", ready=ready)
+        result = await node(
+            _make_state(files=[{"path": "src/main.py", "content": "import a"}])
+        )
+        await node.release()
+
+        assert result == {"rag_chunks": []}
+        assert "search" not in port.events
+        assert not ready.cancelled()
+        ready.cancel()
+
+
+class TestRagSessions:
+    @pytest.mark.asyncio
+    async def test_concurrent_scans_use_separate_ports(self):
+        ports = []
+
+        def _factory():
+            port = _PrefetchingPort(
+                search_results=[{"file_path": "a.py", "chunk_text": "x", "distance": 0}]
+            )
+            ports.append(port)
+            return port
+
+        node = RagRetrievalNode(rag_context_factory=_factory)
+
+        async def _scan(branch):
+            node.prefetch("https://github.com/org/repo", branch)
+            await asyncio.sleep(0)
+            result = await node(
+                _make_state(
+                    branch=branch,
+                    files=[{"path": "src/main.py", "content": "import a"}],
+                )
+            )
+            await node.release()
+            return result
+
+        results = await asyncio.gather(_scan("main"), _scan("dev"))
+
+        assert all(len(r["rag_chunks"]) == 1 for r in results)
+        assert len(ports) == 2
+        for port in ports:
+            assert port.events.count("prepare") == 1
+            assert port.events.count("close") == 1
+
+    def test_requires_port_or_factory(self):
+        with pytest.raises(ValueError):
+            RagRetrievalNode()
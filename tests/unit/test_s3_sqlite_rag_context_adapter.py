@@ -0,0 +1,145 @@
+"""Tests for S3SqliteRagContextAdapter."""
+
+import sqlite3
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from code_analysis.infra.adapters import s3_sqlite_rag_context_adapter as adapter_module
+from code_analysis.infra.adapters.s3_sqlite_rag_context_adapter import (
+    S3SqliteRagContextAdapter,
+)
+
+
+def _adapter() -> S3SqliteRagContextAdapter:
+    adapter = S3SqliteRagContextAdapter(
+        s3_client=MagicMock(),
+        bucket_name="bucket",
+        embedding_provider="openai",
+        embedding_model="text-embedding-3-small",
+        embedding_api_key="sk-test",
+    )
+    adapter.configure("https://github.com/org/repo", "main")
+    adapter._ensure_db = MagicMock(return_value="/tmp/index.db")
+    return adapter
+
+
+class TestSearchMany:
+    def test_embeds_all_queries_in_one_call(self):
+        adapter = _adapter()
+        embeddings = MagicMock()
+        embeddings.embed_documents.return_value = [[0.1], [0.2], [0.3]]
+        adapter._embeddings = embeddings
+        adapter._query_db = MagicMock(
+            side_effect=lambda _db, emb, _k: [{"chunk_text": str(emb[0])}]
+        )
+
+        results = adapter.search_many(["a", "b", "c"], k=3)
+
+        embeddings.embed_documents.assert_called_once_with(["a", "b", "c"])
+        assert adapter._query_db.call_count == 3
+        assert results == [
+            [{"chunk_text": "0.1"}],
+            [{"chunk_text": "0.2"}],
+            [{"chunk_text": "0.3"}],
+        ]
+
+    def test_embedding_failure_returns_one_empty_list_per_query(self):
+        adapter = _adapter()
+        embeddings = MagicMock()
+        embeddings.embed_documents.side_effect = RuntimeError("rate limited")
+        adapter._embeddings = embeddings
+
+        assert adapter.search_many(["a", "b"], k=3) == [[], []]
+
+    def test_search_delegates_to_search_many(self):
+        adapter = _adapter()
+        embeddings = MagicMock()
+        embeddings.embed_documents.return_value = [[0.5]]
+        adapter._embeddings = embeddings
+        adapter._query_db = MagicMock(return_value=[{"chunk_text": "x"}])
+
+        assert adapter.search("a", k=1) == [{"chunk_text": "x"}]
+        embeddings.embed_documents.assert_called_once_with(["a"])
+
+
+class TestConnectionReuse:
+    @pytest.fixture
+    def sqlite_vec(self, monkeypatch):
+        module = MagicMock()
+        module.serialize_float32.side_effect = lambda emb: bytes(len(emb))
+        monkeypatch.setitem(sys.modules, "sqlite_vec", module)
+        return module
+
+    @pytest.fixture
+    def connect(self, monkeypatch):
+        conn = MagicMock()
+        conn.execute.return_value.fetchall.return_value = [("a.py", "chunk", 0.1)]
+        connect = MagicMock(return_value=conn)
+        monkeypatch.setattr(adapter_module.sqlite3, "connect", connect)
+        return connect
+
+    def test_opens_read_only_connection_once_per_index(self, sqlite_vec, connect):
+        adapter = _adapter()
+
+        first = adapter._query_db("/tmp/index.db", [0.1], 3)
+        second = adapter._query_db("/tmp/index.db", [0.2], 3)
+
+        assert (
+            first
+            == second
+            == [{"file_path": "a.py", "chunk_text": "chunk", "distance": 0.1}]
+        )
+        connect.assert_called_once_with(
+            "file:/tmp/index.db?mode=ro&immutable=1",
+            uri=True,
+            check_same_thread=False,
+        )
+        sqlite_vec.load.assert_called_once()
+        pragmas = [
+            c.args[0]
+            for c in connect.return_value.execute.call_args_list
+            if c.args[0].startswith("PRAGMA")
+        ]
+        assert [p.split("=")[0].strip() for p in pragmas] == [
+            "PRAGMA mmap_size",
+            "PRAGMA cache_size",
+        ]
+
+    def test_close_closes_connection(self, sqlite_vec, connect):
+        adapter = _adapter()
+        adapter._query_db("/tmp/index.db", [0.1], 3)
+
+        adapter.close()
+
+        connect.return_value.close.assert_called_once()
+        adapter._query_db("/tmp/index.db", [0.1], 3)
+        assert connect.call_count == 2
+
+    def test_query_error_drops_connection(self, sqlite_vec, connect):
+        adapter = _adapter()
+        adapter._query_db("/tmp/index.db", [0.1], 3)
+        connect.return_value.execute.side_effect = sqlite3.OperationalError("boom")
+
+        assert adapter._query_db("/tmp/index.db", [0.1], 3) == []
+        connect.return_value.close.assert_called_once()
+
+    def test_prepare_downloads_and_opens_connection(self, sqlite_vec, connect):
+        adapter = _adapter()
+        adapter._embeddings_client = MagicMock()
+
+        adapter.prepare()
+        adapter._query_db("/tmp/index.db", [0.1], 3)
+
+        adapter._ensure_db.assert_called_once()
+        adapter._embeddings_client.assert_called_once()
+        connect.assert_called_once()
+
+    def test_prepare_swallows_errors(self, sqlite_vec, connect):
+        adapter = _adapter()
+        connect.side_effect = sqlite3.OperationalError("locked")
+
+        adapter.prepare()
+
+        assert adapter._conn is None
@@ -0,0 +1,186 @@
+"""Tests for per-scan metrics: collector, EMF output and instrumentation."""
+
+import io
+import json
+from typing import TypedDict
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.graph import END, START, StateGraph
+
+from code_analysis.infra.adapters.langgraph.metrics_callback import (
+    ScanMetricsCallbackHandler,
+)
+from shared.infra import metrics
+from shared.infra.aws_clients import AwsClientRegistry, AwsClientSettings
+from shared.infra.metrics import EmfEmitter, ScanMetrics
+
+
+class TestScanMetrics:
+    def test_totals_per_kind_and_name(self):
+        scan = ScanMetrics("task-1")
+        scan.record(metrics.LLM, "owasp_web", 0.5, input_tokens=100, output_tokens=20)
+        scan.record(metrics.LLM, "owasp_web", 1.5, ok=False)
+        scan.record(metrics.AWS, "s3.GetObject", 0.1, size_bytes=2048, retries=1)
+
+        totals = scan.totals()
+
+        assert totals["calls"]["llm"]["owasp_web"] == {
+            "count": 2,
+            "errors": 1,
+            "total_s": 2.0,
+            "max_s": 1.5,
+            "input_tokens": 100,
+            "output_tokens": 20,
+        }
+        assert totals["totals"]["aws"] == {
+            "count": 1,
+            "errors": 0,
+            "total_s": 0.1,
+            "max_s": 0.1,
+            "retries": 1,
+            "size_bytes": 2048,
+        }
+        assert totals["wall_s"] >= 0
+
+    def test_record_call_is_a_noop_outside_a_scan(self):
+        metrics.record_call(metrics.AWS, "s3.GetObject", 0.1)
+
+        assert metrics.current_scan_metrics() is None
+
+    def test_timed_call_records_failure(self):
+        scan = ScanMetrics()
+        with scan.activate(), pytest.raises(RuntimeError):
+            with metrics.timed_call(metrics.EMBEDDINGS, "model", size_bytes=10):
+                raise RuntimeError("boom")
+
+        stats = scan.snapshot()[(metrics.EMBEDDINGS, "model")]
+        assert (stats.count, stats.errors, stats.size_bytes) == (1, 1, 10)
+
+
+class TestEmfEmitter:
+    def test_documents_chunk_durations_and_count_once(self):
+        scan = ScanMetrics("task-1")
+        for _ in range(150):
+            scan.record(metrics.MCP_TOOL, "files", 0.002, size_bytes=10)
+
+        first, second = EmfEmitter("Test").documents(scan)
+
+        assert len(first["Duration"]) == 100
+        assert len(second["Duration"]) == 50
+        assert first["Bytes"] == 1500 and "Bytes" not in second
+        assert first["Kind"] == "mcp_tool" and first["Name"] == "files"
+        assert first["TaskId"] == "task-1"
+        directive = first["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Namespace"] == "Test"
+        assert directive["Dimensions"] == [["Kind", "Name"]]
+        assert {"Name": "Duration", "Unit": "Milliseconds"} in directive["Metrics"]
+
+    def test_emit_writes_one_json_line_per_document(self):
+        scan = ScanMetrics("task-1")
+        scan.record(metrics.NODE, "merge", 0.25)
+        scan.record(metrics.AWS, "dynamodb.UpdateItem", 0.01)
+        stream = io.StringIO()
+
+        EmfEmitter(stream=stream).emit(scan)
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [(doc["Kind"], doc["Name"]) for doc in lines] == [
+            ("aws", "dynamodb.UpdateItem"),
+            ("node", "merge"),
+        ]
+        assert lines[1]["Duration"] == [250.0]
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TITVO_METRICS_NAMESPACE", "Custom")
+        assert EmfEmitter.from_env().namespace == "Custom"
+
+        monkeypatch.setenv("TITVO_METRICS_EMF", "false")
+        assert EmfEmitter.from_env() is None
+
+
+class TestAwsCallMetrics:
+    def test_calls_recorded_per_operation(self):
+        session = boto3.session.Session(
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+            region_name="us-east-1",
+        )
+        s3 = AwsClientRegistry(AwsClientSettings(), session=session).client("s3")
+        scan = ScanMetrics()
+
+        with scan.activate(), Stubber(s3) as stubber:
+            stubber.add_response("list_buckets", {"Buckets": []})
+            stubber.add_client_error("head_object", "404", http_status_code=404)
+            s3.list_buckets()
+            with pytest.raises(s3.exceptions.ClientError):
+                s3.head_object(Bucket="b", Key="k")
+
+        calls = scan.totals()["calls"]["aws"]
+        assert calls["s3.ListBuckets"]["count"] == 1
+        assert calls["s3.ListBuckets"]["errors"] == 0
+        assert calls["s3.HeadObject"]["errors"] == 1
+
+
+class _State(TypedDict, total=False):
+    answer: str
+    expert_errors: list
+
+
+@tool
+def lookup(path: str) -> str:
+    """Return the content of a file."""
+    return f"content of {path}"
+
+
+class TestScanMetricsCallbackHandler:
+    @pytest.mark.asyncio
+    async def test_records_nodes_llm_and_tool_calls(self):
+        model = GenericFakeChatModel(
+            messages=iter(
+                [
+                    AIMessage(
+                        content="no issues",
+                        usage_metadata={
+                            "input_tokens": 12,
+                            "output_tokens": 3,
+                            "total_tokens": 15,
+                            "input_token_details": {"cache_read": 8},
+                        },
+                    )
+                ]
+            )
+        )
+
+        async def expert(state: _State) -> dict:
+            await lookup.ainvoke({"path": "a.py"})
+            response = await model.ainvoke([HumanMessage("review a.py")])
+            return {"answer": response.content}
+
+        async def failing(state: _State) -> dict:
+            return {"expert_errors": [{"expert": "x"}]}
+
+        graph = StateGraph(_State)
+        graph.add_node("expert", expert)
+        graph.add_node("failing", failing)
+        graph.add_edge(START, "expert")
+        graph.add_edge("expert", "failing")
+        graph.add_edge("failing", END)
+        scan = ScanMetrics()
+
+        await graph.compile().ainvoke(
+            {}, config={"callbacks": [ScanMetricsCallbackHandler(scan)]}
+        )
+
+        calls = scan.totals()["calls"]
+        assert set(calls["node"]) == {"expert", "failing"}
+        assert calls["node"]["failing"]["errors"] == 1
+        assert calls["llm"]["expert"]["input_tokens"] == 12
+        assert calls["llm"]["expert"]["output_tokens"] == 3
+        assert calls["llm"]["expert"]["cached_tokens"] == 8
+        assert calls["mcp_tool"]["lookup"]["count"] == 1
+        assert calls["mcp_tool"]["lookup"]["size_bytes"] > 0
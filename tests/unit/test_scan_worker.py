@@ -0,0 +1,184 @@
+"""Tests for the long-running scan worker and its task queues."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from code_analysis.application.scan_worker import ScanWorker
+from code_analysis.domain.ports.ia_agent import AgentMessage
+from code_analysis.domain.ports.task_queue_port import QueuedTask
+from code_analysis.infra.adapters.in_memory_task_queue import InMemoryTaskQueue
+from code_analysis.infra.adapters.langgraph_agent import LangGraphAgent
+from code_analysis.infra.adapters.sqs_task_queue import SqsTaskQueue
+
+
+class _Scans:
+    """Fake ``AnalyseCodeUseCase.execute`` recording concurrency."""
+
+    def __init__(self, duration_s: float = 0.02, fail: set[str] | None = None):
+        self.duration_s = duration_s
+        self.fail = fail or set()
+        self.started: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, task_id: str) -> None:
+        self.started.append(task_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.duration_s)
+            if task_id in self.fail:
+                raise RuntimeError(f"{task_id} failed")
+        finally:
+            self.in_flight -= 1
+
+
+def _worker(queue, scans, **kwargs) -> ScanWorker:
+    kwargs.setdefault("poll_wait_s", 0.01)
+    return ScanWorker(queue=queue, execute=scans, **kwargs)
+
+
+class TestScanWorker:
+    @pytest.mark.asyncio
+    async def test_runs_queued_tasks_with_bounded_concurrency(self):
+        queue = InMemoryTaskQueue(f"task-{i}" for i in range(7))
+        scans = _Scans()
+        worker = _worker(queue, scans, concurrency=3, stop_when_empty=True)
+
+        await worker.run()
+
+        assert sorted(queue.acked) == sorted(f"task-{i}" for i in range(7))
+        assert scans.max_in_flight == 3
+        assert worker.completed == 7
+
+    @pytest.mark.asyncio
+    async def test_failed_task_is_not_acked(self):
+        queue = InMemoryTaskQueue(["ok", "bad"])
+        worker = _worker(queue, _Scans(fail={"bad"}), stop_when_empty=True)
+
+        await worker.run()
+
+        assert queue.acked == ["ok"]
+        assert (worker.completed, worker.failed) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_running_scans_and_keeps_the_rest_queued(self):
+        queue = InMemoryTaskQueue(f"task-{i}" for i in range(5))
+        scans = _Scans(duration_s=0.1)
+        worker = _worker(queue, scans, concurrency=2)
+
+        run = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.03)
+        worker.request_stop()
+        await run
+
+        assert sorted(queue.acked) == ["task-0", "task-1"]
+        assert len(scans.started) == 2
+        assert queue.receive(10, 0) == [QueuedTask(f"task-{i}") for i in (2, 3, 4)]
+
+    @pytest.mark.asyncio
+    async def test_drain_timeout_cancels_and_releases(self):
+        queue = InMemoryTaskQueue(["slow"])
+        worker = _worker(queue, _Scans(duration_s=5), drain_timeout_s=0.05)
+
+        run = asyncio.create_task(worker.run())
+        await asyncio.sleep(0.03)
+        worker.request_stop()
+        await asyncio.wait_for(run, timeout=2)
+
+        assert queue.acked == []
+        assert queue.receive(10, 0) == [QueuedTask("slow")]
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_extends_running_tasks(self):
+        queue = InMemoryTaskQueue(["task-1"])
+        queue.heartbeat = MagicMock()
+        worker = _worker(
+            queue, _Scans(duration_s=0.1), heartbeat_s=0.02, stop_when_empty=True
+        )
+
+        await worker.run()
+
+        assert queue.heartbeat.call_count >= 2
+
+
+class TestInMemoryTaskQueue:
+    def test_from_file_skips_blank_lines_and_comments(self, tmp_path):
+        path = tmp_path / "tasks.txt"
+        path.write_text("# backlog\ntask-1\n\n task-2 \n")
+
+        queue = InMemoryTaskQueue.from_file(str(path))
+
+        assert queue.receive(10, 0) == [QueuedTask("task-1"), QueuedTask("task-2")]
+
+
+class TestSqsTaskQueue:
+    def test_receive_parses_plain_and_json_bodies(self):
+        client = MagicMock()
+        client.receive_message.return_value = {
+            "Messages": [
+                {"MessageId": "1", "ReceiptHandle": "r1", "Body": "task-1"},
+                {
+                    "MessageId": "2",
+                    "ReceiptHandle": "r2",
+                    "Body": json.dumps({"task_id": "task-2"}),
+                },
+                {"MessageId": "3", "ReceiptHandle": "r3", "Body": "{}"},
+            ]
+        }
+        queue = SqsTaskQueue(client, "https://sqs/queue", visibility_timeout_s=600)
+
+        tasks = queue.receive(max_tasks=25, wait_s=60)
+
+        assert tasks == [QueuedTask("task-1", "r1"), QueuedTask("task-2", "r2")]
+        kwargs = client.receive_message.call_args.kwargs
+        assert kwargs["MaxNumberOfMessages"] == 10
+        assert kwargs["WaitTimeSeconds"] == 20
+        client.delete_message.assert_called_once_with(
+            QueueUrl="https://sqs/queue", ReceiptHandle="r3"
+        )
+
+    def test_release_and_heartbeat_change_visibility(self):
+        client = MagicMock()
+        queue = SqsTaskQueue(client, "https://sqs/queue", visibility_timeout_s=600)
+        task = QueuedTask("task-1", "r1")
+
+        queue.release(task)
+        queue.heartbeat(task)
+
+        timeouts = [
+            c.kwargs["VisibilityTimeout"]
+            for c in client.change_message_visibility.call_args_list
+        ]
+        assert timeouts == [0, 600]
+
+
+class TestPerScanLangfuseSession:
+    @pytest.mark.asyncio
+    async def test_each_scan_gets_its_own_session_id(self):
+        agent = LangGraphAgent(
+            system_prompt="",
+            model_factory=MagicMock(),
+            tools_factory=MagicMock(),
+            langfuse_callback_handler=MagicMock(),
+        )
+        agent._workflow = MagicMock()
+        agent._workflow.ainvoke = AsyncMock(return_value={"final_output": {}})
+
+        await asyncio.gather(
+            *(
+                agent._invoke_wrapped(
+                    AgentMessage(role="user", content="", metadata={"task_id": t})
+                )
+                for t in ("task-1", "task-2")
+            )
+        )
+
+        sessions = {
+            c.kwargs["config"]["metadata"]["langfuse_session_id"]
+            for c in agent._workflow.ainvoke.call_args_list
+        }
+        assert sessions == {"task-1", "task-2"}
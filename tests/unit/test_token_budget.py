@@ -0,0 +1,109 @@
+"""Tests for expert prompt token budgeting."""
+
+import pytest
+
+from code_analysis.infra.adapters.langgraph.nodes.expert_nodes import (
+    PromptHardeningNode,
+)
+from code_analysis.infra.adapters.langgraph.token_budget import (
+    ModelProfile,
+    PromptBudget,
+    allocate_budgets,
+    get_model_profile,
+)
+
+
+class _WordCounter:
+    """Deterministic stand-in for tiktoken: one token per whitespace word."""
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def _budget(input_tokens: int, rag_share: float = 0.2) -> PromptBudget:
+    return PromptBudget(
+        profile=ModelProfile(context_window=input_tokens + 100, output_reserve=100),
+        rag_share=rag_share,
+        counter=_WordCounter(),
+    )
+
+
+class TestModelProfiles:
+    def test_matches_by_prefix(self):
+        assert get_model_profile("gpt-4.1-mini").context_window == 1_047_576
+        assert get_model_profile("gpt-4o-2024-08-06").context_window == 128_000
+
+    def test_strips_provider_prefix(self):
+        profile = get_model_profile("anthropic/claude-sonnet-4")
+        assert profile.context_window == 200_000
+        assert profile.count_scale > 1
+
+    def test_unknown_model_uses_default(self):
+        assert get_model_profile("some-local-model").context_window == 128_000
+
+    def test_max_prompt_tokens_caps_input_budget(self):
+        budget = PromptBudget.for_model("gpt-4.1", max_prompt_tokens=50_000)
+        assert budget.input_tokens == 50_000
+
+
+class TestAllocateBudgets:
+    def test_everything_fits(self):
+        assert allocate_budgets([10, 20, 30], 100) == [10, 20, 30]
+
+    def test_small_items_donate_unused_share(self):
+        assert allocate_budgets([10, 500, 500], 310) == [10, 150, 150]
+
+    def test_never_exceeds_budget(self):
+        allocations = allocate_budgets([7, 1000, 13, 400], 101)
+        assert sum(allocations) <= 101
+        assert allocations[0] == 7
+
+
+class TestPromptBudgetSplit:
+    def test_rag_capped_by_share(self):
+        files, rag = _budget(1000).split("one two three four", rag_tokens=5000)
+        assert rag == int(996 * 0.2)
+        assert files + rag == 996
+
+    def test_rag_takes_only_what_it_needs(self):
+        files, rag = _budget(1000).split("", rag_tokens=50)
+        assert (files, rag) == (950, 50)
+
+
+class TestExpertPromptPacking:
+    @pytest.fixture
+    def node(self):
+        return PromptHardeningNode(None, budget=_budget(400))
+
+    def test_small_files_sent_whole(self, node):
+        files = [{"path": "a.py", "content": "x = 1\ny = 2\n"}]
+        formatted = node._format_files(files, budget_tokens=400)
+        assert "x = 1\ny = 2\n" in formatted
+        assert "file truncated" not in formatted
+
+    def test_large_file_truncated_within_budget(self, node):
+        small = {"path": "small.py", "content": "import os\n"}
+        large = {
+            "path": "large.py",
+            "content": "".join(f"value_{i} = compute({i})\n" for i in range(500)),
+        }
+        formatted = node._format_files([small, large], budget_tokens=300)
+
+        assert _WordCounter().count(formatted) <= 300
+        assert "import os" in formatted
+        assert "file truncated" in formatted
+
+    def test_rag_chunks_packed_in_rank_order(self, node):
+        chunks = [
+            {"file_path": f"ctx{i}.py", "chunk_text": "word " * 20} for i in range(5)
+        ]
+        formatted = node._format_rag_chunks(chunks, budget_tokens=60)
+
+        assert "ctx0.py" in formatted
+        assert "ctx1.py" in formatted
+        assert "ctx2.py" not in formatted
+        assert _WordCounter().count(formatted) <= 60
+
+    def test_rag_block_omitted_when_nothing_fits(self, node):
+        chunks = [{"file_path": "ctx.py", "chunk_text": "word " * 100}]
+        assert node._format_rag_chunks(chunks, budget_tokens=10) == ""